@@ -0,0 +1,196 @@
+import os
+import re
+import json
+
+INDEX_FILE_NAME = ".intellico_js_index.json"
+# Bump whenever export detection or the emitted test format changes.
+INDEX_VERSION = "2"
+
+# Component files larger than this are bundles or generated code, not components
+MAX_COMPONENT_BYTES = 256 * 1024
+VENDORED_DIR_NAMES = {"node_modules", "bower_components", "vendor", "vendors", "dist", "build", "coverage"}
+MINIFIED_SUFFIXES = (".min.js", ".bundle.js", ".chunk.js", ".min.jsx")
+# A line this long in the first few KB means the file was minified
+MINIFIED_LINE_LENGTH = 1000
+MINIFIED_SNIFF_BYTES = 8192
+
+SKIP_TOO_LARGE = "too large"
+SKIP_VENDORED = "vendored"
+SKIP_MINIFIED = "minified"
+SKIP_UNREADABLE = "unreadable"
+SKIP_NO_COMPONENTS = "no component exports"
+
+_COMMENTS = re.compile(r"/\*.*?\*/|(?<![:\"'`\\])//[^\n]*", re.S)
+_IDENTIFIER = r"[A-Za-z_$][\w$]*"
+_DEFAULT_DECLARATION = re.compile(
+    rf"\bexport\s+default\s+(?:async\s+)?(?:function\s*\*?|class)\s*({_IDENTIFIER})?"
+)
+_DEFAULT_EXPRESSION = re.compile(rf"\bexport\s+default\s+(?!(?:async\s+)?function\b|class\b)({_IDENTIFIER})?")
+_NAMED_DECLARATION = re.compile(
+    rf"\bexport\s+(?:async\s+)?(?:const|let|var|function\s*\*?|class)\s+({_IDENTIFIER})"
+)
+_NAMED_LIST = re.compile(r"\bexport\s*\{([^}]*)\}")
+
+
+class ComponentExports:
+    """What a component file exports: an optional default and a list of named exports."""
+
+    def __init__(self, has_default=False, default_name=None, named=None):
+        self.has_default = has_default
+        self.default_name = default_name
+        self.named = sorted(set(named or []))
+
+    def components(self):
+        """Named exports that look like React components (capitalized)."""
+        return [name for name in self.named if name[:1].isupper()]
+
+    def to_dict(self):
+        return {"has_default": self.has_default, "default_name": self.default_name, "named": self.named}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("has_default", False), data.get("default_name"), data.get("named"))
+
+
+def parse_exports(source):
+    """Detects default and named ES module exports with a lightweight scan.
+
+    This is not a JavaScript parser: it strips comments and matches export
+    statements, which covers the component files we generate tests for.
+    """
+    source = _COMMENTS.sub("", source)
+    has_default = False
+    default_name = None
+    named = []
+
+    for match in _DEFAULT_DECLARATION.finditer(source):
+        has_default = True
+        default_name = default_name or match.group(1)
+    for match in _DEFAULT_EXPRESSION.finditer(source):
+        has_default = True
+        default_name = default_name or match.group(1)
+    for match in _NAMED_DECLARATION.finditer(source):
+        named.append(match.group(1))
+    for match in _NAMED_LIST.finditer(source):
+        for specifier in match.group(1).split(","):
+            parts = specifier.split()
+            if not parts:
+                continue
+            exported = parts[-1] if len(parts) == 3 and parts[1] == "as" else parts[0]
+            if exported == "default":
+                has_default = True
+                if parts[0] != "default":
+                    default_name = default_name or parts[0]
+            elif re.fullmatch(_IDENTIFIER, exported):
+                named.append(exported)
+    return ComponentExports(has_default, default_name, named)
+
+
+def is_vendored(path, root):
+    """Whether path lies in a vendored directory below root; root itself and its parents do not count."""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+    return any(part in VENDORED_DIR_NAMES for part in relative.split(os.sep)[:-1])
+
+
+def looks_minified(source):
+    head = source[:MINIFIED_SNIFF_BYTES]
+    return any(len(line) >= MINIFIED_LINE_LENGTH for line in head.splitlines())
+
+
+def scan_component(path, size, max_bytes=MAX_COMPONENT_BYTES, root=None):
+    """Returns (ComponentExports, None), or (None, skip reason) for files we leave alone.
+
+    Path and size checks come first, so skipped bundles are never opened.
+    Vendored directories are looked for below root, the scanned folder,
+    which defaults to the file's own directory.
+    """
+    if is_vendored(path, root or os.path.dirname(path)):
+        return None, SKIP_VENDORED
+    if path.endswith(MINIFIED_SUFFIXES):
+        return None, SKIP_MINIFIED
+    if size > max_bytes:
+        return None, SKIP_TOO_LARGE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None, SKIP_UNREADABLE
+    if looks_minified(source):
+        return None, SKIP_MINIFIED
+    exports = parse_exports(source)
+    if not exports.has_default and not exports.components():
+        return None, SKIP_NO_COMPONENTS
+    return exports, None
+
+
+class JsExportIndex:
+    """On-disk cache of scanned component files keyed by path, mtime and size.
+
+    Entries remember the detected exports (or why a file was skipped) and
+    the test file emitted for it, so unchanged components are neither
+    re-read nor re-emitted on the next run.
+    """
+
+    def __init__(self, test_dir):
+        self.path = os.path.join(test_dir, INDEX_FILE_NAME)
+        self.entries = self.load()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable JS index {self.path}: {e}")
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, path, stat):
+        """The entry for path if its mtime and size are unchanged, else None."""
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is not None and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def scan(self, path, stat, max_bytes=MAX_COMPONENT_BYTES, root=None):
+        """Returns (entry, fresh); scans the file only when the index is stale."""
+        entry = self.lookup(path, stat)
+        if entry is not None:
+            return entry, True
+        exports, reason = scan_component(path, stat.st_size, max_bytes, root)
+        entry = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "exports": exports.to_dict() if exports is not None else None,
+            "skipped": reason,
+            "test_file": None,
+        }
+        self.entries[os.path.abspath(path)] = entry
+        return entry, False
+
+    def record_test(self, path, test_file):
+        self.entries[os.path.abspath(path)]["test_file"] = os.path.abspath(test_file)
+
+    def prune(self):
+        """Drops entries for deleted component files and removes tests no other entry still uses."""
+        for path in list(self.entries):
+            if os.path.exists(path):
+                continue
+            test_file = self.entries.pop(path).get("test_file")
+            in_use = any(entry.get("test_file") == test_file for entry in self.entries.values())
+            if test_file and not in_use and os.path.exists(test_file):
+                os.remove(test_file)
@@ -1,33 +1,20 @@
 import os
 import json
-import subprocess
+import sys
+import time
 from dotenv import load_dotenv
 
-load_dotenv()
-
-def generate_test_case(component_path, component_name, test_dir):
-    component_dir = os.path.dirname(component_path)
-    relative_path = os.path.relpath(component_dir, test_dir).replace(os.sep, "/")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    import_statement = (
-        f"import {{ {component_name} }} from '{relative_path}/{component_name}';"
-    )
-
-    try:
-        with open(component_path, "r") as f:
-            content = f.read()
-            if "export default" in content:
-                import_statement = (
-                    f"import {component_name} from '{relative_path}/{component_name}';"
-                )
-    except Exception as e:
-        print(f"Error reading file {component_path}: {e}")
+from TestCase.js_index import VENDORED_DIR_NAMES, ComponentExports, JsExportIndex, scan_component
+from TestCase.toolchain import NodeToolchain, ToolchainError
+from language_identifier.events import emit
+from language_identifier import metrics
 
-    test_content = f"""
-import React from 'react';
-import {{ render }} from '@testing-library/react';
-{import_statement}
+load_dotenv()
 
+def _component_test_block(component_name):
+    return f"""
 describe('{component_name}', () => {{
   it('renders correctly', () => {{
     expect({component_name}).toBeDefined();
@@ -36,20 +23,119 @@ describe('{component_name}', () => {{
 }});
 """
 
-    if not os.path.exists(test_dir):
-        os.makedirs(test_dir)
+def component_test_path(component_path, component_name, test_dir, root=None):
+    """Where the test for a component goes: test_dir mirrors the component's folder below root.
+
+    Without root, tests sit directly in test_dir.
+    """
+    if root is None:
+        return os.path.join(test_dir, f"{component_name}.test.js")
+    relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(component_path)), os.path.abspath(root))
+    return os.path.normpath(os.path.join(test_dir, relative_dir, f"{component_name}.test.js"))
+
+def generate_test_case(component_path, component_name, test_dir, exports=None, root=None):
+    """Writes a Jest test covering every component the file exports.
+
+    exports is the file's ComponentExports; when omitted the file is scanned
+    here. With root, the test's path mirrors the component's path below
+    root, so same-named components in different folders keep separate
+    tests. Returns the test file path, or None if the file was skipped.
+    """
+    if exports is None:
+        try:
+            size = os.path.getsize(component_path)
+        except OSError as e:
+            print(f"Error reading file {component_path}: {e}")
+            return None
+        exports, reason = scan_component(component_path, size, root=root)
+        if exports is None:
+            print(f"Skipping {component_path}: {reason}")
+            return None
+
+    test_file = component_test_path(component_path, component_name, test_dir, root)
+    component_dir = os.path.dirname(component_path)
+    relative_path = os.path.relpath(component_dir, os.path.dirname(test_file)).replace(os.sep, "/")
+    module_path = f"{relative_path}/{component_name}"
+
+    # The default export is bound to the file's name, as the tests always did
+    default_name = None
+    if exports.has_default:
+        default_name = component_name if component_name.isidentifier() else exports.default_name or "DefaultExport"
+    named = [name for name in exports.components() if name != default_name]
+
+    import_lines = []
+    if default_name and named:
+        import_lines.append(f"import {default_name}, {{ {', '.join(named)} }} from '{module_path}';")
+    elif default_name:
+        import_lines.append(f"import {default_name} from '{module_path}';")
+    else:
+        import_lines.append(f"import {{ {', '.join(named)} }} from '{module_path}';")
+
+    test_content = f"""
+import React from 'react';
+import {{ render }} from '@testing-library/react';
+{chr(10).join(import_lines)}
+""" + "".join(_component_test_block(name) for name in ([default_name] if default_name else []) + named)
 
-    test_file_path = os.path.join(test_dir, f"{component_name}.test.js")
-    with open(test_file_path, "w") as f:
+    os.makedirs(os.path.dirname(test_file), exist_ok=True)
+    with open(test_file, "w") as f:
         f.write(test_content)
+    metrics.incr("js_tests_written")
+    metrics.incr("test_bytes_written", len(test_content.encode()))
+    return test_file
+
+def generate_indexed_test_case(index, component_path, stat, test_dir, root=None):
+    """Emits a test for component_path unless the index shows it is unchanged or skipped.
+
+    Returns True if a test file was written.
+    """
+    entry, fresh = index.scan(component_path, stat, root=root)
+    if entry["skipped"]:
+        metrics.incr("js_components_skipped")
+        if not fresh:
+            print(f"Skipping {component_path}: {entry['skipped']}")
+        return False
+    if fresh and entry["test_file"] and os.path.exists(entry["test_file"]):
+        metrics.incr("js_components_unchanged")
+        return False
+    component_name = os.path.splitext(os.path.basename(component_path))[0]
+    exports = ComponentExports.from_dict(entry["exports"])
+    index.record_test(component_path, generate_test_case(component_path, component_name, test_dir, exports, root))
+    return True
 
 def generate_tests_for_folder(folder_path, test_dir):
+    index = JsExportIndex(test_dir)
     for root, dirs, files in os.walk(folder_path):
+        # Never descend into vendored trees such as node_modules
+        dirs[:] = [name for name in dirs if name not in VENDORED_DIR_NAMES]
         for file in files:
             if file.endswith(".js") or file.endswith(".jsx"):
                 component_path = os.path.join(root, file)
-                component_name = os.path.splitext(file)[0]
-                generate_test_case(component_path, component_name, test_dir)
+                generate_indexed_test_case(index, component_path, os.stat(component_path), test_dir, folder_path)
+    index.prune()
+    index.save()
+
+def generate_tests_for_directories(folder_paths, test_dir, root=None):
+    """Generates tests for the components directly inside each folder (no recursion).
+
+    root is the scanned folder the tests' layout mirrors, by default the
+    folders' common parent. Returns the number of test files written;
+    unchanged components are skipped.
+    """
+    if not folder_paths:
+        return 0
+    root = root or os.path.commonpath([os.path.abspath(folder_path) for folder_path in folder_paths])
+    index = JsExportIndex(test_dir)
+    written = 0
+    for folder_path in folder_paths:
+        with os.scandir(folder_path) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file() and entry.name.endswith((".js", ".jsx")):
+                    written += generate_indexed_test_case(index, entry.path, entry.stat(), test_dir, root)
+    index.prune()
+    index.save()
+    print(f"JS export index: {index.hits} unchanged, {index.misses} scanned, {written} test file(s) written")
+    return written
 
 def process_folder(folder_path, output_folder):
     test_dir = os.path.join(output_folder)
@@ -62,25 +148,13 @@ def generate_test_file(file_path, output_folder):
     generate_test_case(file_path, component_name, test_dir)
     print(f"Test case has been generated for: {file_path}")
 
-def install_npm_dependencies(root_dir):
-    dependencies = [
-        "@babel/core",
-        "@babel/preset-env",
-        "@babel/preset-react",
-        "babel-jest",
-        "jest-transform-stub",
-        "jest",
-        "jest-environment-jsdom",
-        "@testing-library/react",
-    ]
-    subprocess.run(
-        ["C:\\Program Files\\nodejs\\npm.cmd", "install", "--save-dev"] + dependencies,
-        cwd=root_dir,
-        check=True,
-    )
-
-def configure_package_json(root_dir, output_folder):
-    package_json_path = os.path.join(root_dir, "package.json")
+def install_npm_dependencies(root_dir, package_json, toolchain=None):
+    """Installs the Jest/Babel toolchain, skipping npm when the dependency set is unchanged."""
+    toolchain = toolchain or NodeToolchain(root_dir)
+    toolchain.ensure_installed(package_json)
+
+def configure_package_json(root_dir, output_folder, toolchain=None):
+    toolchain = toolchain or NodeToolchain(root_dir)
 
     package_json = {
         "dependencies": {
@@ -119,21 +193,17 @@ def configure_package_json(root_dir, output_folder):
         }
     }
 
-    with open(package_json_path, "w") as f:
-        json.dump(package_json, f, indent=2)
+    toolchain.write_config("package.json", json.dumps(package_json, indent=2))
+    return package_json
 
-    print("Jest configuration and test script have been added to package.json.")
-
-def create_babel_config(root_dir):
+def create_babel_config(root_dir, toolchain=None):
+    toolchain = toolchain or NodeToolchain(root_dir)
     babel_config = """
 module.exports = {
     presets: ['@babel/preset-env', '@babel/preset-react'],
 };
 """
-    babel_config_path = os.path.join(root_dir, "babel.config.js")
-    with open(babel_config_path, "w") as f:
-        f.write(babel_config)
-    print("babel.config.js has been created.")
+    toolchain.write_config("babel.config.js", babel_config)
 
 def generate_and_run_test(path, output_folder):
     root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -145,24 +215,40 @@ def generate_and_run_test(path, output_folder):
     else:
         print("Invalid path. Please provide a valid JavaScript file or folder.")
 
+    run_jest(root_dir, output_folder)
+
+def generate_and_run_tests(folder_paths, output_folder, root=None):
+    """Generates tests for a batch of folders, then sets up and runs Jest once."""
+    root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    generate_tests_for_directories(folder_paths, os.path.join(output_folder), root)
+    print(f"Test cases have been generated in: {output_folder}")
+    run_jest(root_dir, output_folder)
+
+def run_jest(root_dir, output_folder):
+    toolchain = NodeToolchain(root_dir)
+
+    # Configure Jest in package.json and create babel.config.js (only rewritten when changed)
+    package_json = configure_package_json(root_dir, output_folder, toolchain)
+    create_babel_config(root_dir, toolchain)
+
     # Install npm dependencies
     try:
-        install_npm_dependencies(root_dir)
-    except subprocess.CalledProcessError:
+        with metrics.timer("npm_install"):
+            install_npm_dependencies(root_dir, package_json, toolchain)
+    except ToolchainError as e:
         print(
-            "Error: npm dependencies could not be installed. Please ensure you have npm installed and try again."
+            f"Error: npm dependencies could not be installed ({e}). Please ensure you have npm installed and try again."
         )
-        exit(1)
-
-    # Configure Jest in package.json
-    configure_package_json(root_dir, output_folder)
-
-    # Create babel.config.js
-    create_babel_config(root_dir)
+        return None
 
     # Run tests
     print("Running tests...")
-    subprocess.run(["C:\\Program Files\\nodejs\\npm.cmd", "test"], cwd=root_dir)
+    started = time.perf_counter()
+    result = toolchain.run_tests()
+    seconds = time.perf_counter() - started
+    metrics.observe("jest", seconds)
+    emit("jest_done", returncode=result.returncode, seconds=round(seconds, 3))
+    return result
 
 if __name__ == "__main__":
     path = os.getenv("FOLDER_PATH")
@@ -0,0 +1,171 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+STAMP_FILE_NAME = ".intellico-toolchain"
+
+# One lock per install directory, shared by every toolchain of this process
+_install_locks = {}
+_install_locks_guard = threading.Lock()
+
+
+class ToolchainError(Exception):
+    """npm is missing or the dependency install failed."""
+
+
+def find_npm():
+    """Locates npm on PATH (npm.cmd on Windows)."""
+    npm = shutil.which("npm") or shutil.which("npm.cmd")
+    if npm is None:
+        raise ToolchainError("npm was not found on PATH")
+    return npm
+
+
+def write_if_changed(path, content):
+    """Writes content to path only if it differs; returns True if the file was written."""
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, "w") as f:
+        f.write(content)
+    return True
+
+
+@contextmanager
+def install_lock(directory):
+    """Serializes npm installs into directory across threads and, where fcntl exists, processes."""
+    directory = os.path.abspath(directory)
+    with _install_locks_guard:
+        lock = _install_locks.setdefault(directory, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        # Kept outside the directory so it never shows up in a checkout or gets linked over
+        digest = hashlib.sha256(directory.encode()).hexdigest()[:16]
+        with open(os.path.join(tempfile.gettempdir(), f"intellico-npm-{digest}.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def dependency_fingerprint(package_json):
+    """Hash of everything npm install depends on in package.json."""
+    dependency_set = {
+        "dependencies": package_json.get("dependencies", {}),
+        "devDependencies": package_json.get("devDependencies", {}),
+    }
+    encoded = json.dumps(dependency_set, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class NodeToolchain:
+    """Keeps the Jest/Babel toolchain in root_dir installed and configured.
+
+    npm install only runs when the dependency fingerprint changes, and only
+    one install at a time runs in a directory. With a cache_dir, each
+    fingerprint is installed once under cache_dir/<fingerprint> and
+    root_dir/node_modules is linked to it, so several checkouts share one
+    install.
+    """
+
+    def __init__(self, root_dir, cache_dir=None):
+        self.root_dir = root_dir
+        self.cache_dir = cache_dir or os.getenv("INTELLICO_NODE_CACHE")
+        self.npm = None
+
+    def npm_command(self):
+        if self.npm is None:
+            self.npm = find_npm()
+        return self.npm
+
+    def write_config(self, file_name, content):
+        path = os.path.join(self.root_dir, file_name)
+        if write_if_changed(path, content):
+            print(f"{file_name} has been updated.")
+        else:
+            print(f"{file_name} is up to date.")
+
+    def ensure_installed(self, package_json):
+        """Installs dependencies unless the stamped fingerprint already matches.
+
+        Raises ToolchainError when npm is missing, even if nothing needs installing,
+        since the tests cannot run without it either.
+        """
+        self.npm_command()
+        fingerprint = dependency_fingerprint(package_json)
+        node_modules = os.path.join(self.root_dir, "node_modules")
+        with install_lock(self.root_dir):
+            # Checked under the lock: a concurrent run may have just installed it
+            if read_stamp(node_modules) == fingerprint:
+                print("npm dependencies are up to date; skipping install.")
+                return False
+
+            if self.cache_dir and not is_real_directory(node_modules):
+                install_dir = os.path.join(self.cache_dir, fingerprint)
+                cached_modules = os.path.join(install_dir, "node_modules")
+                os.makedirs(install_dir, exist_ok=True)
+                with install_lock(install_dir):
+                    if read_stamp(cached_modules) != fingerprint:
+                        with open(os.path.join(install_dir, "package.json"), "w") as f:
+                            json.dump(package_json, f, indent=2)
+                        self.npm_install(install_dir)
+                        write_stamp(cached_modules, fingerprint)
+                link_directory(cached_modules, node_modules)
+                print(f"Using cached node_modules from {cached_modules}")
+                return True
+
+            self.npm_install(self.root_dir)
+            write_stamp(node_modules, fingerprint)
+            return True
+
+    def npm_install(self, cwd):
+        print(f"Installing npm dependencies in {cwd}...")
+        try:
+            subprocess.run([self.npm_command(), "install"], cwd=cwd, check=True)
+        except subprocess.CalledProcessError as e:
+            raise ToolchainError(f"npm install failed with exit code {e.returncode}") from e
+
+    def run_tests(self):
+        return subprocess.run([self.npm_command(), "test"], cwd=self.root_dir)
+
+
+def read_stamp(node_modules):
+    try:
+        with open(os.path.join(node_modules, STAMP_FILE_NAME), "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_stamp(node_modules, fingerprint):
+    os.makedirs(node_modules, exist_ok=True)
+    with open(os.path.join(node_modules, STAMP_FILE_NAME), "w") as f:
+        f.write(fingerprint)
+
+
+def is_real_directory(path):
+    return os.path.isdir(path) and not os.path.islink(path)
+
+
+def link_directory(target, link_path):
+    if os.path.islink(link_path):
+        if os.readlink(link_path) == target:
+            return
+        os.unlink(link_path)
+    os.symlink(target, link_path, target_is_directory=True)
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import uuid
+import queue
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from language_identifier import metrics
+from language_identifier.events import capture, replay
+from language_identifier.metrics import MetricsRegistry, collect
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Progress events kept per job for late SSE subscribers.
+MAX_EVENTS_PER_JOB = 5000
+# How often a job thread checks whether its process died without reporting
+JOB_POLL_SECONDS = 0.5
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting to run."""
+
+
+class JobConflict(Exception):
+    """Raised when a folder already has an active job with different options."""
+
+
+def output_subfolder(output_folder, folder_path):
+    """A folder of its own under output_folder for the results of one input folder.
+
+    Tests, coverage data, indexes and caches of different input folders,
+    nested ones included, then never share files.
+    """
+    folder_path = os.path.normcase(os.path.abspath(folder_path))
+    digest = hashlib.sha256(folder_path.encode()).hexdigest()[:12]
+    return os.path.join(output_folder, f"{os.path.basename(folder_path) or 'root'}-{digest}")
+
+
+def run_analysis(folder_path, output_folder="tests", **options):
+    """The job body of the backend: analyzes folder_path into its own output tree and records the run."""
+    # Imported in the job's process, so the server never loads the generator stack
+    from language_identifier.main import analyze_folder
+    from language_identifier.results_store import ResultsStore, default_database_url, record_analysis
+
+    store = ResultsStore(default_database_url(output_folder))
+    return record_analysis(store, analyze_folder, folder_path, output_subfolder(output_folder, folder_path), **options)
+
+
+def _job_process(runner, folder_path, options, messages):
+    """Body of a job's process: runs runner and sends its events, then its outcome, over messages."""
+    registry = MetricsRegistry()
+
+    def send_event(record):
+        # Records go out as the JSON the SSE stream would send anyway, so they always pickle
+        messages.put(("event", json.loads(json.dumps(record, default=str))))
+
+    try:
+        with capture(send_event), collect(registry):
+            result = runner(folder_path, **options)
+    except BaseException as e:
+        messages.put((JOB_FAILED, f"{e.__class__.__name__}: {e}", registry.snapshot()))
+    else:
+        messages.put((JOB_SUCCEEDED, result, registry.snapshot()))
+
+
+class Job:
+    def __init__(self, folder_path, options):
+        self.id = uuid.uuid4().hex
+        self.folder_path = folder_path
+        self.options = options
+        self.state = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.metrics = MetricsRegistry()
+        self.events = deque(maxlen=MAX_EVENTS_PER_JOB)
+        self.event_count = 0
+
+    def add_event(self, record):
+        # Called from the worker thread; deque.append is atomic.
+        self.event_count += 1
+        record["seq"] = self.event_count
+        self.events.append(record)
+
+    def events_after(self, seq):
+        return [record for record in list(self.events) if record["seq"] > seq]
+
+    @property
+    def done(self):
+        return self.state in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "folderPath": self.folder_path,
+            "state": self.state,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "metrics": self.metrics.snapshot(),
+        }
+
+
+class JobManager:
+    """Runs analysis jobs, each in its own spawned process, at most max_workers at a time.
+
+    Target modules are imported, forked and executed in the job's process,
+    never in the server: its sys.path and sys.modules stay untouched, no
+    fork happens while server threads are alive, and a stuck job can be
+    killed. Events and metrics are streamed back to the job while it runs.
+    runner must be picklable (a module-level function or a partial of one).
+
+    Submissions for a folder that already has a queued or running job with
+    the same options are merged into that job, so two requests never write
+    the same output tree at once; different options raise JobConflict.
+    runner should give each folder its own output tree (see
+    output_subfolder), as jobs for different folders run side by side.
+    Once max_pending jobs are waiting, new folders are rejected with
+    JobQueueFull.
+    """
+
+    def __init__(self, runner, max_workers=2, max_pending=16, max_history=200):
+        self.runner = runner
+        self.max_pending = max_pending
+        self.max_history = max_history
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="intellico-job")
+        self.context = multiprocessing.get_context("spawn")
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.active_by_folder = {}
+        self.processes = {}
+
+    def submit(self, folder_path, **options):
+        """Returns (job, created); created is False when merged into an existing job."""
+        key = os.path.normcase(os.path.abspath(folder_path))
+        with self.lock:
+            existing = self.active_by_folder.get(key)
+            if existing is not None:
+                if existing.options != options:
+                    raise JobConflict(
+                        f"Job {existing.id} is already {existing.state} for this folder with other options"
+                    )
+                return existing, False
+            pending = sum(1 for job in self.jobs.values() if job.state == JOB_QUEUED)
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs are already queued")
+            job = Job(folder_path, options)
+            self.jobs[job.id] = job
+            self.active_by_folder[key] = job
+            self._trim_history()
+        self.executor.submit(self._run, job, key)
+        return job, True
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job, key):
+        job.state = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            with capture(job.add_event), collect(job.metrics):
+                state, payload = self._run_process(job)
+            if state == JOB_SUCCEEDED:
+                job.result = payload
+            else:
+                job.error = payload
+            job.state = state
+        except BaseException as e:
+            job.error = f"{e.__class__.__name__}: {e}"
+            job.state = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            with self.lock:
+                if self.active_by_folder.get(key) is job:
+                    del self.active_by_folder[key]
+
+    def _run_process(self, job):
+        """Runs one job in a spawned process; returns (final state, result or error)."""
+        messages = self.context.Queue()
+        process = self.context.Process(
+            target=_job_process, args=(self.runner, job.folder_path, job.options, messages),
+            # Not daemonic: an analysis with --jobs starts a process pool of its own;
+            # shutdown kills the job process instead
+            name=f"intellico-job-{job.id[:8]}", daemon=False,
+        )
+        process.start()
+        with self.lock:
+            self.processes[job.id] = process
+        try:
+            while True:
+                try:
+                    message = messages.get(timeout=JOB_POLL_SECONDS)
+                except queue.Empty:
+                    if process.is_alive():
+                        continue
+                    # Exited: whatever it sent before exiting is already in the pipe
+                    try:
+                        message = messages.get(timeout=JOB_POLL_SECONDS)
+                    except queue.Empty:
+                        return JOB_FAILED, f"job process exited with code {process.exitcode}"
+                if message[0] == "event":
+                    replay([message[1]])
+                    continue
+                state, payload, snapshot = message
+                metrics.merge(snapshot)
+                return state, payload
+        finally:
+            process.join(timeout=JOB_POLL_SECONDS)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            messages.close()
+            with self.lock:
+                self.processes.pop(job.id, None)
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job_id]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self.lock:
+            processes = list(self.processes.values())
+        for process in processes:
+            process.kill()
@@ -1,8 +1,13 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import sys
+import json
+import asyncio
+from functools import partial
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,7 +15,9 @@ load_dotenv()
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 # from TestCase.testgenerator import generate_test_file
-from language_identifier.main import analyze_folder
+from language_identifier.metrics import render_prometheus
+from jobs import JobConflict, JobManager, JobQueueFull, output_subfolder, run_analysis
+from watches import WatchLimitReached, WatchManager
 
 app = FastAPI()
 
@@ -27,17 +34,171 @@ app.add_middleware(
 
 class FolderPathRequest(BaseModel):
     folderPath: str
+    jobs: Optional[int] = None
+    changedFiles: Optional[List[str]] = None
+    incremental: Optional[bool] = None
 
 output_folder=os.getenv("OUTPUT_FOLDER")
+default_jobs = int(os.getenv("JOBS", "1"))
+default_incremental = os.getenv("INCREMENTAL", "").lower() in ("1", "true", "yes")
 print(f"Output folder: {output_folder}")
 
-@app.post("/save-folder")
+_results_store = None
+
+
+def results_store():
+    """The run history database, opened on first use (SQLAlchemy is not imported at startup)."""
+    global _results_store
+    if _results_store is None:
+        from language_identifier.results_store import ResultsStore, default_database_url
+
+        _results_store = ResultsStore(default_database_url(output_folder or "tests"))
+    return _results_store
+
+
+job_manager = JobManager(
+    # Jobs run side by side, so run_analysis gives each folder its own output tree
+    partial(run_analysis, output_folder=output_folder or "tests"),
+    max_workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "16")),
+)
+
+def create_watcher(folder_path, **options):
+    # Imported on first use so the generator stack stays out of server startup
+    from sampletestcase.watcher import TestWatcher
+
+    # Apart from analysis jobs, which may run on the same folder meanwhile
+    return TestWatcher(folder_path, output_subfolder(os.path.join(output_folder or "tests", "watch"), folder_path),
+                       **options)
+
+
+watch_manager = WatchManager(
+    create_watcher,
+    max_watches=int(os.getenv("MAX_WATCHES", "4")),
+)
+
+
+@app.on_event("shutdown")
+def shutdown_jobs():
+    job_manager.shutdown()
+    watch_manager.shutdown()
+
+
+@app.post("/save-folder", status_code=202)
 async def save_folder_path(request: FolderPathRequest):
     folder_path = request.folderPath
     print(
         f"Folder path received: {folder_path}"
     )  # This will print the folder path to the terminal
-    analyze_folder(folder_path, output_folder)
-    # generate_test_file(folder_path)
-    print(f"Test case has been generated for: {folder_path}")
-    return {"message": f"Folder path '{folder_path}' saved successfully!"}
+    jobs = request.jobs if request.jobs is not None else default_jobs
+    incremental = request.incremental if request.incremental is not None else default_incremental
+    try:
+        job, created = job_manager.submit(
+            folder_path, jobs=jobs, changed_files=request.changedFiles, incremental=incremental,
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if created:
+        print(f"Queued job {job.id} for: {folder_path}")
+    else:
+        print(f"Folder already being analyzed, joined job {job.id}")
+    return {
+        "message": f"Folder path '{folder_path}' saved successfully!",
+        "job_id": job.id,
+        "state": job.state,
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events stream of a job's progress, ending with a 'job_done' event."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    async def event_stream():
+        last_seq = 0
+        while True:
+            done = job.done
+            for record in job.events_after(last_seq):
+                last_seq = record["seq"]
+                yield f"id: {last_seq}\nevent: {record['event']}\ndata: {json.dumps(record, default=str)}\n\n"
+            if done:
+                yield f"event: job_done\ndata: {json.dumps(job.to_dict(), default=str)}\n\n"
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Process-wide pipeline timers and counters in Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/watch", status_code=202)
+def start_watch(request: FolderPathRequest):
+    """Starts watching a folder; changed files get new tests and a test run."""
+    jobs = request.jobs if request.jobs is not None else default_jobs
+    try:
+        session, created = watch_manager.start(
+            request.folderPath, jobs=jobs, interval=float(os.getenv("WATCH_INTERVAL", "0.5"))
+        )
+    except WatchLimitReached as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    if created:
+        print(f"Watching {request.folderPath} as {session.id}")
+    return session.to_dict()
+
+
+@app.get("/watch")
+def list_watches():
+    return [session.to_dict() for session in watch_manager.list()]
+
+
+@app.get("/watch/{watch_id}")
+def get_watch(watch_id: str):
+    session = watch_manager.get(watch_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Watch '{watch_id}' not found")
+    return session.to_dict()
+
+
+@app.delete("/watch/{watch_id}")
+def stop_watch(watch_id: str):
+    session = watch_manager.stop(watch_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Watch '{watch_id}' not found")
+    return session.to_dict()
+
+
+@app.get("/results/latest")
+def latest_results(folderPath: str):
+    """The most recent stored run for a folder, with per-file, per-function and per-test results."""
+    run = results_store().latest_run(folderPath)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"No results recorded for '{folderPath}'")
+    return run
+
+
+@app.get("/results/trends")
+def results_trends(folderPath: str, limit: int = 20):
+    """Totals and coverage of the last `limit` runs for a folder, oldest first."""
+    return results_store().trends(folderPath, limit=max(1, min(limit, 500)))
+
+
+@app.get("/results/files")
+def file_results_history(path: str, limit: int = 20):
+    """Coverage history of one source file."""
+    return results_store().file_history(path, limit=max(1, min(limit, 500)))
@@ -0,0 +1,130 @@
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict, deque
+
+from language_identifier.metrics import MetricsRegistry, collect
+
+WATCH_STARTING = "starting"
+WATCH_RUNNING = "running"
+WATCH_STOPPED = "stopped"
+WATCH_FAILED = "failed"
+
+# Cycle summaries kept per watch for polling clients.
+MAX_CYCLES_PER_WATCH = 100
+
+
+class WatchLimitReached(Exception):
+    """Raised when the maximum number of folders is already being watched."""
+
+
+class WatchSession:
+    def __init__(self, folder_path, options):
+        self.id = uuid.uuid4().hex
+        self.folder_path = folder_path
+        self.options = options
+        self.state = WATCH_STARTING
+        self.error = None
+        self.started_at = time.time()
+        self.stopped_at = None
+        self.cycles = deque(maxlen=MAX_CYCLES_PER_WATCH)
+        self.metrics = MetricsRegistry()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def done(self):
+        return self.state in (WATCH_STOPPED, WATCH_FAILED)
+
+    def add_cycle(self, summary):
+        self.state = WATCH_RUNNING
+        self.cycles.append(summary)
+
+    def to_dict(self):
+        return {
+            "watch_id": self.id,
+            "folderPath": self.folder_path,
+            "state": self.state,
+            "error": self.error,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "last_cycle": self.cycles[-1] if self.cycles else None,
+            "cycles": len(self.cycles),
+            "metrics": self.metrics.snapshot(),
+        }
+
+
+class WatchManager:
+    """Hosts long-running watchers, one background thread per watched folder.
+
+    watcher_factory(folder_path, **options) must return an object with a
+    watch(stop_event, on_cycle) method, such as sampletestcase's TestWatcher.
+    Only the newest max_history stopped or failed sessions are kept.
+    """
+
+    def __init__(self, watcher_factory, max_watches=4, max_history=50):
+        self.watcher_factory = watcher_factory
+        self.max_watches = max_watches
+        self.max_history = max_history
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()
+        self.active_by_folder = {}
+
+    def start(self, folder_path, **options):
+        """Returns (session, created); created is False if the folder is already watched."""
+        key = os.path.normcase(os.path.abspath(folder_path))
+        with self.lock:
+            existing = self.active_by_folder.get(key)
+            if existing is not None:
+                return existing, False
+            if len(self.active_by_folder) >= self.max_watches:
+                raise WatchLimitReached(f"{len(self.active_by_folder)} folders are already being watched")
+            session = WatchSession(folder_path, options)
+            self.sessions[session.id] = session
+            self.active_by_folder[key] = session
+            self._trim_history()
+        session.thread = threading.Thread(
+            target=self._run, args=(session, key), name="intellico-watch", daemon=True
+        )
+        session.thread.start()
+        return session, True
+
+    def get(self, watch_id):
+        with self.lock:
+            return self.sessions.get(watch_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.sessions.values())
+
+    def stop(self, watch_id):
+        session = self.get(watch_id)
+        if session is not None:
+            session.stop_event.set()
+        return session
+
+    def _run(self, session, key):
+        try:
+            watcher = self.watcher_factory(session.folder_path, **session.options)
+            with collect(session.metrics):
+                watcher.watch(session.stop_event, on_cycle=session.add_cycle)
+            session.state = WATCH_STOPPED
+        except BaseException as e:
+            session.error = f"{e.__class__.__name__}: {e}"
+            session.state = WATCH_FAILED
+        finally:
+            session.stopped_at = time.time()
+            with self.lock:
+                if self.active_by_folder.get(key) is session:
+                    del self.active_by_folder[key]
+                self._trim_history()
+
+    def _trim_history(self):
+        finished = [watch_id for watch_id, session in self.sessions.items() if session.done]
+        for watch_id in finished[:max(0, len(self.sessions) - self.max_history)]:
+            del self.sessions[watch_id]
+
+    def shutdown(self):
+        for session in self.list():
+            session.stop_event.set()
@@ -0,0 +1,46 @@
+import os
+import sys
+import click
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+# Kept in sync with sampletestcase.watcher, which is only imported when the command runs
+DEFAULT_INTERVAL = 0.5
+DEFAULT_MAX_CACHED_FILES = 512
+
+
+def print_cycle(summary):
+    counts = summary["counts"]
+    status = (
+        f"{counts.get('passed', 0)} passed, {counts.get('failed', 0) + counts.get('error', 0)} failing"
+        if counts else "no tests run"
+    )
+    click.echo(
+        f"[{summary['cycle']}] {len(summary['changed'])} changed, {len(summary['removed'])} removed, "
+        f"{len(summary['affected'])} affected: {status} ({summary['seconds']}s)"
+    )
+
+
+@click.command()
+@click.argument('folder', type=click.Path(exists=True, file_okay=False))
+@click.option('--output', default='tests', help='Folder for the generated tests.')
+@click.option('--interval', default=DEFAULT_INTERVAL, help='Seconds between polls for changes.')
+@click.option('--jobs', default=1, help='Parallel test shards per run.')
+@click.option('--inputs', default=1, help='Argument vectors to try per function.')
+@click.option('--max-cached-files', default=DEFAULT_MAX_CACHED_FILES,
+              help='Parsed files and imported modules kept in memory.')
+@click.option('--no-run', is_flag=True, help='Only regenerate tests, do not run them.')
+def watch(folder, output, interval, jobs, inputs, max_cached_files, no_run):
+    """
+    Watch a folder and regenerate and re-run the tests of changed files.
+    """
+    from sampletestcase.watcher import TestWatcher
+
+    watcher = TestWatcher(
+        folder, output, interval=interval, jobs=jobs, inputs_per_function=inputs,
+        max_cached_files=max_cached_files, run_tests=not no_run,
+    )
+    try:
+        watcher.watch(on_cycle=print_cycle)
+    except KeyboardInterrupt:
+        click.echo("Stopped watching.")
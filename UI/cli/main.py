@@ -1,6 +1,7 @@
 import click
 from commands.run_script import run_script
 from commands.list_files import list_files
+from commands.watch import watch
 from fastapi import FastAPI
 
 app = FastAPI()
@@ -15,6 +16,7 @@ def cli():
 # Add the run_script command to the CLI
 cli.add_command(run_script)
 cli.add_command(list_files)
+cli.add_command(watch)
 
 @app.get("/")
 def read_root():
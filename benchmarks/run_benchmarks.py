@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import subprocess
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from benchmarks.synthetic_repo import SyntheticRepoConfig, generate_synthetic_repo
+from language_identifier.scanner import scan_repository
+from sampletestcase.test_case_generator import TestCaseGenerator, run_tests_and_generate_coverage
+from TestCase import testgenerator
+from TestCase.toolchain import NodeToolchain
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+@contextmanager
+def stubbed_node_toolchain():
+    """Replaces npm install and the Jest run with no-ops so only our own work is timed."""
+    original_install, original_run = NodeToolchain.npm_install, NodeToolchain.run_tests
+    NodeToolchain.npm_install = lambda self, cwd: None
+    NodeToolchain.run_tests = lambda self: subprocess.CompletedProcess(["npm", "test"], 0)
+    try:
+        yield
+    finally:
+        NodeToolchain.npm_install, NodeToolchain.run_tests = original_install, original_run
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(config, work_dir, jobs=1, run_coverage=True):
+    """Generates a synthetic repo in work_dir and times each pipeline phase."""
+    repo_dir = os.path.join(work_dir, "repo")
+    output_dir = os.path.join(work_dir, "tests")
+    js_root = os.path.join(work_dir, "node_root")
+    os.makedirs(js_root, exist_ok=True)
+    counts = generate_synthetic_repo(repo_dir, config)
+    timer = PhaseTimer()
+
+    with timer.phase("scan"):
+        scan = scan_repository(repo_dir)
+    batches = scan.batches()
+
+    test_dirs = []
+    python_dirs = batches.get("Python", [])
+    functions = 0
+    for folder_path in python_dirs:
+        # The real entry point, so --jobs and the pipelined parse/execute/write
+        # threads are what gets timed; those stages overlap and are not split out
+        generator = TestCaseGenerator(folder_path, output_dir, jobs=jobs)
+        with timer.phase("generate"):
+            generator.generate_tests_for_directory()
+        functions += generator.stats["functions_executed"]
+        test_dirs.append(generator.test_dir)
+
+    if run_coverage and test_dirs:
+        with timer.phase("coverage"):
+            run_tests_and_generate_coverage(
+                test_dirs, os.path.join(output_dir, ".coverage"), python_dirs, jobs
+            )
+
+    js_dirs = batches.get("JavaScript", []) + batches.get("JSX", [])
+    if js_dirs:
+        with stubbed_node_toolchain(), timer.phase("js_generate"):
+            testgenerator.generate_tests_for_directories(js_dirs, os.path.join(output_dir, "js"))
+            testgenerator.run_jest(js_root, output_dir)
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": jobs,
+        "config": config.to_dict(),
+        "counts": dict(counts, functions=functions, directories_scanned=len(scan.directories)),
+        "phases": {name: round(seconds, 4) for name, seconds in timer.phases.items()},
+        "total": round(sum(timer.phases.values()), 4),
+    }
+
+
+def compare(baseline, current):
+    """Prints per-phase deltas of current against a baseline result."""
+    print(f"{'phase':<14}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(set(baseline["phases"]) | set(current["phases"])):
+        before = baseline["phases"].get(name)
+        after = current["phases"].get(name)
+        change = f"{(after - before) / before * 100:+.1f}%" if before and after is not None else "n/a"
+        print(f"{name:<14}{before if before is not None else '-':>12}{after if after is not None else '-':>12}{change:>10}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the test generation pipeline on a synthetic repo")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--dirs-per-level", type=int, default=2)
+    parser.add_argument("--files-per-dir", type=int, default=5)
+    parser.add_argument("--functions-per-file", type=int, default=10)
+    parser.add_argument("--js-ratio", type=float, default=0.2)
+    parser.add_argument("--import-cost-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", "-j", type=int, default=1)
+    parser.add_argument("--no-coverage", action="store_true", help="Skip the test run and coverage phase")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated repo and tests")
+    args = parser.parse_args()
+
+    config = SyntheticRepoConfig(
+        depth=args.depth,
+        dirs_per_level=args.dirs_per_level,
+        files_per_dir=args.files_per_dir,
+        functions_per_file=args.functions_per_file,
+        js_ratio=args.js_ratio,
+        import_cost_ms=args.import_cost_ms,
+        seed=args.seed,
+    )
+    work_dir = tempfile.mkdtemp(prefix="intellico-bench-")
+    try:
+        results = run_benchmark(config, work_dir, jobs=args.jobs, run_coverage=not args.no_coverage)
+    finally:
+        if args.keep:
+            print(f"Benchmark files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results["phases"], indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
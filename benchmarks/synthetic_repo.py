@@ -0,0 +1,80 @@
+import os
+import random
+
+PYTHON_FUNCTION = '''
+def {name}(a, b):
+    """Synthetic function {index}."""
+    if a > b:
+        return a - b + {index}
+    for i in range(3):
+        b += i
+    return a * b
+'''
+
+JS_COMPONENT = '''import React from 'react';
+
+export default function {name}() {{
+  return <div className="{name}">{name}</div>;
+}}
+'''
+
+
+class SyntheticRepoConfig:
+    def __init__(self, depth=2, dirs_per_level=2, files_per_dir=5, functions_per_file=10,
+                 js_ratio=0.2, import_cost_ms=0.0, seed=0):
+        self.depth = depth
+        self.dirs_per_level = dirs_per_level
+        self.files_per_dir = files_per_dir
+        self.functions_per_file = functions_per_file
+        self.js_ratio = js_ratio
+        self.import_cost_ms = import_cost_ms
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def python_module_source(config, module_index):
+    lines = []
+    if config.import_cost_ms:
+        # Simulates expensive module-level work such as loading models or config
+        lines.append("import time")
+        lines.append(f"time.sleep({config.import_cost_ms / 1000.0!r})")
+    for index in range(config.functions_per_file):
+        lines.append(PYTHON_FUNCTION.format(name=f"func_{module_index}_{index}", index=index))
+    return "\n".join(lines) + "\n"
+
+
+def generate_synthetic_repo(root, config):
+    """Writes a synthetic repository under root and returns file counts by language.
+
+    Every directory holds files_per_dir files; a js_ratio share of the
+    directories are JavaScript component folders, the rest Python packages.
+    """
+    rng = random.Random(config.seed)
+    counts = {"python_files": 0, "js_files": 0, "directories": 0}
+    module_index = 0
+
+    def populate(directory, level):
+        nonlocal module_index
+        os.makedirs(directory, exist_ok=True)
+        counts["directories"] += 1
+        is_js = rng.random() < config.js_ratio
+        for file_index in range(config.files_per_dir):
+            module_index += 1
+            if is_js:
+                name = f"Component{module_index}"
+                with open(os.path.join(directory, f"{name}.jsx"), "w") as f:
+                    f.write(JS_COMPONENT.format(name=name))
+                counts["js_files"] += 1
+            else:
+                with open(os.path.join(directory, f"module_{module_index}.py"), "w") as f:
+                    f.write(python_module_source(config, module_index))
+                counts["python_files"] += 1
+        if level < config.depth:
+            for _ in range(config.dirs_per_level):
+                # Unique names, since generated test folders are named after the leaf directory
+                populate(os.path.join(directory, f"pkg_{counts['directories']}"), level + 1)
+
+    populate(root, 0)
+    return counts
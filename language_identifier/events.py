@@ -0,0 +1,71 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Global listeners see every event; a sink bound with capture() only sees the
+# events emitted from its own context (one job, one thread).
+_listeners = []
+_listeners_lock = threading.Lock()
+_current_sink = contextvars.ContextVar("intellico_event_sink", default=None)
+
+
+def emit(event, **fields):
+    """Publishes a pipeline progress event.
+
+    Costs one context-variable lookup when nobody is listening, so call
+    sites can stay in place in production.
+    """
+    sink = _current_sink.get()
+    if sink is None and not _listeners:
+        return
+    record = {"event": event, "time": time.time()}
+    record.update(fields)
+    if sink is not None:
+        sink(record)
+    for listener in _listeners:
+        listener(record)
+
+
+def subscribe(listener):
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def replay(records):
+    """Re-publishes records captured elsewhere, e.g. in a worker process."""
+    sink = _current_sink.get()
+    if sink is None and not _listeners:
+        return
+    for record in records:
+        if sink is not None:
+            sink(record)
+        for listener in _listeners:
+            listener(record)
+
+
+@contextmanager
+def capture(sink):
+    """Routes events emitted in the current context to sink.
+
+    Captures nest: events also still reach any sink bound further out.
+    """
+    outer = _current_sink.get()
+    if outer is not None:
+        inner = sink
+
+        def sink(record):
+            inner(record)
+            outer(record)
+
+    token = _current_sink.set(sink)
+    try:
+        yield
+    finally:
+        _current_sink.reset(token)
@@ -1,5 +1,7 @@
 import sys
 import os
+import time
+from contextlib import nullcontext
 
 # from dotenv import load_dotenv
 
@@ -7,109 +9,143 @@ import os
 # folder_name = os.getenv("FOLDER_NAME")
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-print("Python Path:", sys.path)
-print("Current Working Directory:", os.getcwd())
-
-from TestCase.testgenerator import generate_and_run_test
-from sampletestcase.test_case_generator import TestCaseGenerator
-
-from collections import Counter
+from language_identifier.registry import REGISTRY
+from language_identifier.scanner import scan_repository
+from language_identifier.events import capture, emit
+from language_identifier import metrics
 
 # output_folder = os.getenv("OUTPUT_FOLDER", "tests")
 
 
-# Middleware functions
-def python_middleware(folder_path, output_folder):
-    print(f"Processing folder '{folder_path}' with Python middleware...")
-    # folder_name = os.path.basename(folder_path)
-    generator = TestCaseGenerator(folder_path, output_folder)
-    generator.run()
-
-
-def javascript_middleware(folder_path, output_folder):
-    print(f"Processing folder '{folder_path}' with JavaScript middleware...")
-    # Identify JavaScript files in the folder
-    generate_and_run_test(folder_path, output_folder)
-    # for root, _, files in os.walk(folder_path):
-    #     for file in files:
-    #         if file.endswith(".js"):
-    #             js_file_path = os.path.join(root, file)
-    #             print(f"Found JavaScript file: {js_file_path}")
-    #             # Generate tests for the JavaScript file
-    #             generate_test_file(js_file_path, output_folder)
-
-
-def jsx_middleware(folder_path, output_folder):
-    print(f"Processing folder '{folder_path}' with JSX middleware...")
-    # Identify JavaScript files in the folder
-    generate_and_run_test(folder_path, output_folder)
-    # for root, _, files in os.walk(folder_path):
-    #     for file in files:
-    #         if file.endswith(".jsx"):
-    #             js_file_path = os.path.join(root, file)
-    #             print(f"Found JSX file: {js_file_path}")
-    #             # Generate tests for the JavaScript file
-    #             generate_test_file(js_file_path, output_folder)
-
-
-def unknown_middleware(folder_path, output_folder):
-    print(f"Processing folder '{folder_path}' with Unknown middleware...")
-
-
-# Map languages to middleware
-def call_middleware(language, folder_path, output_folder):
-    middleware_map = {
-        "Python": python_middleware,
-        "JavaScript": javascript_middleware,
-        "JSX": jsx_middleware,
-        "Unknown": unknown_middleware,
-    }
-    middleware = middleware_map.get(language, unknown_middleware)
-    middleware(folder_path, output_folder)
-
-
-# Identify the folder's dominant language
-def predict_folder_language(file_language_counts):
-    return (
-        file_language_counts.most_common(1)[0][0] if file_language_counts else "Unknown"
-    )
+# Dispatch to the registered middleware; it is imported the first time its language is seen
+def call_middleware(language, folder_paths, output_folder, **options):
+    with metrics.timer(f"middleware_{language.lower()}"):
+        return REGISTRY.dispatch(language, folder_paths, output_folder, **options)
 
 
 # Main function
-def analyze_folder(folder_path, output_folder):
+def analyze_folder(folder_path, output_folder, jobs=1, changed_files=None, inputs_per_function=1, search_budget=0.0,
+                   coverage_target=1.0, shard=None, incremental=False):
+    """Scans folder_path and runs each language's middleware on its folders.
+
+    shard, an (index, count) pair, processes only that slice of the files
+    and leaves a shard artifact in output_folder for sharding.merge_artifacts.
+    coverage_target is the fraction of a function's lines at which input
+    search stops early. incremental skips Python files whose source and
+    imports are unchanged since their tests were last generated.
+    Raises NotADirectoryError if folder_path is not a directory.
+    """
     if not os.path.isdir(folder_path):
-        print(f"The provided path '{folder_path}' is not a valid directory.")
-        return
-
-    print(f"Analyzing directory: {folder_path}\n")
-
-    for root, _, files in os.walk(folder_path):
-        print(f"Current directory: {root}")
-        file_language_counts = Counter()
-
-        for file in files:
-            file_extension = os.path.splitext(file)[1]
-            if file_extension == ".py":
-                file_language_counts["Python"] += 1
-            elif file_extension == ".js":
-                file_language_counts["JavaScript"] += 1
-            elif file_extension == ".jsx":
-                file_language_counts["JSX"] += 1
-
-        print(f"Relevant file counts in {root}: {dict(file_language_counts)}")
+        raise NotADirectoryError(f"The provided path '{folder_path}' is not a valid directory.")
+
+    started_at = time.time()
+    if shard is not None:
+        from language_identifier.sharding import Shard
+
+        shard = Shard(shard[0], shard[1], folder_path)
+        print(f"Analyzing shard {shard.label()} of directory: {folder_path}\n")
+    else:
+        print(f"Analyzing directory: {folder_path}\n")
+
+    with metrics.timer("scan"):
+        scan = scan_repository(folder_path, language_by_extension=REGISTRY.extension_map())
+    metrics.incr("directories_scanned", len(scan.directories))
+    metrics.incr("files_scanned", scan.files_scanned)
+    for directory in scan.directories:
+        print(f"Relevant file counts in {directory.path}: {dict(directory.language_counts)}")
+        print(f"Predicted language for folder '{directory.path}': {directory.language()}")
+        emit(
+            "directory_scanned",
+            directory=directory.path,
+            language=directory.language(),
+            counts=dict(directory.language_counts),
+        )
+    print(
+        f"\nScanned {len(scan.directories)} directories and {scan.files_scanned} files "
+        f"({scan.entries_ignored} ignored entries)\n"
+    )
 
-        # Predict folder language
-        folder_language = predict_folder_language(file_language_counts)
-        print(f"Predicted language for folder '{root}': {folder_language}\n")
+    # Call each middleware once with its whole batch
+    batches = scan.batches()
+    results = {}
+    events = []
+    # A shard keeps its events so the merged run can be recorded as one
+    with capture(events.append) if shard is not None else nullcontext():
+        for language, folder_paths in batches.items():
+            results[language] = call_middleware(
+                language, folder_paths, output_folder,
+                jobs=jobs, changed_files=changed_files, inputs_per_function=inputs_per_function,
+                search_budget=search_budget, coverage_target=coverage_target, shard=shard, root=folder_path,
+                incremental=incremental,
+            )
+
+    summary = {
+        "folder": folder_path,
+        "output_folder": output_folder,
+        "directories_scanned": len(scan.directories),
+        "files_scanned": scan.files_scanned,
+        "languages": {language: len(folder_paths) for language, folder_paths in batches.items()},
+        "results": {language: result for language, result in results.items() if result is not None},
+    }
+    if shard is not None:
+        from language_identifier.sharding import write_artifact
 
-        # Call middleware
-        call_middleware(folder_language, root, output_folder)
+        summary["shard"] = [shard.index, shard.count]
+        print(f"Wrote shard artifact {write_artifact(output_folder, shard, summary, events, started_at)}")
+    return summary
 
 
 if __name__ == "__main__":
-    folder_path = input("Enter the folder path to analyze: ").strip()
-    output_folder = (
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze a folder and generate tests")
+    parser.add_argument("--jobs", "-j", type=int, default=int(os.getenv("JOBS", "1")),
+                        help="Worker processes for Python test generation (0 = one per CPU)")
+    parser.add_argument("--changed", nargs="*", default=None,
+                        help="Only regenerate and run tests affected by these files")
+    parser.add_argument("--record", action="store_true",
+                        help="Store this run in the results database (INTELLICO_RESULTS_DB or the output folder)")
+    parser.add_argument("--inputs", type=int, default=int(os.getenv("INPUTS_PER_FUNCTION", "1")),
+                        help="Argument vectors to try per Python function (above 1 emits table-driven tests)")
+    parser.add_argument("--search-budget", type=float, default=float(os.getenv("SEARCH_BUDGET", "0")),
+                        help="Seconds of coverage-guided input search per Python function (0 = off)")
+    parser.add_argument("--coverage-target", type=float, default=float(os.getenv("COVERAGE_TARGET", "1.0")),
+                        help="Fraction of a Python function's lines at which input search stops early")
+    parser.add_argument("--shard", default=os.getenv("SHARD"),
+                        help="Process only shard i of n (e.g. 2/4) and write a shard artifact to the output folder")
+    parser.add_argument("--incremental", action="store_true",
+                        default=os.getenv("INCREMENTAL", "").lower() in ("1", "true", "yes"),
+                        help="Skip Python files whose source and imports are unchanged since the last run")
+    parser.add_argument("--folder", help="Folder to analyze (asked for when omitted)")
+    parser.add_argument("--output", help="Output folder for test files (asked for when omitted)")
+    cli_args = parser.parse_args()
+    shard = None
+    if cli_args.shard:
+        from language_identifier.sharding import parse_shard
+
+        try:
+            shard = parse_shard(cli_args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
+    folder_path = cli_args.folder or input("Enter the folder path to analyze: ").strip()
+    output_folder = cli_args.output or (
         input("Enter the output folder for test files (default: tests): ").strip()
         or "tests"
     )
-    analyze_folder(folder_path, output_folder)
+    options = dict(
+        jobs=cli_args.jobs, changed_files=cli_args.changed, inputs_per_function=cli_args.inputs,
+        search_budget=cli_args.search_budget, coverage_target=cli_args.coverage_target, shard=shard,
+        incremental=cli_args.incremental,
+    )
+    try:
+        if cli_args.record:
+            from language_identifier.results_store import ResultsStore, default_database_url, record_analysis
+
+            store = ResultsStore(default_database_url(output_folder))
+            record_analysis(store, analyze_folder, folder_path, output_folder, **options)
+        else:
+            analyze_folder(folder_path, output_folder, **options)
+    except NotADirectoryError as e:
+        print(e)
+        sys.exit(1)
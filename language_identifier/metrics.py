@@ -0,0 +1,114 @@
+import re
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+
+class MetricsRegistry:
+    """Thread-safe counters and timers for one scope (the process or a single job)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}
+
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self.lock:
+            count, total, longest = self.timers.get(name, (0, 0.0, 0.0))
+            self.timers[name] = (count + 1, total + seconds, max(longest, seconds))
+
+    def merge(self, snapshot):
+        """Adds the counters and timers of another registry's snapshot, e.g. from a worker process."""
+        with self.lock:
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, timer in snapshot["timers"].items():
+                count, total, longest = self.timers.get(name, (0, 0.0, 0.0))
+                self.timers[name] = (
+                    count + timer["count"], total + timer["seconds"], max(longest, timer["max_seconds"])
+                )
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {
+                    name: {"count": count, "seconds": round(total, 6), "max_seconds": round(longest, 6)}
+                    for name, (count, total, longest) in self.timers.items()
+                },
+            }
+
+    def render_prometheus(self, prefix="intellico_"):
+        """Renders the registry in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f"{prefix}{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, timer in sorted(snapshot["timers"].items()):
+            metric = f"{prefix}{_metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            lines.append(f"{metric}_count {timer['count']}")
+            lines.append(f"{metric}_sum {timer['seconds']}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            lines.append(f"{metric}_max {timer['max_seconds']}")
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+# Process-wide totals, plus an optional per-job registry bound with collect().
+REGISTRY = MetricsRegistry()
+_scoped_registry = contextvars.ContextVar("intellico_metrics", default=None)
+
+
+def incr(name, value=1):
+    REGISTRY.incr(name, value)
+    scoped = _scoped_registry.get()
+    if scoped is not None:
+        scoped.incr(name, value)
+
+
+def observe(name, seconds):
+    REGISTRY.observe(name, seconds)
+    scoped = _scoped_registry.get()
+    if scoped is not None:
+        scoped.observe(name, seconds)
+
+
+def merge(snapshot):
+    REGISTRY.merge(snapshot)
+    scoped = _scoped_registry.get()
+    if scoped is not None:
+        scoped.merge(snapshot)
+
+
+@contextmanager
+def timer(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+@contextmanager
+def collect(registry):
+    """Also records metrics from the current context into registry."""
+    token = _scoped_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _scoped_registry.reset(token)
+
+
+def render_prometheus():
+    return REGISTRY.render_prometheus()
@@ -0,0 +1,22 @@
+from TestCase.testgenerator import generate_and_run_tests
+
+
+# Each receives every directory of its language from one scan, so npm and
+# Jest are set up once per run. Sharded runs split them by whole folders.
+# root is the scanned folder, which the generated tests' layout mirrors.
+def javascript_middleware(folder_paths, output_folder, shard=None, root=None, **options):
+    if shard is not None:
+        folder_paths = shard.select(folder_paths)
+        if not folder_paths:
+            return
+    print(f"Processing {len(folder_paths)} folder(s) with JavaScript middleware...")
+    generate_and_run_tests(folder_paths, output_folder, root)
+
+
+def jsx_middleware(folder_paths, output_folder, shard=None, root=None, **options):
+    if shard is not None:
+        folder_paths = shard.select(folder_paths)
+        if not folder_paths:
+            return
+    print(f"Processing {len(folder_paths)} folder(s) with JSX middleware...")
+    generate_and_run_tests(folder_paths, output_folder, root)
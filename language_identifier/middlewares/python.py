@@ -0,0 +1,82 @@
+import os
+
+from sampletestcase.test_case_generator import (
+    GenerationOptions,
+    TestCaseGenerator,
+    generated_test_dir,
+    generated_test_path,
+    run_tests_and_generate_coverage,
+)
+from sampletestcase.import_graph import build_import_graph, affected_files
+from sampletestcase.suite_runner import update_coverage_data
+
+# Coverage of a --changed run, folded into the full run's .coverage afterwards
+PARTIAL_COVERAGE_FILE = ".coverage-partial"
+
+
+# Receives every Python directory of one scan, so coverage runs once per run.
+def python_middleware(folder_paths, output_folder, jobs=1, changed_files=None, inputs_per_function=1,
+                      search_budget=0.0, coverage_target=1.0, shard=None, incremental=False, **options):
+    print(f"Processing {len(folder_paths)} folder(s) with Python middleware...")
+    selected = None
+    deleted = []
+    if changed_files is not None:
+        deleted = sorted({
+            os.path.abspath(path) for path in changed_files if path.endswith(".py") and not os.path.exists(path)
+        })
+    # Before the folder filter below: a folder may have nothing left to regenerate
+    for path in deleted:
+        test_file = generated_test_path(generated_test_dir(output_folder, os.path.dirname(path)), path)
+        if os.path.exists(test_file):
+            os.remove(test_file)
+            print(f"Removed {test_file}: {path} was deleted")
+    if changed_files is not None or shard is not None:
+        python_files = [
+            os.path.abspath(os.path.join(folder_path, name))
+            for folder_path in folder_paths
+            for name in os.listdir(folder_path)
+            if name.endswith(".py")
+        ]
+    if changed_files is not None:
+        # Only regenerate and re-run what the change can reach through imports
+        selected = affected_files(build_import_graph(python_files), changed_files)
+        print(f"{len(selected)} Python file(s) affected by {len(changed_files)} change(s)")
+    if shard is not None:
+        # __init__ files get no tests, so they do not count towards a shard's load
+        candidates = [path for path in python_files if not os.path.basename(path).startswith("__init__")]
+        shard_files = set(shard.select(candidates))
+        print(f"Shard {shard.label()}: {len(shard_files)} of {len(candidates)} Python file(s)")
+        selected = shard_files if selected is None else set(selected) & shard_files
+
+    generation_options = GenerationOptions(
+        inputs_per_function=inputs_per_function, search_budget=search_budget, coverage_target=coverage_target,
+    )
+    test_dirs = []
+    test_modules = []
+    for folder_path in folder_paths:
+        only_files = None
+        if selected is not None:
+            folder = os.path.abspath(folder_path)
+            only_files = sorted(path for path in selected if os.path.dirname(path) == folder)
+            if not only_files:
+                continue
+        # folder_name = os.path.basename(folder_path)
+        generator = TestCaseGenerator(
+            folder_path, output_folder, generation_options, incremental=incremental, jobs=jobs
+        )
+        generator.generate_tests_for_directory(only_files)
+        test_dirs.append(generator.test_dir)
+        if only_files is not None:
+            test_modules.extend(generator.test_file_path(path) for path in only_files)
+    coverage_file = os.path.join(output_folder, ".coverage")
+    if changed_files is None or shard is not None:
+        # A shard's output folder holds that shard alone; sharding merges the shards' data
+        return run_tests_and_generate_coverage(
+            test_dirs, coverage_file, folder_paths, jobs, test_modules if selected is not None else None,
+        )
+    partial_file = os.path.join(output_folder, PARTIAL_COVERAGE_FILE)
+    results = run_tests_and_generate_coverage(test_dirs, partial_file, folder_paths, jobs, test_modules)
+    results["partial_coverage"] = results["coverage"]
+    results["coverage"] = update_coverage_data(coverage_file, partial_file, sorted(set(selected) | set(deleted)))
+    print(f"Coverage of the whole run: {results['coverage']['percent']}%")
+    return results
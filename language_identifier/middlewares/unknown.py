@@ -0,0 +1,2 @@
+def unknown_middleware(folder_paths, output_folder, **options):
+    print(f"Skipping {len(folder_paths)} folder(s) with Unknown middleware...")
@@ -0,0 +1,96 @@
+import importlib
+import threading
+from importlib.metadata import entry_points
+
+# Third-party packages register languages by exposing a callable in this
+# entry point group; it is called with the registry:
+#
+#   [project.entry-points."intellico.languages"]
+#   rust = "intellico_rust:register"
+#
+#   def register(registry):
+#       registry.register("Rust", "intellico_rust.middleware:rust_middleware", [".rs"])
+ENTRY_POINT_GROUP = "intellico.languages"
+
+UNKNOWN_LANGUAGE = "Unknown"
+
+
+class MiddlewareSpec:
+    """A registered language: its middleware target and the file extensions it claims."""
+
+    def __init__(self, language, target, extensions=()):
+        self.language = language
+        self.target = target
+        self.extensions = tuple(extensions)
+        self.middleware = None if isinstance(target, str) else target
+
+    def load(self):
+        """Imports the middleware on first use; target is 'module:function' or a callable."""
+        if self.middleware is None:
+            module_name, _, attribute = self.target.partition(":")
+            self.middleware = getattr(importlib.import_module(module_name), attribute)
+        return self.middleware
+
+
+class MiddlewareRegistry:
+    """Maps languages and file extensions to middlewares that are imported lazily.
+
+    Registering a middleware only records its import path, so importing the
+    registry never pulls in a language's generator or its dependencies.
+    Entry point plugins are discovered the first time the registry is queried.
+    """
+
+    def __init__(self, entry_point_group=ENTRY_POINT_GROUP):
+        self.entry_point_group = entry_point_group
+        self.specs = {}
+        self.lock = threading.Lock()
+        self.plugins_loaded = entry_point_group is None
+
+    def register(self, language, target, extensions=()):
+        self.specs[language] = MiddlewareSpec(language, target, extensions)
+
+    def load_plugins(self):
+        with self.lock:
+            if self.plugins_loaded:
+                return
+            self.plugins_loaded = True
+        for entry_point in entry_points(group=self.entry_point_group):
+            try:
+                entry_point.load()(self)
+            except Exception as e:
+                print(f"Skipping language plugin {entry_point.name!r}: {e.__class__.__name__}: {e}")
+
+    def languages(self):
+        self.load_plugins()
+        return list(self.specs)
+
+    def extension_map(self):
+        """{extension: language} over every registered language, for the scanner."""
+        self.load_plugins()
+        return {
+            extension: spec.language
+            for spec in self.specs.values()
+            for extension in spec.extensions
+        }
+
+    def middleware_for(self, language):
+        self.load_plugins()
+        spec = self.specs.get(language) or self.specs.get(UNKNOWN_LANGUAGE)
+        if spec is None:
+            raise KeyError(f"No middleware registered for {language!r}")
+        with self.lock:
+            return spec.load()
+
+    def dispatch(self, language, folder_paths, output_folder, **options):
+        return self.middleware_for(language)(folder_paths, output_folder, **options)
+
+
+REGISTRY = MiddlewareRegistry()
+REGISTRY.register("Python", "language_identifier.middlewares.python:python_middleware", [".py"])
+REGISTRY.register("JavaScript", "language_identifier.middlewares.javascript:javascript_middleware", [".js"])
+REGISTRY.register("JSX", "language_identifier.middlewares.javascript:jsx_middleware", [".jsx"])
+REGISTRY.register(UNKNOWN_LANGUAGE, "language_identifier.middlewares.unknown:unknown_middleware")
+
+
+def register(language, target, extensions=()):
+    REGISTRY.register(language, target, extensions)
@@ -0,0 +1,297 @@
+import os
+import time
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    create_engine,
+    event,
+    select,
+)
+from sqlalchemy.orm import Session, declarative_base, relationship
+
+from language_identifier.events import capture
+
+DATABASE_FILE_NAME = "intellico_results.db"
+
+Base = declarative_base()
+
+
+class Run(Base):
+    __tablename__ = "runs"
+
+    id = Column(Integer, primary_key=True)
+    folder = Column(String, nullable=False)
+    output_folder = Column(String)
+    status = Column(String, nullable=False)
+    error = Column(Text)
+    started_at = Column(Float, nullable=False)
+    finished_at = Column(Float)
+    seconds = Column(Float)
+    directories_scanned = Column(Integer)
+    files_scanned = Column(Integer)
+    languages = Column(JSON)
+    tests_run = Column(Integer, default=0)
+    passed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    coverage_percent = Column(Float)
+
+    files = relationship("FileResult", back_populates="run", cascade="all, delete-orphan")
+    functions = relationship("FunctionResult", back_populates="run", cascade="all, delete-orphan")
+    tests = relationship("TestResult", back_populates="run", cascade="all, delete-orphan")
+
+    __table_args__ = (Index("ix_runs_folder_started", "folder", "started_at"),)
+
+
+class FileResult(Base):
+    __tablename__ = "file_results"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    path = Column(String, nullable=False)
+    language = Column(String)
+    test_file = Column(String)
+    functions_executed = Column(Integer)
+    coverage_percent = Column(Float)
+
+    run = relationship("Run", back_populates="files")
+
+    __table_args__ = (Index("ix_file_results_path_run", "path", "run_id"),)
+
+
+class FunctionResult(Base):
+    __tablename__ = "function_results"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_path = Column(String, nullable=False)
+    function = Column(String, nullable=False)
+    lineno = Column(Integer)
+    outcome = Column(String)
+    inputs = Column(Integer)
+    seconds = Column(Float)
+    complexity = Column(Integer)
+
+    run = relationship("Run", back_populates="functions")
+
+    __table_args__ = (Index("ix_function_results_path_run", "file_path", "run_id"),)
+
+
+class TestResult(Base):
+    __tablename__ = "test_results"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    test_id = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    message = Column(Text)
+    seconds = Column(Float)
+
+    run = relationship("Run", back_populates="tests")
+
+
+def default_database_url(output_folder):
+    """INTELLICO_RESULTS_DB if set, else a SQLite file in the output folder."""
+    url = os.getenv("INTELLICO_RESULTS_DB")
+    if url:
+        return url
+    os.makedirs(output_folder, exist_ok=True)
+    return f"sqlite:///{os.path.abspath(os.path.join(output_folder, DATABASE_FILE_NAME))}"
+
+
+class RunRecorder:
+    """Event sink that collects per-file and per-function results during one run."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.files = {}
+        self.functions = {}
+
+    def __call__(self, record):
+        name = record.get("event")
+        if name == "file_generated":
+            self.files[record["file"]] = record
+        elif name in ("function_executed", "function_analyzed"):
+            key = (record.get("file"), record.get("lineno"), record.get("function"))
+            self.functions.setdefault(key, {}).update(record)
+
+
+class ResultsStore:
+    """SQLAlchemy-backed history of runs, files, functions, tests and coverage."""
+
+    def __init__(self, url):
+        self.engine = create_engine(url)
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", _enable_sqlite_foreign_keys)
+        Base.metadata.create_all(self.engine)
+
+    def record_run(self, folder, output_folder, summary, recorder, status="succeeded", error=None):
+        """Stores one analyze_folder run; summary is its return value (None on failure).
+
+        Returns the new run id.
+        """
+        finished_at = time.time()
+        summary = summary or {}
+        python = (summary.get("results") or {}).get("Python") or {}
+        counts = python.get("counts", {})
+        coverage = python.get("coverage") or {}
+        coverage_files = coverage.get("files", {})
+
+        run = Run(
+            folder=os.path.abspath(folder),
+            output_folder=output_folder,
+            status=status,
+            error=error,
+            started_at=recorder.started_at,
+            finished_at=finished_at,
+            seconds=round(finished_at - recorder.started_at, 3),
+            directories_scanned=summary.get("directories_scanned"),
+            files_scanned=summary.get("files_scanned"),
+            languages=summary.get("languages"),
+            tests_run=python.get("tests_run", 0),
+            passed=counts.get("passed", 0),
+            failed=counts.get("failed", 0),
+            errors=counts.get("error", 0),
+            skipped=counts.get("skipped", 0),
+            coverage_percent=coverage.get("percent"),
+        )
+        functions_by_file = {}
+        for (file_path, lineno, function), record in recorder.functions.items():
+            file_path = os.path.abspath(file_path) if file_path else ""
+            functions_by_file[file_path] = functions_by_file.get(file_path, 0) + 1
+            run.functions.append(FunctionResult(
+                file_path=file_path,
+                function=function,
+                lineno=lineno,
+                outcome=record.get("outcome"),
+                inputs=record.get("inputs", 1),
+                seconds=record.get("seconds"),
+                complexity=record.get("complexity"),
+            ))
+        generated_files = {os.path.abspath(path): record for path, record in recorder.files.items()}
+        for path in sorted(set(generated_files) | set(coverage_files)):
+            generated = generated_files.get(path, {})
+            run.files.append(FileResult(
+                path=path,
+                language="Python",
+                test_file=generated.get("test_file"),
+                functions_executed=functions_by_file.get(path),
+                coverage_percent=coverage_files.get(path),
+            ))
+        for test in python.get("tests", []):
+            run.tests.append(TestResult(
+                test_id=test["id"], status=test["status"], message=test.get("message"), seconds=test.get("seconds"),
+            ))
+
+        with Session(self.engine) as session:
+            session.add(run)
+            session.commit()
+            return run.id
+
+    def latest_run(self, folder):
+        """The most recent run for folder with its files, functions and tests, or None."""
+        with Session(self.engine) as session:
+            run = session.scalars(
+                select(Run).where(Run.folder == os.path.abspath(folder)).order_by(Run.started_at.desc()).limit(1)
+            ).first()
+            if run is None:
+                return None
+            result = _run_to_dict(run)
+            result["files"] = [
+                {
+                    "path": file.path,
+                    "language": file.language,
+                    "test_file": file.test_file,
+                    "functions_executed": file.functions_executed,
+                    "coverage_percent": file.coverage_percent,
+                }
+                for file in run.files
+            ]
+            result["functions"] = [
+                {
+                    "file": function.file_path,
+                    "function": function.function,
+                    "lineno": function.lineno,
+                    "outcome": function.outcome,
+                    "inputs": function.inputs,
+                    "seconds": function.seconds,
+                    "complexity": function.complexity,
+                }
+                for function in run.functions
+            ]
+            result["tests"] = [
+                {"id": test.test_id, "status": test.status, "message": test.message, "seconds": test.seconds}
+                for test in run.tests
+            ]
+            return result
+
+    def trends(self, folder, limit=20):
+        """Per-run totals for folder, oldest first, over the last `limit` runs."""
+        with Session(self.engine) as session:
+            runs = session.scalars(
+                select(Run).where(Run.folder == os.path.abspath(folder)).order_by(Run.started_at.desc()).limit(limit)
+            ).all()
+            return [_run_to_dict(run) for run in reversed(runs)]
+
+    def file_history(self, path, limit=20):
+        """Coverage of one source file across its last `limit` runs, oldest first."""
+        with Session(self.engine) as session:
+            rows = session.execute(
+                select(FileResult.coverage_percent, FileResult.functions_executed, Run.id, Run.started_at)
+                .join(Run)
+                .where(FileResult.path == os.path.abspath(path))
+                .order_by(Run.started_at.desc())
+                .limit(limit)
+            ).all()
+            return [
+                {"run_id": run_id, "started_at": started_at, "coverage_percent": percent, "functions_executed": functions}
+                for percent, functions, run_id, started_at in reversed(rows)
+            ]
+
+
+def record_analysis(store, analyze, folder_path, output_folder, **options):
+    """Runs analyze(folder_path, output_folder, **options) and stores its results.
+
+    Failed runs are stored too, with their error, before the exception propagates.
+    """
+    recorder = RunRecorder()
+    try:
+        with capture(recorder):
+            summary = analyze(folder_path, output_folder, **options)
+    except BaseException as e:
+        store.record_run(folder_path, output_folder, None, recorder, "failed", f"{e.__class__.__name__}: {e}")
+        raise
+    store.record_run(folder_path, output_folder, summary, recorder)
+    return summary
+
+
+def _enable_sqlite_foreign_keys(connection, _record):
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _run_to_dict(run):
+    return {
+        "run_id": run.id,
+        "folder": run.folder,
+        "status": run.status,
+        "error": run.error,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "seconds": run.seconds,
+        "directories_scanned": run.directories_scanned,
+        "files_scanned": run.files_scanned,
+        "languages": run.languages,
+        "tests_run": run.tests_run,
+        "counts": {"passed": run.passed, "failed": run.failed, "error": run.errors, "skipped": run.skipped},
+        "coverage_percent": run.coverage_percent,
+    }
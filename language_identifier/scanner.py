@@ -0,0 +1,185 @@
+import os
+import fnmatch
+from collections import Counter
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "Python",
+    ".js": "JavaScript",
+    ".jsx": "JSX",
+}
+
+# Always skipped, in .gitignore syntax, whether or not the repo ignores them.
+DEFAULT_IGNORES = [
+    ".git/",
+    "node_modules/",
+    "__pycache__/",
+    ".venv/",
+    "venv/",
+    ".tox/",
+    ".nox/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    ".ipynb_checkpoints/",
+    "*.egg-info/",
+]
+
+
+class IgnoreRule:
+    """One .gitignore line, relative to the directory that declared it."""
+
+    def __init__(self, pattern, base_dir):
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # A slash anywhere but the end anchors the pattern to base_dir.
+        self.anchored = "/" in pattern
+        self.pattern = pattern.lstrip("/")
+        self.base_dir = base_dir
+
+    def matches(self, rel_path, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.base_dir:
+            if not rel_path.startswith(self.base_dir + "/"):
+                return False
+            rel_path = rel_path[len(self.base_dir) + 1:]
+        if self.anchored:
+            return fnmatch.fnmatchcase(rel_path, self.pattern)
+        return fnmatch.fnmatchcase(rel_path.rsplit("/", 1)[-1], self.pattern)
+
+
+def parse_ignore_lines(lines, base_dir=""):
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        rules.append(IgnoreRule(line, base_dir))
+    return rules
+
+
+def load_ignore_file(path, base_dir):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return parse_ignore_lines(f, base_dir)
+    except OSError:
+        return []
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """Applies rules in order; the last matching rule wins, as in git."""
+    ignored = False
+    for rule in rules:
+        if rule.matches(rel_path, is_dir):
+            ignored = not rule.negated
+    return ignored
+
+
+# Identify the folder's dominant language
+def predict_folder_language(file_language_counts):
+    return (
+        file_language_counts.most_common(1)[0][0] if file_language_counts else "Unknown"
+    )
+
+
+class ScannedDirectory:
+    def __init__(self, path):
+        self.path = path
+        self.language_counts = Counter()
+
+    def language(self):
+        return predict_folder_language(self.language_counts)
+
+
+class ScanResult:
+    def __init__(self, root):
+        self.root = root
+        self.directories = []
+        self.files_scanned = 0
+        self.entries_ignored = 0
+
+    def batches(self):
+        """Maps each language to the directories it dominates, in scan order."""
+        batches = {}
+        for directory in self.directories:
+            batches.setdefault(directory.language(), []).append(directory.path)
+        return batches
+
+
+def scan_repository(root, extra_ignores=None, ignore_file_name=".gitignore", language_by_extension=None):
+    """Classifies every directory under root in a single os.scandir pass.
+
+    Directories excluded by DEFAULT_IGNORES, extra_ignores or any
+    .gitignore-style file found along the way are not descended into.
+    Virtualenvs are recognised by their pyvenv.cfg and skipped as well.
+    language_by_extension overrides LANGUAGE_BY_EXTENSION, e.g. with the
+    extensions of registered language plugins.
+    """
+    language_by_extension = language_by_extension or LANGUAGE_BY_EXTENSION
+    result = ScanResult(root)
+    base_rules = parse_ignore_lines(DEFAULT_IGNORES + list(extra_ignores or []))
+    stack = [(root, "", base_rules)]
+
+    while stack:
+        dir_path, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Skipping unreadable directory '{dir_path}': {e}")
+            continue
+
+        names = {entry.name for entry in entries}
+        if "pyvenv.cfg" in names and rel_dir:
+            result.entries_ignored += 1
+            continue
+        if ignore_file_name in names:
+            rules = rules + load_ignore_file(os.path.join(dir_path, ignore_file_name), rel_dir)
+
+        directory = ScannedDirectory(dir_path)
+        result.directories.append(directory)
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_ignored(rules, rel_path, is_dir):
+                result.entries_ignored += 1
+                continue
+            if is_dir:
+                subdirs.append((entry.path, rel_path, rules))
+            elif entry.is_file():
+                result.files_scanned += 1
+                language = language_by_extension.get(os.path.splitext(entry.name)[1])
+                if language is not None:
+                    directory.language_counts[language] += 1
+
+        # Reverse so directories pop off the stack in sorted, top-down order.
+        stack.extend(reversed(subdirs))
+
+    return result
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan a repository and group its folders by language")
+    parser.add_argument("root")
+    parser.add_argument("--output", help="Write the language batches as JSON to this file")
+    args = parser.parse_args()
+
+    scan = scan_repository(args.root)
+    summary = {
+        "root": os.path.abspath(args.root),
+        "directories_scanned": len(scan.directories),
+        "files_scanned": scan.files_scanned,
+        "entries_ignored": scan.entries_ignored,
+        "batches": scan.batches(),
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,363 @@
+import os
+import ast
+import sys
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+ARTIFACT_FILE_NAME = "shard.json"
+ARTIFACT_VERSION = 1
+SUMMARY_FILE_NAME = "summary.json"
+# Where the Python middleware leaves its combined coverage data
+COVERAGE_FILE_NAME = ".coverage"
+# Bytes of source that one function or decision point counts as when balancing shards
+COMPLEXITY_WEIGHT = 500
+WEIGHTED_NODES = (
+    ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.If, ast.IfExp, ast.For, ast.AsyncFor,
+    ast.While, ast.Try, ast.ExceptHandler, ast.With, ast.AsyncWith, ast.BoolOp, ast.comprehension,
+)
+# Events the results store needs to rebuild a run from its shards
+RECORDED_EVENTS = ("file_generated", "function_executed", "function_analyzed")
+# Never copied into a merged test tree, besides dot files: metadata and caches
+SKIPPED_NAMES = {"__pycache__", "node_modules", ARTIFACT_FILE_NAME, SUMMARY_FILE_NAME, "intellico_results.db"}
+
+
+def parse_shard(text):
+    """(index, count) from "i/n", where shards are numbered 1 to n."""
+    index, separator, count = text.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not separator or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard must look like i/n with 1 <= i <= n, e.g. 2/4; got {text!r}")
+    return index, count
+
+
+def path_weight(path):
+    """Estimated generation cost of a file: its size plus COMPLEXITY_WEIGHT per function and decision point.
+
+    A directory weighs what the files directly inside it weigh.
+    """
+    if os.path.isdir(path):
+        with os.scandir(path) as entries:
+            return sum(path_weight(entry.path) for entry in entries if entry.is_file())
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+    if not path.endswith(".py"):
+        return size
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return size
+    return size + COMPLEXITY_WEIGHT * sum(isinstance(node, WEIGHTED_NODES) for node in ast.walk(tree))
+
+
+def stable_hash(relative_path):
+    return hashlib.sha256(relative_path.encode()).hexdigest()
+
+
+class Shard:
+    """Shard `index` of `count` (numbered from 1) of a run over the tree at root.
+
+    Every shard computes the same plan on its own from the same checkout:
+    paths are taken heaviest first, ties broken by a hash of their path
+    relative to root, and each goes to the shard with the least weight so
+    far. Nothing depends on where the checkout lives or on scan order.
+    """
+
+    def __init__(self, index, count, root):
+        self.index = index
+        self.count = count
+        self.root = os.path.abspath(root)
+
+    def label(self):
+        return f"{self.index}/{self.count}"
+
+    def relative(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def assign(self, paths):
+        """{path: shard number} for every path."""
+        weights = {path: path_weight(path) for path in paths}
+        ordered = sorted(paths, key=lambda path: (-weights[path], stable_hash(self.relative(path))))
+        loads = [0] * self.count
+        assignment = {}
+        for path in ordered:
+            lightest = loads.index(min(loads))
+            assignment[path] = lightest + 1
+            loads[lightest] += max(1, weights[path])
+        return assignment
+
+    def select(self, paths):
+        """The paths this shard processes, in their given order."""
+        assignment = self.assign(paths)
+        return [path for path in paths if assignment[path] == self.index]
+
+
+def write_artifact(output_folder, shard, summary, events, started_at):
+    """Records a finished shard in output_folder, which then holds everything the merge needs.
+
+    Next to the generated tests and coverage data, ARTIFACT_FILE_NAME keeps
+    the shard's summary and the events the results store is built from.
+    """
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "shard": [shard.index, shard.count],
+        "root": shard.root,
+        "output_folder": os.path.abspath(output_folder),
+        "python": list(sys.version_info[:2]),
+        "started_at": started_at,
+        "finished_at": time.time(),
+        "summary": summary,
+        "events": [record for record in events if record.get("event") in RECORDED_EVENTS],
+    }
+    os.makedirs(output_folder, exist_ok=True)
+    path = os.path.join(output_folder, ARTIFACT_FILE_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(artifact, f)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def load_artifact(artifact_dir):
+    path = os.path.join(artifact_dir, ARTIFACT_FILE_NAME)
+    try:
+        with open(path) as f:
+            artifact = json.load(f)
+    except OSError:
+        raise ValueError(f"{artifact_dir} is not a shard artifact: {ARTIFACT_FILE_NAME} is missing") from None
+    if artifact.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"{path} has artifact version {artifact.get('version')}, expected {ARTIFACT_VERSION}")
+    return artifact
+
+
+def path_mapper(old_root, new_root):
+    """Rewrites paths under old_root to the same place under new_root; leaves others alone."""
+    prefix = os.path.join(old_root, "")
+
+    def map_path(path):
+        if path.startswith(prefix):
+            return os.path.join(new_root, path[len(prefix):])
+        return path
+
+    return map_path
+
+
+def copy_test_tree(artifact_dir, output_folder, copied):
+    """Copies an artifact's generated tests into output_folder.
+
+    copied maps relative paths to the artifact they came from; a file that
+    two shards both wrote must be identical in both.
+    """
+    for directory, dirnames, filenames in os.walk(artifact_dir):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith(".") and name not in SKIPPED_NAMES)
+        for name in sorted(filenames):
+            if name.startswith(".") or name in SKIPPED_NAMES:
+                continue
+            source = os.path.join(directory, name)
+            relative = os.path.relpath(source, artifact_dir)
+            destination = os.path.join(output_folder, relative)
+            if relative in copied:
+                with open(source, "rb") as a, open(destination, "rb") as b:
+                    if a.read() != b.read():
+                        raise ValueError(f"{relative} differs between {copied[relative]} and {artifact_dir}")
+                continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(source, destination)
+            copied[relative] = artifact_dir
+
+
+def merge_python_results(results, coverage_summary):
+    """One Python middleware result from the results of several shards."""
+    counts = {}
+    for result in results:
+        for status, count in result["counts"].items():
+            counts[status] = counts.get(status, 0) + count
+    return {
+        "tests": [test for result in results for test in result["tests"]],
+        "tests_run": sum(result["tests_run"] for result in results),
+        "counts": counts,
+        "shards": sum(result["shards"] for result in results),
+        "coverage": coverage_summary,
+        # Shards run side by side, so the slowest one is the run's duration
+        "seconds": max(result["seconds"] for result in results),
+    }
+
+
+def merge_artifacts(artifact_dirs, output_folder, root=None, partial=False):
+    """Combines shard artifacts into one test tree, one coverage report and one summary in output_folder.
+
+    root is where the analyzed tree lives on this machine (by default where
+    the first shard ran); coverage and event paths are moved there, so
+    coverage can be reported from this checkout. Every shard of the run
+    must be present unless partial is set. Returns (summary, events).
+    """
+    artifacts = [(os.path.abspath(artifact_dir), load_artifact(artifact_dir)) for artifact_dir in artifact_dirs]
+    if not artifacts:
+        raise ValueError("No shard artifacts to merge")
+    counts = sorted({artifact["shard"][1] for _, artifact in artifacts})
+    if len(counts) != 1:
+        raise ValueError(f"Artifacts come from runs with different shard counts: {counts}")
+    count = counts[0]
+    indexes = [artifact["shard"][0] for _, artifact in artifacts]
+    duplicates = sorted({index for index in indexes if indexes.count(index) > 1})
+    if duplicates:
+        raise ValueError(f"Shard(s) {duplicates} given more than once")
+    missing = sorted(set(range(1, count + 1)) - set(indexes))
+    if missing and not partial:
+        raise ValueError(f"Missing shard(s) {missing} of {count}; merge with partial (--partial) to combine the rest")
+    output_folder = os.path.abspath(output_folder)
+    if output_folder in (artifact_dir for artifact_dir, _ in artifacts):
+        raise ValueError("The merge output folder must not be one of the shard artifacts")
+    root = os.path.abspath(root or artifacts[0][1]["root"])
+    artifacts.sort(key=lambda item: item[1]["shard"][0])
+    os.makedirs(output_folder, exist_ok=True)
+    print(f"Merging {len(artifacts)} of {count} shard(s) into {output_folder}")
+
+    copied = {}
+    for artifact_dir, _ in artifacts:
+        copy_test_tree(artifact_dir, output_folder, copied)
+
+    summaries = [artifact["summary"] for _, artifact in artifacts]
+    python_results = [summary["results"]["Python"] for summary in summaries if "Python" in summary.get("results", {})]
+    results = {}
+    if python_results:
+        from sampletestcase.suite_runner import merge_coverage_data
+
+        coverage_summary = merge_coverage_data(
+            [
+                (os.path.join(artifact_dir, COVERAGE_FILE_NAME), path_mapper(artifact["root"], root))
+                for artifact_dir, artifact in artifacts
+            ],
+            os.path.join(output_folder, COVERAGE_FILE_NAME),
+        )
+        results["Python"] = merge_python_results(python_results, coverage_summary)
+
+    events = []
+    for artifact_dir, artifact in artifacts:
+        map_source = path_mapper(artifact["root"], root)
+        map_output = path_mapper(artifact["output_folder"], output_folder)
+        for record in artifact["events"]:
+            record = dict(record)
+            if record.get("file"):
+                record["file"] = map_source(record["file"])
+            if record.get("test_file"):
+                record["test_file"] = map_output(record["test_file"])
+            events.append(record)
+
+    first = summaries[0]
+    summary = {
+        "folder": root,
+        "output_folder": output_folder,
+        "directories_scanned": first.get("directories_scanned"),
+        "files_scanned": first.get("files_scanned"),
+        "languages": first.get("languages"),
+        "shards": {"count": count, "merged": sorted(indexes), "missing": missing},
+        "started_at": min(artifact["started_at"] for _, artifact in artifacts),
+        "results": results,
+    }
+    with open(os.path.join(output_folder, SUMMARY_FILE_NAME), "w") as f:
+        json.dump(summary, f, indent=2)
+
+    python = results.get("Python")
+    if python:
+        counts = python["counts"]
+        print(
+            f"Merged {python['tests_run']} generated tests from {len(artifacts)} shard(s): "
+            f"{counts.get('passed', 0)} passed, {counts.get('failed', 0)} failed, "
+            f"{counts.get('error', 0)} errors, {counts.get('skipped', 0)} skipped; "
+            f"coverage {python['coverage']['percent']}%"
+        )
+    print(f"Copied {len(copied)} file(s) into {output_folder}")
+    return summary, events
+
+
+def record_merged_run(summary, events):
+    """Stores a merged run in the results database, as if it had run in one piece."""
+    from language_identifier.results_store import ResultsStore, RunRecorder, default_database_url
+
+    recorder = RunRecorder()
+    recorder.started_at = summary["started_at"]
+    for record in events:
+        recorder(record)
+    store = ResultsStore(default_database_url(summary["output_folder"]))
+    return store.record_run(summary["folder"], summary["output_folder"], summary, recorder)
+
+
+def run_local_shards(folder_path, output_folder, count, extra_args=()):
+    """Runs every shard of folder_path as a separate process on this machine, then merges them.
+
+    Shard i writes its artifact to output_folder/shard-i and its log to
+    output_folder/shard-i.log; the merged result goes to output_folder/merged.
+    Earlier shard and merge folders there are replaced.
+    """
+    processes = []
+    artifact_dirs = []
+    os.makedirs(output_folder, exist_ok=True)
+    shutil.rmtree(os.path.join(output_folder, "merged"), ignore_errors=True)
+    for index in range(1, count + 1):
+        artifact_dir = os.path.join(output_folder, f"shard-{index}")
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+        command = [
+            sys.executable, os.path.join(ROOT_DIR, "language_identifier", "main.py"),
+            "--shard", f"{index}/{count}", "--folder", folder_path, "--output", artifact_dir, *extra_args,
+        ]
+        log = open(os.path.join(output_folder, f"shard-{index}.log"), "w")
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        processes.append((index, process, log))
+        artifact_dirs.append(artifact_dir)
+    print(f"Started {count} shard(s) of {folder_path}")
+
+    failed = []
+    for index, process, log in processes:
+        if process.wait() != 0:
+            failed.append(index)
+        log.close()
+    if failed:
+        raise RuntimeError(f"Shard(s) {failed} failed; see their shard-<i>.log in {output_folder}")
+    return merge_artifacts(artifact_dirs, os.path.join(output_folder, "merged"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge sharded analysis runs, or run every shard locally")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge_parser = commands.add_parser("merge", help="Combine shard artifacts into one test tree, coverage and summary")
+    merge_parser.add_argument("artifacts", nargs="+", help="Output folders of the shards")
+    merge_parser.add_argument("--output", required=True, help="Folder for the merged tests, coverage and summary")
+    merge_parser.add_argument("--root", help="Where the analyzed tree lives here (default: where shard 1 ran)")
+    merge_parser.add_argument("--partial", action="store_true", help="Merge even if some shards are missing")
+    merge_parser.add_argument("--record", action="store_true",
+                              help="Store the merged run in the results database (INTELLICO_RESULTS_DB or --output)")
+    local_parser = commands.add_parser("local", help="Run all shards as separate processes here, then merge")
+    local_parser.add_argument("folder")
+    local_parser.add_argument("--shards", type=int, required=True)
+    local_parser.add_argument("--output", required=True, help="Folder for the shard artifacts and the merged result")
+    local_parser.add_argument("--record", action="store_true",
+                              help="Store the merged run in the results database (INTELLICO_RESULTS_DB or --output)")
+    cli_args, extra_args = parser.parse_known_args()
+
+    try:
+        if cli_args.command == "merge":
+            if extra_args:
+                parser.error(f"unrecognized arguments: {' '.join(extra_args)}")
+            merged, merged_events = merge_artifacts(
+                cli_args.artifacts, cli_args.output, cli_args.root, cli_args.partial
+            )
+        else:
+            # Anything else is passed on to every shard's main.py, e.g. --jobs or --inputs
+            merged, merged_events = run_local_shards(cli_args.folder, cli_args.output, cli_args.shards, extra_args)
+    except (ValueError, RuntimeError) as e:
+        parser.exit(1, f"{e}\n")
+    if cli_args.record:
+        print(f"Recorded merged run {record_merged_run(merged, merged_events)}")
@@ -0,0 +1,154 @@
+import ast
+
+ENTRY = "Entry"
+EXIT = "Exit"
+
+class ControlFlowGraph:
+    """Statement-level control-flow graph of one function.
+
+    Nodes are compact (kind, lineno) records indexed by position; edges are
+    (source, target) index pairs. Node 0 is the entry and node 1 the exit.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = [(ENTRY, None), (EXIT, None)]
+        self.edges = []
+
+    def add_node(self, kind, lineno):
+        self.nodes.append((kind, lineno))
+        return len(self.nodes) - 1
+
+    def connect(self, sources, target):
+        for source in sources:
+            self.edges.append((source, target))
+
+    def complexity(self):
+        """McCabe cyclomatic complexity, E - N + 2."""
+        return len(self.edges) - len(self.nodes) + 2
+
+    def to_dict(self):
+        return {
+            "function": self.name,
+            "complexity": self.complexity(),
+            "nodes": len(self.nodes),
+            "edges": len(self.edges),
+        }
+
+
+class _Loop:
+    def __init__(self, head):
+        self.head = head
+        self.breaks = []
+
+
+class CFGBuilder:
+    """Builds a ControlFlowGraph in one pass over a function body.
+
+    Handles if/elif/else, for/while (with else, break and continue),
+    try/except/else/finally, with and match. Nested function and class
+    definitions are single statements; their bodies are not part of the
+    graph and do not add to the enclosing function's complexity.
+    Unreachable statements (after return, raise, break or continue) are
+    left out so they do not distort the complexity.
+    """
+
+    def __init__(self, func_node):
+        self.func_node = func_node
+        self.graph = ControlFlowGraph(func_node.name)
+        self.loops = []
+
+    def build(self):
+        exits = self.visit_body(self.func_node.body, [0])
+        self.graph.connect(exits, 1)
+        return self.graph
+
+    def visit_body(self, statements, preds):
+        for stmt in statements:
+            if not preds:
+                break
+            preds = self.visit(stmt, preds)
+        return preds
+
+    def visit(self, stmt, preds):
+        method = getattr(self, f"visit_{stmt.__class__.__name__}", self.visit_simple)
+        return method(stmt, preds)
+
+    def node(self, stmt, preds, kind=None):
+        index = self.graph.add_node(kind or stmt.__class__.__name__, stmt.lineno)
+        self.graph.connect(preds, index)
+        return index
+
+    def visit_simple(self, stmt, preds):
+        return [self.node(stmt, preds)]
+
+    def visit_Return(self, stmt, preds):
+        self.graph.connect([self.node(stmt, preds)], 1)
+        return []
+
+    visit_Raise = visit_Return
+
+    def visit_Break(self, stmt, preds):
+        index = self.node(stmt, preds)
+        if self.loops:
+            self.loops[-1].breaks.append(index)
+        return []
+
+    def visit_Continue(self, stmt, preds):
+        index = self.node(stmt, preds)
+        if self.loops:
+            self.graph.connect([index], self.loops[-1].head)
+        return []
+
+    def visit_If(self, stmt, preds):
+        test = self.node(stmt, preds)
+        exits = self.visit_body(stmt.body, [test])
+        if stmt.orelse:
+            return exits + self.visit_body(stmt.orelse, [test])
+        return exits + [test]
+
+    def visit_loop(self, stmt, preds):
+        head = self.node(stmt, preds)
+        loop = _Loop(head)
+        self.loops.append(loop)
+        body_exits = self.visit_body(stmt.body, [head])
+        self.loops.pop()
+        self.graph.connect(body_exits, head)
+        exits = self.visit_body(stmt.orelse, [head]) if stmt.orelse else [head]
+        return exits + loop.breaks
+
+    visit_For = visit_AsyncFor = visit_While = visit_loop
+
+    def visit_with(self, stmt, preds):
+        return self.visit_body(stmt.body, [self.node(stmt, preds)])
+
+    visit_With = visit_AsyncWith = visit_with
+
+    def visit_try(self, stmt, preds):
+        head = self.node(stmt, preds)
+        body_exits = self.visit_body(stmt.body, [head])
+        exits = self.visit_body(stmt.orelse, body_exits) if stmt.orelse else body_exits
+        for handler in stmt.handlers:
+            handler_node = self.node(handler, [head], "ExceptHandler")
+            exits = exits + self.visit_body(handler.body, [handler_node])
+        if stmt.finalbody:
+            return self.visit_body(stmt.finalbody, exits)
+        return exits
+
+    visit_Try = visit_TryStar = visit_try
+
+    def visit_Match(self, stmt, preds):
+        subject = self.node(stmt, preds)
+        exits = []
+        irrefutable = False
+        for case in stmt.cases:
+            case_node = self.graph.add_node("match_case", case.pattern.lineno)
+            self.graph.connect([subject], case_node)
+            exits += self.visit_body(case.body, [case_node])
+            if isinstance(case.pattern, ast.MatchAs) and case.pattern.pattern is None and case.guard is None:
+                irrefutable = True
+        return exits if irrefutable else exits + [subject]
+
+
+def build_cfg(func_node):
+    return CFGBuilder(func_node).build()
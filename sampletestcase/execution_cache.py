@@ -0,0 +1,200 @@
+import os
+import ast
+import sys
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+
+CACHE_FILE_NAME = ".intellico_exec_cache.sqlite"
+DEFAULT_MAX_MB = 256
+# Eviction trims the cache to this share of its limit, so it does not run on every write
+EVICTION_TARGET = 0.9
+# Bump whenever outcomes are encoded differently, so older entries are never read back
+OUTCOME_FORMAT = "2"
+
+
+def _bound_names(statement):
+    """Names a top-level statement binds, without looking inside function or class bodies."""
+    if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {statement.name}
+    names = set()
+    stack = [statement]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+        stack.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def _referenced_names(node):
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load)}
+
+
+class ModuleGlobals:
+    """Static view of which top-level statements of a module each name depends on.
+
+    The generator never imports target modules itself, so "the globals a
+    function depends on" are the top-level definitions, assignments and
+    imports it reaches by name, followed transitively, plus top-level
+    statements that act on those names (such as a registry.update(...)).
+    Modules of the project are part of the fingerprint through imports_hash,
+    the hash of their contents, whenever a reached statement imports.
+    """
+
+    def __init__(self, tree, imports_hash=""):
+        self.imports_hash = imports_hash
+        self.bindings = {}
+        self.effects = []
+        # A star import may bind any name, so every function depends on it
+        self.star_import = False
+        for statement in tree.body:
+            names = _bound_names(statement)
+            for name in names:
+                self.bindings.setdefault(name, []).append(statement)
+            if not names:
+                self.effects.append((statement, _referenced_names(statement)))
+            if isinstance(statement, ast.ImportFrom) and any(alias.name == "*" for alias in statement.names):
+                self.star_import = True
+
+    def fingerprint(self, node):
+        """Hash of every top-level statement node depends on."""
+        pending = list(_referenced_names(node))
+        names = set()
+        while pending:
+            name = pending.pop()
+            if name in names or name not in self.bindings:
+                continue
+            names.add(name)
+            for statement in self.bindings[name]:
+                pending.extend(_referenced_names(statement) - names)
+        statements = {id(statement): statement for name in names for statement in self.bindings[name]}
+        for statement, referenced in self.effects:
+            if referenced & names:
+                statements[id(statement)] = statement
+        digest = hashlib.sha256()
+        for dump in sorted(ast.dump(statement) for statement in statements.values()):
+            digest.update(dump.encode())
+        imports = any(isinstance(statement, (ast.Import, ast.ImportFrom)) for statement in statements.values())
+        if imports or self.star_import:
+            digest.update(self.imports_hash.encode())
+        return digest.hexdigest()
+
+
+def execution_key(func_code, scope, args, trace=False):
+    """Cache key for one call: the executed code, its scope, the arguments and the interpreter.
+
+    scope is (target source hash, module globals fingerprint, line number);
+    the line number only matters for traced calls, whose arcs carry lines.
+    """
+    source_hash, globals_hash, lineno = scope
+    payload = json.dumps(
+        [OUTCOME_FORMAT, list(sys.version_info[:2]), func_code, source_hash, globals_hash, repr(args), lineno if trace else None],
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ExecutionCache:
+    """Persistent, size-bounded LRU cache of execution outcomes in SQLite.
+
+    Entries are pickled outcomes keyed by execution_key. Least recently used
+    entries are evicted once the file's entries exceed max_mb. Several
+    generator processes may share one cache file.
+    """
+
+    def __init__(self, path, max_mb=DEFAULT_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.connection = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def connect(self):
+        if self.connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=30)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_used ON entries (used)")
+            self.connection.commit()
+            self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        return self.connection
+
+    def get_many(self, keys):
+        """{key: value} for the keys present; refreshes their recency."""
+        connection = self.connect()
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = connection.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                try:
+                    found[key] = pickle.loads(blob)
+                except Exception:
+                    # E.g. an instance of a class that no longer exists; treat as a miss
+                    continue
+        if found:
+            now = time.time()
+            connection.executemany("UPDATE entries SET used = ? WHERE key = ?", [(now, key) for key in found])
+            connection.commit()
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Stores (key, value) pairs; values that cannot be pickled are skipped."""
+        rows = []
+        now = time.time()
+        for key, value in items:
+            try:
+                blob = pickle.dumps(value)
+            except Exception:
+                continue
+            rows.append((key, blob, len(blob), now))
+        if not rows:
+            return
+        connection = self.connect()
+        connection.executemany("INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)", rows)
+        self.total_bytes += sum(row[2] for row in rows)
+        if self.total_bytes > self.max_bytes:
+            self.evict(connection)
+        connection.commit()
+
+    def evict(self, connection):
+        # Re-read the total: other processes may have written or evicted meanwhile
+        self.total_bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        excess = self.total_bytes - int(self.max_bytes * EVICTION_TARGET)
+        if excess <= 0:
+            return
+        removed = freed = 0
+        victims = []
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY used"):
+            if freed >= excess:
+                break
+            victims.append((key,))
+            freed += size
+            removed += 1
+        connection.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self.total_bytes -= freed
+        self.evictions += removed
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
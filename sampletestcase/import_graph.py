@@ -0,0 +1,221 @@
+import os
+import ast
+import hashlib
+import networkx as nx
+
+from sampletestcase.manifest import file_sha256
+
+
+def package_module_name(file_path):
+    """Dotted name of file_path, climbing parent dirs while they contain __init__.py."""
+    file_path = os.path.abspath(file_path)
+    parts = [os.path.splitext(os.path.basename(file_path))[0]]
+    directory = os.path.dirname(file_path)
+    while os.path.exists(os.path.join(directory, "__init__.py")):
+        parts.append(os.path.basename(directory))
+        directory = os.path.dirname(directory)
+    if parts[0] == "__init__":
+        parts = parts[1:]
+    return ".".join(reversed(parts))
+
+
+def imported_names(tree, module_name, is_package):
+    """Absolute module names a parsed file imports, with relative imports resolved."""
+    package = module_name if is_package else module_name.rpartition(".")[0]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base_parts = package.split(".") if package else []
+                base_parts = base_parts[:len(base_parts) - (node.level - 1)] if node.level > 1 else base_parts
+                base = ".".join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if base:
+                names.add(base)
+            # `from pkg import mod` may name a submodule rather than an attribute
+            names.update(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+    return names
+
+
+def search_root(file_path):
+    """The sys.path entry file_path is imported from: the folder above its outermost package."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    while os.path.exists(os.path.join(directory, "__init__.py")):
+        directory = os.path.dirname(directory)
+    return directory
+
+
+def candidate_paths(name, importer):
+    """Files an absolute module name could load from when imported by importer, in lookup order.
+
+    Like the generator and the generated tests, which put both on sys.path,
+    the importer's own folder is searched before its package's search root.
+    """
+    parts = name.split(".")
+    paths = []
+    for base in dict.fromkeys([os.path.dirname(os.path.abspath(importer)), search_root(importer)]):
+        module = os.path.join(base, *parts)
+        paths.extend([module + ".py", os.path.join(module, "__init__.py")])
+    return paths
+
+
+def _parse(path, parse=None):
+    if parse is not None:
+        return parse(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return ast.parse(f.read(), filename=path)
+
+
+def _existing_imports(path, tree):
+    """Project files the parsed file at path imports directly."""
+    is_package = os.path.basename(path) == "__init__.py"
+    targets = set()
+    for name in imported_names(tree, package_module_name(path), is_package):
+        target = next((candidate for candidate in candidate_paths(name, path) if os.path.isfile(candidate)), None)
+        if target is not None and target != path:
+            targets.add(target)
+    return targets
+
+
+class ImportIndex:
+    """Memo of each project file's resolved imports and content hash, for import closures.
+
+    Within one generation (see refresh) every file is stat'ed at most once,
+    and it is only parsed and hashed again when its mtime or size changed,
+    so hashing the closures of a whole folder reads each file once. parse,
+    if given, maps a path to its AST (e.g. a cache).
+    """
+
+    def __init__(self, parse=None):
+        self.parse = parse
+        self.generation = 0
+        # path -> (generation checked, (mtime_ns, size), imported paths, content hash)
+        self.files = {}
+        self.closures = {}
+
+    def refresh(self):
+        """Starts a new generation: files are checked for changes again when next used."""
+        self.generation += 1
+        self.closures.clear()
+
+    def entry(self, path):
+        entry = self.files.get(path)
+        if entry is not None and entry[0] == self.generation:
+            return entry
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if entry is not None and entry[1] == stamp:
+            entry = (self.generation,) + entry[1:]
+        else:
+            imports = ()
+            content_hash = None
+            if stamp is not None:
+                try:
+                    imports = tuple(sorted(_existing_imports(path, _parse(path, self.parse))))
+                except (OSError, SyntaxError, UnicodeDecodeError):
+                    pass
+                try:
+                    content_hash = file_sha256(path)
+                except OSError:
+                    pass
+            entry = (self.generation, stamp, imports, content_hash)
+        self.files[path] = entry
+        return entry
+
+    def imported_files(self, file_path):
+        """Files file_path imports from its own folder or package, followed transitively, without itself."""
+        file_path = os.path.abspath(file_path)
+        closure = self.closures.get(file_path)
+        if closure is None:
+            found = set()
+            pending = [file_path]
+            while pending:
+                for target in self.entry(pending.pop())[2]:
+                    if target != file_path and target not in found:
+                        found.add(target)
+                        pending.append(target)
+            closure = self.closures[file_path] = sorted(found)
+        return closure
+
+    def dependencies_hash(self, file_path):
+        """Hash over the contents of every project file file_path imports, transitively."""
+        digest = hashlib.sha256()
+        base = os.path.dirname(os.path.abspath(file_path))
+        for path in self.imported_files(file_path):
+            content_hash = self.entry(path)[3]
+            if content_hash is not None:
+                digest.update(f"{os.path.relpath(path, base)}:{content_hash}\n".encode())
+        return digest.hexdigest()
+
+
+def imported_project_files(file_path, parse=None):
+    """Files file_path imports from its own folder or package, followed transitively, without itself."""
+    return ImportIndex(parse).imported_files(file_path)
+
+
+def dependencies_hash(file_path, parse=None):
+    """Hash over the contents of every project file file_path imports, transitively.
+
+    Use an ImportIndex instead when hashing many files of one tree.
+    """
+    return ImportIndex(parse).dependencies_hash(file_path)
+
+
+def build_import_graph(file_paths, parse=None):
+    """Builds a DiGraph over file_paths with an edge importer -> imported.
+
+    Names are resolved the way the importing file would resolve them, from
+    its own folder, then its package's search root, so same-named modules
+    in different folders stay apart. Each node's "imports" attribute keeps
+    every path its imports could have loaded, including missing ones, so
+    the importers of a deleted file can still be found. Imports of modules
+    outside file_paths get no edge. parse, if given, maps a path to its AST
+    (e.g. a cache) instead of reading the file here.
+    """
+    file_paths = [os.path.abspath(path) for path in file_paths]
+    known = set(file_paths)
+
+    graph = nx.DiGraph()
+    graph.add_nodes_from(file_paths, imports=frozenset())
+    for path in file_paths:
+        try:
+            tree = _parse(path, parse)
+        except (OSError, SyntaxError, UnicodeDecodeError) as e:
+            print(f"Skipping imports of {path}: {e}")
+            continue
+        is_package = os.path.basename(path) == "__init__.py"
+        candidates = set()
+        for name in imported_names(tree, package_module_name(path), is_package):
+            paths = candidate_paths(name, path)
+            candidates.update(paths)
+            target = next((candidate for candidate in paths if candidate in known), None)
+            if target is not None and target != path:
+                graph.add_edge(path, target)
+        graph.nodes[path]["imports"] = frozenset(candidates)
+    return graph
+
+
+def affected_files(graph, changed_files):
+    """Changed files plus every file that imports one of them, transitively.
+
+    A changed file missing from the graph (deleted) is not itself
+    included, but the files that imported it are.
+    """
+    affected = set()
+    for path in changed_files:
+        path = os.path.abspath(path)
+        if path in graph:
+            affected.add(path)
+            affected.update(nx.ancestors(graph, path))
+            continue
+        for importer, imports in graph.nodes(data="imports", default=frozenset()):
+            if path in imports:
+                affected.add(importer)
+                affected.update(nx.ancestors(graph, importer))
+    return affected
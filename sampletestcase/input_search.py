@@ -0,0 +1,168 @@
+import ast
+import time
+
+from sampletestcase.inputs import argument_candidates, candidate_argument_vectors, literal_source, literal_values
+
+# Vectors executed per sandbox call while searching
+SEARCH_BATCH = 8
+# Mutation attempts per wanted vector before a round gives up on finding new ones
+MUTATION_ATTEMPTS = 8
+# Most mutations stacked onto one child, so the search can move past a parent's direct neighbours
+MAX_STACKED_MUTATIONS = 4
+
+
+def statement_lines(func_node):
+    """Line numbers of the statements in func_node's body, which line coverage is measured against."""
+    body = func_node.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        body = body[1:]  # A docstring never runs as a line
+    return {node.lineno for statement in body for node in ast.walk(statement) if isinstance(node, ast.stmt)}
+
+
+def mutate_value(value, rng):
+    """A nearby value of the same kind, or value itself if it has no mutations."""
+    if isinstance(value, bool):
+        return not value
+    if isinstance(value, int):
+        return rng.choice([value + 1, value - 1, -value, value * 2, 0, value + rng.randint(-100, 100)])
+    if isinstance(value, float):
+        return rng.choice([value + 0.5, -value, value * 2, 0.0, value / 3])
+    if isinstance(value, str):
+        return rng.choice(["", value + (value[-1:] or "a"), value[:-1], value.upper(), value + " ", "0"])
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+        if items and rng.random() < 0.5:
+            index = rng.randrange(len(items))
+            items[index] = mutate_value(items[index], rng)
+        elif items and rng.random() < 0.5:
+            items.pop(rng.randrange(len(items)))
+        else:
+            items.append(mutate_value(items[-1], rng) if items else 0)
+        return type(value)(items)
+    if value is None:
+        return rng.choice([0, "", []])
+    return value
+
+
+def mutate_vector(vector, rng, pools, corpus):
+    """Changes one argument of vector: mutates it, or swaps in a candidate or another kept input's value.
+
+    Vectors are source literals; returns None when the result has no literal form.
+    """
+    vector = list(vector)
+    if not vector:
+        return None
+    index = rng.randrange(len(vector))
+    roll = rng.random()
+    if roll < 0.2 and pools[index]:
+        vector[index] = rng.choice(pools[index])
+        return vector
+    if roll < 0.35 and corpus:
+        vector[index] = rng.choice(corpus)[0][index]
+        return vector
+    source = literal_source(mutate_value(literal_values([vector[index]])[0], rng))
+    if source is None:
+        return None
+    vector[index] = source
+    return vector
+
+
+def vector_key(vector):
+    """Identity of a vector by value, so '""' and "''" count as the same input."""
+    return tuple(repr(value) for value in literal_values(vector))
+
+
+def mutate_child(vector, rng, pools, corpus):
+    """vector with one to MAX_STACKED_MUTATIONS mutations applied, or None."""
+    for _ in range(rng.randint(1, MAX_STACKED_MUTATIONS)):
+        vector = mutate_vector(vector, rng, pools, corpus)
+        if vector is None:
+            return None
+    return vector
+
+
+def minimize(corpus):
+    """Greedy set cover: the fewest kept inputs whose arcs together cover everything reached.
+
+    corpus entries are (vector, outcome, arcs); the result keeps discovery order.
+    """
+    order = sorted(range(len(corpus)), key=lambda index: (-len(corpus[index][2]), index))
+    covered = set()
+    chosen = []
+    for index in order:
+        if corpus[index][2] - covered:
+            covered |= corpus[index][2]
+            chosen.append(index)
+    return [corpus[index] for index in sorted(chosen)] or corpus[:1]
+
+
+class SearchResult:
+    def __init__(self, inputs, lines_covered, lines_total, executions, seconds):
+        # [(vector, outcome)] to emit, in discovery order
+        self.inputs = inputs
+        self.lines_covered = lines_covered
+        self.lines_total = lines_total
+        self.executions = executions
+        self.seconds = seconds
+
+    def line_coverage(self):
+        return self.lines_covered / self.lines_total if self.lines_total else 1.0
+
+
+def search_inputs(func_node, first_vector, run_batch, rng, budget, target=1.0, bound=False,
+                  batch_size=SEARCH_BATCH):
+    """Coverage-guided search for argument vectors of func_node.
+
+    run_batch(vectors) runs source-literal vectors and returns one
+    (outcome, arcs) pair per vector. The search starts from first_vector and
+    the usual candidates, then mutates the inputs that reached new arcs. It
+    stops once `target` of the function's statement lines are covered,
+    `budget` seconds have passed, or no untried vector can be produced.
+    """
+    started = time.perf_counter()
+    lines = statement_lines(func_node)
+    pools = argument_candidates(func_node, rng, bound)
+    seen = set()
+    corpus = []
+    reached = set()
+    executions = 0
+    pending = candidate_argument_vectors(func_node, first_vector, batch_size, rng, bound)
+    while True:
+        batch = []
+        for vector in pending:
+            if vector_key(vector) not in seen and len(batch) < batch_size:
+                seen.add(vector_key(vector))
+                batch.append(vector)
+        for _ in range(batch_size * MUTATION_ATTEMPTS):
+            if len(batch) >= batch_size or not corpus:
+                break
+            vector = mutate_child(rng.choice(corpus)[0], rng, pools, corpus)
+            if vector is not None and vector_key(vector) not in seen:
+                seen.add(vector_key(vector))
+                batch.append(vector)
+        if not batch:
+            break
+        pending = []
+
+        results = run_batch(batch)
+        executions += len(batch)
+        for vector, (outcome, arcs) in zip(batch, results):
+            arcs = set(map(tuple, arcs))
+            if arcs - reached or not corpus:
+                corpus.append((vector, outcome, arcs))
+                reached |= arcs
+        lines_covered = len(lines & {line for _, line in reached})
+        if lines_covered >= target * len(lines):
+            break
+        if time.perf_counter() - started >= budget:
+            break
+
+    inputs = [(vector, outcome) for vector, outcome, _ in minimize(corpus)]
+    return SearchResult(
+        inputs,
+        len(lines & {line for _, line in reached}),
+        len(lines),
+        executions,
+        time.perf_counter() - started,
+    )
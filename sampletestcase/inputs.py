@@ -0,0 +1,186 @@
+import ast
+import random
+import hashlib
+
+# Candidate source literals by annotation name
+ANNOTATION_CANDIDATES = {
+    "int": ["0", "1", "-1", "7", "100"],
+    "float": ["0.0", "1.5", "-2.25"],
+    "str": ['""', '"a"', '"hello world"'],
+    "bool": ["True", "False"],
+    "list": ["[]", "[1, 2, 3]"],
+    "dict": ["{}", '{"key": "value"}'],
+    "tuple": ["()", "(1, 2)"],
+    "bytes": ['b""', 'b"data"'],
+}
+
+# Candidates for the argument names the default heuristics already recognise
+NAME_CANDIDATES = {
+    "a": ["0", "1", "-3", "10"],
+    "b": ["0", "2", "-5", "10"],
+    "name": ['"name_example"', '""'],
+    "title": ['"title_example"', '""'],
+    "key": ['"key_example"', '""'],
+    "file_path": ['"dummy_file.txt"', '""'],
+    "file": ['"dummy_file.txt"', '""'],
+    "exception": ['"ValueError"'],
+}
+
+GENERIC_CANDIDATES = ['"default_value"', "0", "1", "-1", '""', "None", "[]", "True"]
+
+# Value types an argument's annotation name asks for; other annotations accept anything
+ANNOTATION_TYPES = {
+    "int": int,
+    "float": (int, float),
+    "str": str,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "bytes": bytes,
+}
+
+
+def seeded_rng(module_name, qualname):
+    """A random.Random seeded from a function's module and qualified name.
+
+    The same function gets the same inputs on every run and machine, so its
+    generated tests stay stable and its executions can be cached.
+    """
+    digest = hashlib.sha256(f"{module_name}:{qualname}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _annotation_name(annotation):
+    if isinstance(annotation, ast.Name):
+        return annotation.id
+    if isinstance(annotation, ast.Subscript):
+        return _annotation_name(annotation.value)
+    if isinstance(annotation, ast.Attribute):
+        return annotation.attr
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        return annotation.value
+    return None
+
+
+def _literal_default(node):
+    """Source of a default value if it is a plain literal, else None."""
+    try:
+        ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return None
+    return ast.unparse(node)
+
+
+def argument_candidates(func_node, rng, bound=False):
+    """One list of candidate source literals per positional argument.
+
+    bound drops the first argument (self or cls) of a method.
+    """
+    args = func_node.args.args
+    defaults = [None] * (len(args) - len(func_node.args.defaults)) + list(func_node.args.defaults)
+    if bound:
+        args, defaults = args[1:], defaults[1:]
+    pools = []
+    for arg, default in zip(args, defaults):
+        pool = []
+        if arg.annotation is not None:
+            pool.extend(ANNOTATION_CANDIDATES.get(_annotation_name(arg.annotation), []))
+        if default is not None:
+            literal = _literal_default(default)
+            if literal is not None:
+                pool.append(literal)
+        pool.extend(NAME_CANDIDATES.get(arg.arg.lower(), []))
+        if not pool:
+            pool.extend(GENERIC_CANDIDATES)
+        if arg.annotation is None and arg.arg.lower() not in NAME_CANDIDATES:
+            pool.append(str(rng.randint(1, 10)))
+        pools.append(list(dict.fromkeys(pool)))
+    return pools
+
+
+def candidate_argument_vectors(func_node, first_vector, count, rng, bound=False):
+    """Up to count distinct argument vectors (as source literals) for func_node.
+
+    first_vector, the generator's usual single guess, always comes first.
+    The next ones change one argument of it at a time, taking each
+    argument's candidates (from annotations, literal defaults and argument
+    names) in turn; the rest mix candidates randomly.
+    """
+    vectors = [list(first_vector)]
+    pools = argument_candidates(func_node, rng, bound)
+    if not pools:
+        return vectors
+    walk = []
+    for step in range(max(len(pool) for pool in pools)):
+        for index, pool in enumerate(pools):
+            if step < len(pool):
+                vector = list(first_vector)
+                vector[index] = pool[step]
+                walk.append(vector)
+    seen = {tuple(first_vector)}
+    for attempt in range(len(walk) + count * 4):
+        if len(vectors) >= count:
+            break
+        vector = walk[attempt] if attempt < len(walk) else [rng.choice(pool) for pool in pools]
+        if tuple(vector) not in seen:
+            seen.add(tuple(vector))
+            vectors.append(vector)
+    return vectors
+
+
+def _bound_arguments(func_node, bound):
+    return func_node.args.args[1:] if bound else func_node.args.args
+
+
+def _contradicts(annotation, source):
+    """True if the source literal is not a value of the type the annotation names."""
+    expected = ANNOTATION_TYPES.get(_annotation_name(annotation)) if annotation is not None else None
+    if expected is None:
+        return False
+    try:
+        value = ast.literal_eval(source)
+    except (ValueError, TypeError, SyntaxError):
+        return True
+    # bool is an int subclass, but True is no answer to an int parameter
+    if isinstance(value, bool) and expected is not bool:
+        return True
+    return not isinstance(value, expected)
+
+
+def matches_annotations(func_node, vector, bound=False):
+    """True if every annotated argument of the vector holds a value of its annotated type."""
+    return not any(
+        _contradicts(arg.annotation, source) for arg, source in zip(_bound_arguments(func_node, bound), vector)
+    )
+
+
+def conforming_vector(func_node, vector, bound=False):
+    """The vector with each argument that contradicts its annotation replaced by the annotation's first candidate."""
+    conformed = list(vector)
+    for index, arg in enumerate(_bound_arguments(func_node, bound)[:len(conformed)]):
+        if _contradicts(arg.annotation, conformed[index]):
+            conformed[index] = ANNOTATION_CANDIDATES[_annotation_name(arg.annotation)][0]
+    return conformed
+
+
+def literal_values(vector):
+    """Evaluates a vector of source literals into the Python values they denote."""
+    values = []
+    for source in vector:
+        try:
+            values.append(ast.literal_eval(source))
+        except (ValueError, TypeError, SyntaxError):
+            values.append(source)
+    return values
+
+
+def literal_source(value):
+    """repr(value) if it reads back as an equal literal, else None."""
+    source = repr(value)
+    try:
+        if ast.literal_eval(source) == value:
+            return source
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        pass
+    return None
@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+
+# One manifest per source folder: "<prefix>-<hash of the folder path>.json"
+MANIFEST_FILE_PREFIX = ".intellico_manifest"
+
+
+def file_sha256(file_path):
+    """Returns the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GenerationManifest:
+    """Persistent record of which source files produced which test files.
+
+    Each entry is keyed by the absolute source path and stores the source
+    hash, a hash of the project modules it imports, the generator version
+    and the emitted test file, so unchanged sources can be skipped on the
+    next run. Manifests are kept per absolute source folder, so folders that
+    share a basename (and so a test directory) never see each other's entries.
+    """
+
+    def __init__(self, test_dir, generator_version, source_folder):
+        self.source_folder = os.path.abspath(source_folder)
+        folder_hash = hashlib.sha256(self.source_folder.encode()).hexdigest()[:12]
+        self.path = os.path.join(test_dir, f"{MANIFEST_FILE_PREFIX}-{folder_hash}.json")
+        self.generator_version = generator_version
+        self.entries = self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable manifest {self.path}: {e}")
+            return {}
+        return data.get("files", {})
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({"files": self.entries}, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, source_path, source_hash, dependencies=""):
+        """True if the source and its imports are unchanged and its test file is still on disk."""
+        entry = self.entries.get(os.path.abspath(source_path))
+        return (
+            entry is not None
+            and entry.get("hash") == source_hash
+            and entry.get("dependencies", "") == dependencies
+            and entry.get("generator_version") == self.generator_version
+            and os.path.exists(entry.get("test_file", ""))
+        )
+
+    def record(self, source_path, source_hash, test_file, dependencies=""):
+        self.entries[os.path.abspath(source_path)] = {
+            "hash": source_hash,
+            "dependencies": dependencies,
+            "generator_version": self.generator_version,
+            "test_file": os.path.abspath(test_file),
+        }
+
+    def invalidate_missing(self, source_paths):
+        """Drops entries for this folder's sources that are gone and deletes their tests.
+
+        Returns the number of entries removed.
+        """
+        live = {os.path.abspath(path) for path in source_paths}
+        removed = 0
+        for source_path in list(self.entries):
+            if source_path in live or os.path.dirname(source_path) != self.source_folder:
+                continue
+            test_file = self.entries.pop(source_path).get("test_file")
+            if test_file and os.path.exists(test_file):
+                os.remove(test_file)
+            removed += 1
+        return removed
@@ -0,0 +1,144 @@
+import os
+import ast
+import sys
+import time
+import threading
+import importlib.util
+from collections import OrderedDict
+
+from sampletestcase.manifest import file_sha256
+
+
+def module_import_path(file_path):
+    """(sys.path entry, dotted module name) that imports file_path as a package member.
+
+    Walks up while the parent directories are packages (have an __init__.py),
+    so relative imports inside the file resolve. A file outside any package
+    is imported by its bare name from its own folder.
+    """
+    file_path = os.path.abspath(file_path)
+    root = os.path.dirname(file_path)
+    parts = [os.path.splitext(os.path.basename(file_path))[0]]
+    while os.path.basename(root).isidentifier() and os.path.exists(os.path.join(root, "__init__.py")):
+        parts.insert(0, os.path.basename(root))
+        root = os.path.dirname(root)
+    return root, ".".join(parts)
+
+
+class ModuleCache:
+    """Per-run cache of target modules keyed by file path and content hash.
+
+    Each source file is imported (and its top-level code executed) once; every
+    function in it then reuses the same module globals. With max_modules set,
+    the least recently used modules are evicted, which keeps long-running
+    processes such as watch mode bounded.
+    """
+
+    def __init__(self, max_modules=None):
+        self.max_modules = max_modules
+        self.modules = OrderedDict()
+        self.hashes = {}
+        self.imports = 0
+        self.hits = 0
+        self.import_seconds = 0.0
+
+    def load(self, file_path):
+        file_path = os.path.abspath(file_path)
+        key = (file_path, self.content_hash(file_path))
+        module = self.modules.get(key)
+        if module is not None:
+            self.modules.move_to_end(key)
+            self.record_hit()
+            return module
+
+        # The file's own folder serves sibling imports, the package root serves relative ones
+        search_root, module_name = module_import_path(file_path)
+        for path in (os.path.dirname(file_path), search_root):
+            if path not in sys.path:
+                sys.path.append(path)
+
+        spec = importlib.util.spec_from_file_location(module_name, file_path)
+        module = importlib.util.module_from_spec(spec)
+        package_member = "." in module_name
+        if package_member:
+            # Registered before it runs, as the import system does, so that
+            # "from . import x" cycles and pickling find the module
+            sys.modules[module_name] = module
+        started = time.perf_counter()
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            if package_member:
+                sys.modules.pop(module_name, None)
+            raise
+        self.record_import(time.perf_counter() - started)
+
+        # Drop any stale version of this file before caching the new one.
+        for stale_key in [k for k in self.modules if k[0] == file_path]:
+            del self.modules[stale_key]
+        self.modules[key] = module
+        if self.max_modules is not None:
+            while len(self.modules) > self.max_modules:
+                self.modules.popitem(last=False)
+        return module
+
+    def record_import(self, seconds):
+        self.imports += 1
+        self.import_seconds += seconds
+
+    def record_hit(self):
+        self.hits += 1
+
+    def content_hash(self, file_path):
+        """Hashes a file, re-reading it only when its size or mtime changes."""
+        stat = os.stat(file_path)
+        cached = self.hashes.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        digest = file_sha256(file_path)
+        self.hashes[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def seconds_saved(self):
+        """Estimated import time avoided by cache hits."""
+        if not self.imports:
+            return 0.0
+        return self.hits * (self.import_seconds / self.imports)
+
+    def clear(self):
+        self.modules.clear()
+        self.hashes.clear()
+
+
+class AstCache:
+    """LRU cache of parsed source files, re-parsed only when size or mtime changes."""
+
+    def __init__(self, max_files=512):
+        self.max_files = max_files
+        self.trees = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, file_path):
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        with self.lock:
+            cached = self.trees.get(file_path)
+            if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                self.trees.move_to_end(file_path)
+                self.hits += 1
+                return cached[2]
+        with open(file_path, 'r') as file:
+            tree = ast.parse(file.read(), filename=file_path)
+        with self.lock:
+            self.misses += 1
+            self.trees[file_path] = (stat.st_mtime_ns, stat.st_size, tree)
+            self.trees.move_to_end(file_path)
+            while len(self.trees) > self.max_files:
+                self.trees.popitem(last=False)
+        return tree
+
+    def discard(self, file_path):
+        with self.lock:
+            self.trees.pop(os.path.abspath(file_path), None)
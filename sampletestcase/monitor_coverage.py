@@ -0,0 +1,201 @@
+import os
+import sys
+import dis
+import json
+
+TOOL_NAME = "intellico-coverage"
+RESULT_VERSION = 1
+
+
+def monitoring_available():
+    """sys.monitoring (PEP 669) needs Python 3.12 or newer."""
+    return hasattr(sys, "monitoring")
+
+
+class MonitorCollector:
+    """Line and branch coverage collector built on sys.monitoring.
+
+    Only code objects whose file lies under source_dirs are instrumented,
+    decided once per code object at its first PY_START, so the generator,
+    unittest and the stdlib run untraced. Each line event is disabled after
+    its first hit, and each branch once it has been seen going both ways,
+    after which covered code runs at full speed.
+    """
+
+    def __init__(self, source_dirs):
+        self.prefixes = tuple(os.path.join(os.path.abspath(path), "") for path in source_dirs)
+        self.lines = {}
+        self.branches = {}
+        self.destinations = {}
+        self.instrumented = []
+        self.tool_id = None
+
+    def start(self):
+        monitoring = sys.monitoring
+        events = monitoring.events
+        tool_id = monitoring.COVERAGE_ID
+        owner = monitoring.get_tool(tool_id)
+        if owner is not None:
+            raise RuntimeError(f"sys.monitoring coverage tool id is already used by {owner}")
+        monitoring.use_tool_id(tool_id, TOOL_NAME)
+        self.tool_id = tool_id
+        monitoring.register_callback(tool_id, events.PY_START, self._py_start)
+        monitoring.register_callback(tool_id, events.LINE, self._line)
+        if hasattr(events, "BRANCH_LEFT"):
+            # 3.14+ reports each direction separately, so both can be disabled on first hit
+            self.branch_events = events.BRANCH_LEFT | events.BRANCH_RIGHT
+            monitoring.register_callback(tool_id, events.BRANCH_LEFT, self._branch_direction)
+            monitoring.register_callback(tool_id, events.BRANCH_RIGHT, self._branch_direction)
+        else:
+            self.branch_events = events.BRANCH
+            monitoring.register_callback(tool_id, events.BRANCH, self._branch)
+        monitoring.set_events(tool_id, events.PY_START)
+
+    def stop(self):
+        if self.tool_id is None:
+            return
+        monitoring = sys.monitoring
+        monitoring.set_events(self.tool_id, monitoring.events.NO_EVENTS)
+        for code in self.instrumented:
+            monitoring.set_local_events(self.tool_id, code, monitoring.events.NO_EVENTS)
+        for event in (monitoring.events.PY_START, monitoring.events.LINE, monitoring.events.BRANCH):
+            monitoring.register_callback(self.tool_id, event, None)
+        if hasattr(monitoring.events, "BRANCH_LEFT"):
+            monitoring.register_callback(self.tool_id, monitoring.events.BRANCH_LEFT, None)
+            monitoring.register_callback(self.tool_id, monitoring.events.BRANCH_RIGHT, None)
+        monitoring.free_tool_id(self.tool_id)
+        self.tool_id = None
+
+    def _py_start(self, code, instruction_offset):
+        if code.co_filename.startswith(self.prefixes):
+            self.instrumented.append(code)
+            sys.monitoring.set_local_events(
+                self.tool_id, code, sys.monitoring.events.LINE | self.branch_events
+            )
+        return sys.monitoring.DISABLE
+
+    def _line(self, code, line_number):
+        if line_number > 0:
+            self.lines.setdefault(code.co_filename, set()).add(line_number)
+        return sys.monitoring.DISABLE
+
+    def _record_branch(self, code, instruction_offset, destination_offset):
+        self.branches.setdefault(code.co_filename, set()).add(
+            (code.co_qualname, code.co_firstlineno, instruction_offset, destination_offset)
+        )
+
+    def _branch(self, code, instruction_offset, destination_offset):
+        self._record_branch(code, instruction_offset, destination_offset)
+        # BRANCH is one event for both directions; disabling it early would hide the other one
+        seen = self.destinations.setdefault((code, instruction_offset), set())
+        seen.add(destination_offset)
+        if len(seen) >= 2:
+            return sys.monitoring.DISABLE
+        return None
+
+    def _branch_direction(self, code, instruction_offset, destination_offset):
+        self._record_branch(code, instruction_offset, destination_offset)
+        return sys.monitoring.DISABLE
+
+    def results(self):
+        files = {}
+        for path in set(self.lines) | set(self.branches):
+            files[path] = {"lines": set(self.lines.get(path, ())), "branches": set(self.branches.get(path, ()))}
+        return files
+
+    def save(self, result_file):
+        save_results(self.results(), result_file)
+
+
+def save_results(files, result_file):
+    """Writes measured files as JSON: {path: {"lines": [...], "branches": [[qualname, firstlineno, offset, destination], ...]}}.
+
+    Bytecode offsets are only meaningful for the Python version recorded
+    alongside them.
+    """
+    data = {
+        "version": RESULT_VERSION,
+        "engine": "sys.monitoring",
+        "python": list(sys.version_info[:2]),
+        "files": {
+            path: {"lines": sorted(measured["lines"]), "branches": sorted(list(branch) for branch in measured["branches"])}
+            for path, measured in sorted(files.items())
+        },
+    }
+    tmp_path = result_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, result_file)
+
+
+def load_results(result_files):
+    """Merges result files into {path: {"lines": set, "branches": set}}.
+
+    Branches recorded by a different Python version are dropped, since
+    their offsets do not match this interpreter's bytecode.
+    """
+    files = {}
+    for result_file in result_files:
+        with open(result_file) as f:
+            data = json.load(f)
+        same_python = tuple(data.get("python", ())) == tuple(sys.version_info[:2])
+        for path, measured in data["files"].items():
+            merged = files.setdefault(path, {"lines": set(), "branches": set()})
+            merged["lines"].update(measured["lines"])
+            if same_python:
+                merged["branches"].update(tuple(branch) for branch in measured["branches"])
+    return files
+
+
+def write_coverage_data(files, data_file):
+    """Exports measured lines as a coverage.py data file, replacing any previous one."""
+    import coverage
+
+    data = coverage.CoverageData(basename=data_file)
+    data.erase()
+    data.add_lines({path: sorted(measured["lines"]) for path, measured in files.items()})
+    data.write()
+    return data_file
+
+
+def branch_sites(path):
+    """(qualname, firstlineno, offset) of every conditional jump compiled from path."""
+    with open(path, "rb") as f:
+        source = f.read()
+    sites = set()
+    stack = [compile(source, path, "exec", dont_inherit=True)]
+    while stack:
+        code = stack.pop()
+        for instruction in dis.get_instructions(code):
+            if "JUMP_IF" in instruction.opname or instruction.opname == "FOR_ITER":
+                sites.add((code.co_qualname, code.co_firstlineno, instruction.offset))
+        stack.extend(const for const in code.co_consts if hasattr(const, "co_code"))
+    return sites
+
+
+def summarize_branches(files):
+    """Branch coverage from measured files: {"percent", "files": {path: percent}}.
+
+    Every conditional jump counts as two branches. Files that no longer
+    compile are left out.
+    """
+    per_file = {}
+    total = covered = 0
+    for path, measured in sorted(files.items()):
+        try:
+            sites = branch_sites(path)
+        except (OSError, SyntaxError, ValueError):
+            continue
+        if not sites:
+            continue
+        taken = {}
+        for qualname, firstlineno, offset, destination in measured["branches"]:
+            site = (qualname, firstlineno, offset)
+            if site in sites:
+                taken.setdefault(site, set()).add(destination)
+        hit = sum(min(2, len(destinations)) for destinations in taken.values())
+        total += 2 * len(sites)
+        covered += hit
+        per_file[path] = round(100.0 * hit / (2 * len(sites)), 2)
+    percent = 100.0 * covered / total if total else 100.0
+    return {"percent": round(percent, 2), "files": per_file}
@@ -0,0 +1,116 @@
+import os
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from language_identifier.events import capture
+
+# Files in flight per worker: enough to keep workers busy, few enough that
+# finished test sources waiting for an earlier file stay bounded
+IN_FLIGHT_PER_WORKER = 2
+
+# One generator per worker process for the folder being generated, so the
+# module cache survives across the files a worker is handed.
+_worker_generators = {}
+
+# Tells apart the calls that share the pool, so no worker reuses a generator
+# built for an earlier run
+_run_ids = itertools.count()
+
+# Spawned workers take a while to start, so one pool serves every folder of a run
+_pool = None
+_pool_size = 0
+
+
+def resolve_jobs(jobs):
+    """Normalizes a --jobs value; 0 or None means one worker per CPU."""
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, int(jobs))
+
+
+def _generate_file(task):
+    run_id, folder_path, output_folder, file_path, options = task
+    from sampletestcase.test_case_generator import TestCaseGenerator
+
+    generator = _worker_generators.get(run_id)
+    if generator is None:
+        # Runs come one after another; an earlier one's caches are done with
+        _worker_generators.clear()
+        generator = TestCaseGenerator(folder_path, output_folder, options)
+        _worker_generators[run_id] = generator
+
+    cache = generator.module_cache
+    imports, hits, import_seconds = cache.imports, cache.hits, cache.import_seconds
+    stats_before = generator.stats.copy()
+    generator.function_metrics.clear()
+    events = []
+    try:
+        # Events cannot cross the process boundary live; ship them with the result
+        with capture(events.append):
+            source = generator.generate_test_source(file_path)
+    finally:
+        if generator.sandbox is not None:
+            generator.sandbox.close()
+    return file_path, source, {
+        "stats": generator.stats - stats_before,
+        "cache": (
+            cache.imports - imports,
+            cache.hits - hits,
+            cache.import_seconds - import_seconds,
+        ),
+        "function_metrics": list(generator.function_metrics),
+        "events": events,
+    }
+
+
+def generate_sources_in_parallel(folder_path, output_folder, file_paths, jobs, options=None):
+    """Generates test sources for file_paths in a pool of worker processes.
+
+    Yields (file_path, test_source, report) in the same order as file_paths,
+    so the caller can write files deterministically. options, the caller's
+    GenerationOptions, are passed to each worker's TestCaseGenerator. At
+    most IN_FLIGHT_PER_WORKER files per worker are submitted ahead of the
+    one being yielded, so memory stays bounded by a few test modules rather
+    than the whole folder.
+    """
+    run_id = next(_run_ids)
+    tasks = iter([(run_id, folder_path, output_folder, file_path, options) for file_path in file_paths])
+    workers = min(jobs, len(file_paths))
+    executor = _executor(jobs)
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append(executor.submit(_generate_file, task))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                break
+        while pending:
+            result = pending.popleft().result()
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(executor.submit(_generate_file, task))
+            yield result
+    except BaseException:
+        # A worker died or the caller stopped early; the next folder gets a fresh pool
+        shutdown_pool()
+        raise
+
+
+def _executor(jobs):
+    global _pool, _pool_size
+    if _pool is None or _pool_size < jobs:
+        shutdown_pool()
+        # Spawned, not forked: the caller's writer and parse threads are already running
+        _pool = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+        _pool_size = jobs
+    return _pool
+
+
+def shutdown_pool():
+    """Stops the shared worker pool; it is also stopped when the interpreter exits."""
+    global _pool, _pool_size
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _pool_size = 0
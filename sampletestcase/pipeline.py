@@ -0,0 +1,152 @@
+import os
+import queue
+import threading
+import contextvars
+
+# How many parsed files may wait for execution, and how many test fragments
+# may wait for the writer. Together they cap what is held in memory.
+PARSE_AHEAD = 2
+WRITE_BEHIND = 64
+
+_DONE = object()
+
+
+class _StageFailed:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(items, item, stopped):
+    """Blocking put that gives up once the consumer has stopped."""
+    while not stopped.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _start_thread(target, name):
+    # Run in a copy of the caller's context so events and scoped metrics still reach it
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def iter_parsed_files(file_paths, parse, ahead=PARSE_AHEAD):
+    """Yields (file_path, tree), parsing up to `ahead` files in a background thread.
+
+    Only the trees waiting in the queue and the one being consumed are alive
+    at any time, so memory follows the largest file rather than the package.
+    """
+    parsed = queue.Queue(maxsize=ahead)
+    stopped = threading.Event()
+
+    def read_files():
+        try:
+            for file_path in file_paths:
+                if not _put(parsed, (file_path, parse(file_path)), stopped):
+                    return
+        except BaseException as e:
+            _put(parsed, _StageFailed(e), stopped)
+            return
+        _put(parsed, _DONE, stopped)
+
+    thread = _start_thread(read_files, "intellico-parse")
+    try:
+        while True:
+            item = parsed.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageFailed):
+                raise item.error
+            yield item
+            del item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+class IncrementalTestWriter:
+    """Streams test fragments to their files from a background thread.
+
+    Each test module is written to a .partial file as fragments arrive and
+    renamed into place when the module ends, so a crash never leaves a
+    half-written test module behind. on_written(file_path, test_path,
+    bytes_written) is called from the writer thread after each rename.
+    """
+
+    def __init__(self, on_written=None, max_pending=WRITE_BEHIND):
+        self.on_written = on_written
+        self.items = queue.Queue(maxsize=max_pending)
+        self.stopped = threading.Event()
+        self.error = None
+        self.thread = None
+
+    def start(self):
+        self.thread = _start_thread(self._run, "intellico-writer")
+        return self
+
+    def begin(self, file_path, test_path, header, placeholder):
+        """Starts a test module; placeholder is written if no fragment follows."""
+        self._send(("begin", file_path, test_path, header, placeholder))
+
+    def add(self, fragment):
+        self._send(("fragment", fragment))
+
+    def end(self):
+        self._send(("end",))
+
+    def write_file(self, file_path, test_path, source):
+        """Writes an already rendered test module."""
+        self.begin(file_path, test_path, source, "")
+        self.end()
+
+    def close(self):
+        """Flushes pending writes, stops the thread and re-raises any write error."""
+        if self.thread is not None:
+            _put(self.items, _DONE, self.stopped)
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            raise self.error
+
+    def _send(self, item):
+        if self.error is not None:
+            raise self.error
+        _put(self.items, item, self.stopped)
+
+    def _run(self):
+        current = None
+        try:
+            while True:
+                item = self.items.get()
+                if item is _DONE:
+                    return
+                if item[0] == "begin":
+                    _, file_path, test_path, header, placeholder = item
+                    handle = open(test_path + ".partial", "w")
+                    handle.write(header)
+                    current = [file_path, test_path, handle, placeholder, len(header.encode())]
+                elif item[0] == "fragment":
+                    current[2].write(item[1])
+                    current[3] = ""
+                    current[4] += len(item[1].encode())
+                else:
+                    file_path, test_path, handle, placeholder, size = current
+                    handle.write(placeholder)
+                    handle.close()
+                    current = None
+                    os.replace(test_path + ".partial", test_path)
+                    if self.on_written is not None:
+                        self.on_written(file_path, test_path, size + len(placeholder.encode()))
+        except BaseException as e:
+            self.error = e
+            # Producers check this flag, so they never block on a dead writer
+            self.stopped.set()
+        finally:
+            if current is not None:
+                current[2].close()
+                if os.path.exists(current[1] + ".partial"):
+                    os.remove(current[1] + ".partial")
@@ -0,0 +1,535 @@
+import os
+import sys
+import time
+import pickle
+import select
+import signal
+import socket
+import struct
+import threading
+import subprocess
+import multiprocessing.connection
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from sampletestcase.module_cache import ModuleCache
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_CRASHED = "crashed"
+
+# Extra time the parent gives a warm worker on top of the per-call limit
+# before it declares the worker itself hung.
+WORKER_GRACE_SECONDS = 2.0
+
+# Return values of these exact types, and lists, tuples, sets and dicts of
+# them, cross the pipe as they are; anything else becomes an OpaqueValue.
+LITERAL_TYPES = (type(None), bool, int, float, complex, str, bytes)
+CONTAINER_TYPES = (list, tuple, set, frozenset)
+# Deeper containers are sent as an OpaqueValue as a whole
+MAX_VALUE_DEPTH = 20
+
+# Started lazily; see _zygote
+_zygote_process = None
+_zygote_lock = threading.Lock()
+
+
+class ExecutionFailed(Exception):
+    """The target function raised; exc_type_name is the original exception class."""
+
+    def __init__(self, exc_type_name, message=""):
+        super().__init__(f"{exc_type_name}: {message}")
+        self.exc_type_name = exc_type_name
+
+
+class ExecutionAborted(Exception):
+    """The call produced no result: it was killed or its process died."""
+
+
+class ExecutionTimeout(ExecutionAborted):
+    """The target function exceeded its wall-clock limit and was killed."""
+
+    def __init__(self, func_name, seconds):
+        super().__init__(f"{func_name} timed out after {seconds}s")
+        self.func_name = func_name
+        self.seconds = seconds
+
+
+class OpaqueValue:
+    """Stands in for a return value that is not a plain literal.
+
+    The generator process does not import target modules, so it could not
+    unpickle their objects, and their reprs (e.g. "<Point object at 0x...>")
+    are no stable expectation; only the type name and repr cross the pipe.
+    """
+
+    def __init__(self, type_name, text):
+        self.type_name = type_name
+        self.text = text
+
+    def __repr__(self):
+        return self.text
+
+    __str__ = __repr__
+
+
+def _safe_repr(value):
+    try:
+        return repr(value)[:200]
+    except Exception:
+        return f"<{type(value).__name__}>"
+
+
+def portable_value(value, depth=0):
+    """value with everything but plain literals and containers of them replaced by OpaqueValue."""
+    value_type = type(value)
+    if value_type in LITERAL_TYPES:
+        return value
+    if depth < MAX_VALUE_DEPTH:
+        if value_type in CONTAINER_TYPES:
+            return value_type(portable_value(item, depth + 1) for item in value)
+        if value_type is dict:
+            return {portable_value(key, depth + 1): portable_value(item, depth + 1) for key, item in value.items()}
+    return OpaqueValue(value_type.__name__, _safe_repr(value))
+
+
+def result_type_name(value):
+    return value.type_name if isinstance(value, OpaqueValue) else type(value).__name__
+
+
+def raise_for_outcome(func_name, timeout, outcome):
+    """Returns the value of an OUTCOME_OK outcome, otherwise raises the matching exception."""
+    if outcome[0] == OUTCOME_OK:
+        return outcome[1]
+    if outcome[0] == OUTCOME_TIMEOUT:
+        raise ExecutionTimeout(func_name, timeout)
+    if outcome[0] == OUTCOME_CRASHED:
+        raise ExecutionAborted(f"{func_name} crashed ({outcome[1]})")
+    raise ExecutionFailed(outcome[1], outcome[2])
+
+
+def fork_available():
+    return hasattr(os, "fork")
+
+
+def _apply_limits(memory_limit_mb):
+    # Target code must never wait on the terminal.
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    sys.stdin = open(os.devnull, "r")
+    if resource is not None and memory_limit_mb:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+
+
+def call_outcome(func, args):
+    """Calls func(*args) and returns its outcome tuple, with the value made portable."""
+    try:
+        return (OUTCOME_OK, portable_value(func(*args)))
+    except BaseException as e:
+        return (OUTCOME_ERROR, e.__class__.__name__, str(e)[:200])
+
+
+def call_traced(func, args, filename):
+    """Like call_outcome, but also returns the arcs the call executed in filename.
+
+    Arcs are (from_line, to_line) pairs; negative line numbers mark entering
+    and leaving a function, as in coverage.py. Frames of other files are not
+    traced at all.
+    """
+    arcs = set()
+
+    def trace_calls(frame, event, arg):
+        if frame.f_code.co_filename != filename:
+            return None
+        previous = [-frame.f_code.co_firstlineno]
+
+        def trace_lines(frame, event, arg):
+            if event == "line":
+                arcs.add((previous[0], frame.f_lineno))
+                previous[0] = frame.f_lineno
+            elif event == "return":
+                arcs.add((previous[0], -frame.f_code.co_firstlineno))
+            return trace_lines
+        return trace_lines
+
+    sys.settrace(trace_calls)
+    try:
+        outcome = call_outcome(func, args)
+    finally:
+        sys.settrace(None)
+    return outcome, arcs
+
+
+def _encode_result(outcome, arcs=None):
+    """A length-prefixed frame of (type name of the value, pickled outcome).
+
+    The type name travels outside the inner pickle, so the parent still has
+    it if the outcome cannot be unpickled there.
+    """
+    type_name = result_type_name(outcome[1]) if outcome[0] == OUTCOME_OK else ""
+    try:
+        body = pickle.dumps(outcome if arcs is None else (outcome, sorted(arcs)))
+    except Exception:
+        outcome = (OUTCOME_OK, OpaqueValue(type_name, _safe_repr(outcome[1])))
+        body = pickle.dumps(outcome if arcs is None else (outcome, sorted(arcs)))
+    payload = pickle.dumps((type_name, body))
+    return struct.pack("!I", len(payload)) + payload
+
+
+def _run_calls(module, func_code, func_name, arg_vectors, memory_limit_mb, write_fd, trace=False):
+    """Body of the short-lived per-batch child; streams one framed outcome per vector.
+
+    With trace, each frame is (outcome, arcs executed in the module's file).
+    """
+    _apply_limits(memory_limit_mb)
+    with os.fdopen(write_fd, "wb", buffering=0) as pipe:
+        try:
+            exec_globals = dict(module.__dict__)
+            exec_locals = {}
+            exec(func_code, exec_globals, exec_locals)
+            func = exec_locals[func_name]
+        except BaseException as e:
+            setup_error = (OUTCOME_ERROR, e.__class__.__name__, str(e)[:200])
+            for _ in arg_vectors:
+                pipe.write(_encode_result(setup_error, () if trace else None))
+            return
+        for args in arg_vectors:
+            if trace:
+                pipe.write(_encode_result(*call_traced(func, args, module.__file__)))
+            else:
+                pipe.write(_encode_result(call_outcome(func, args)))
+
+
+class _FrameReader:
+    """Reads length-prefixed frames from a pipe, each within its own deadline.
+
+    trace says whether frames are (outcome, arcs) pairs, see _run_calls.
+    """
+
+    def __init__(self, read_fd, trace=False):
+        self.read_fd = read_fd
+        self.trace = trace
+        self.buffer = b""
+        self.eof = False
+
+    def _fill(self, size, deadline):
+        while len(self.buffer) < size:
+            if self.eof:
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([self.read_fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(self.read_fd, 65536)
+            if not chunk:
+                self.eof = True
+            self.buffer += chunk
+        return True
+
+    def read_frame(self, deadline):
+        """Returns the unpickled frame, None on timeout or False on EOF."""
+        filled = self._fill(4, deadline)
+        if not filled:
+            return filled
+        (size,) = struct.unpack("!I", self.buffer[:4])
+        filled = self._fill(4 + size, deadline)
+        if not filled:
+            return filled
+        payload, self.buffer = self.buffer[4:4 + size], self.buffer[4 + size:]
+        type_name, body = pickle.loads(payload)
+        try:
+            return pickle.loads(body)
+        except Exception as e:
+            # E.g. a value that refers to a module only the worker imported
+            outcome = (OUTCOME_OK, OpaqueValue(type_name, f"<unreadable {type_name}: {e.__class__.__name__}>"))
+            return (outcome, []) if self.trace else outcome
+
+
+def _isolated_calls(module, request):
+    """Forks a copy-on-write child of the warm worker for one batch of calls.
+
+    Every argument vector gets its own wall-clock limit. If one overruns,
+    the child is killed and that vector and the rest are reported as
+    timeouts.
+    """
+    func_code, func_name, arg_vectors, timeout, memory_limit_mb, trace = request
+    read_fd, write_fd = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            _run_calls(module, func_code, func_name, arg_vectors, memory_limit_mb, write_fd, trace)
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    outcomes = []
+    reader = _FrameReader(read_fd, trace)
+    try:
+        while len(outcomes) < len(arg_vectors):
+            outcome = reader.read_frame(time.monotonic() + timeout)
+            if not outcome:
+                break
+            outcomes.append(outcome)
+    finally:
+        os.close(read_fd)
+
+    if len(outcomes) == len(arg_vectors):
+        os.waitpid(pid, 0)
+        return outcomes
+    if outcome is None:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        missing = (OUTCOME_TIMEOUT,)
+    else:
+        _, status = os.waitpid(pid, 0)
+        missing = (OUTCOME_CRASHED, f"exit status {status}")
+    if trace:
+        missing = (missing, [])
+    return outcomes + [missing] * (len(arg_vectors) - len(outcomes))
+
+
+def _serve(conn, file_path, memory_limit_mb):
+    """Main loop of a warm worker: import once, then fork per call."""
+    _apply_limits(memory_limit_mb)
+    started = time.perf_counter()
+    try:
+        module = ModuleCache().load(file_path)
+        import_error = None
+    except BaseException as e:
+        module = None
+        import_error = (OUTCOME_ERROR, e.__class__.__name__, str(e)[:200])
+    conn.send(("ready", time.perf_counter() - started))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        if import_error is not None:
+            conn.send([(import_error, []) if request[5] else import_error] * len(request[2]))
+            continue
+        conn.send(_isolated_calls(module, request))
+
+
+def _recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _zygote_main(control_fd):
+    """Main loop of the zygote: fork one warm worker per request."""
+    control = socket.socket(fileno=control_fd)
+    # Exited workers are reaped by the kernel
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            header, fds, _, _ = socket.recv_fds(control, 4, 1)
+            payload = _recv_exactly(control, struct.unpack("!I", header)[0]) if len(header) == 4 else None
+        except (OSError, struct.error):
+            return
+        if payload is None:  # the generator exited
+            return
+        file_path, memory_limit_mb = pickle.loads(payload)
+        pid = os.fork()
+        if pid == 0:
+            control.close()
+            # The worker waits for its own per-call children
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                _serve(multiprocessing.connection.Connection(fds[0]), file_path, memory_limit_mb)
+            finally:
+                os._exit(0)
+        os.close(fds[0])
+        control.sendall(struct.pack("!i", pid))
+
+
+class _Zygote:
+    """A fresh single-threaded interpreter that forks warm workers on request.
+
+    A worker forked straight from the generator could inherit a lock held
+    by one of its writer or parse threads; a child of the zygote cannot.
+    Starting the zygote execs a new interpreter, which is safe with
+    threads running, and it imports only this module.
+    """
+
+    def __init__(self):
+        self.owner_pid = os.getpid()
+        self.lock = threading.Lock()
+        self.control, child_control = socket.socketpair()
+        command = (
+            f"import sys; sys.path[:] = {sys.path!r}; "
+            f"from sampletestcase.sandbox import _zygote_main; _zygote_main({child_control.fileno()})"
+        )
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", command], pass_fds=[child_control.fileno()], stdin=subprocess.DEVNULL,
+        )
+        child_control.close()
+
+    def alive(self):
+        return self.owner_pid == os.getpid() and self.process.poll() is None
+
+    def fork_worker(self, file_path, memory_limit_mb):
+        """Returns (pid, connection) of a new worker serving file_path."""
+        parent_sock, child_sock = socket.socketpair()
+        payload = pickle.dumps((file_path, memory_limit_mb))
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            with self.lock:
+                socket.send_fds(self.control, [struct.pack("!I", len(payload)) + payload], [child_sock.fileno()])
+                reply = _recv_exactly(self.control, 4)
+        finally:
+            child_sock.close()
+        if reply is None:
+            parent_sock.close()
+            raise OSError("sandbox zygote exited")
+        return struct.unpack("!i", reply)[0], multiprocessing.connection.Connection(parent_sock.detach())
+
+
+def _zygote():
+    """The zygote of this process, started (or restarted) on first use."""
+    global _zygote_process
+    with _zygote_lock:
+        if _zygote_process is None or not _zygote_process.alive():
+            _zygote_process = _Zygote()
+        return _zygote_process
+
+
+class WarmWorker:
+    """A process, forked by the zygote, that has already imported one target module."""
+
+    def __init__(self, file_path, memory_limit_mb):
+        self.file_path = file_path
+        self.pid, self.conn = _zygote().fork_worker(file_path, memory_limit_mb)
+        self.import_seconds = None
+
+    def wait_ready(self, timeout):
+        """Waits for the module import; returns False if it hung."""
+        if not self.conn.poll(timeout):
+            return False
+        try:
+            _, self.import_seconds = self.conn.recv()
+        except (EOFError, OSError):
+            return False
+        return True
+
+    def call(self, request, timeout):
+        """Sends one batch; returns the outcome list or None if the worker hung or died."""
+        try:
+            self.conn.send(request)
+            if not self.conn.poll(timeout):
+                return None
+            return self.conn.recv()
+        except (EOFError, OSError):
+            return None
+
+    def kill(self):
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        # The zygote reaps it
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+class ExecutionSandbox:
+    """Runs target functions in a warm per-module worker with time and memory limits.
+
+    The worker imports the module once and forks a child for each call, so
+    calls are isolated from each other and from the generator through
+    copy-on-write. Hung workers are killed and replaced.
+    """
+
+    def __init__(self, module_cache, timeout=5.0, memory_limit_mb=512):
+        self.module_cache = module_cache
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.worker = None
+        self.calls_on_worker = 0
+        self.hung_imports = set()
+        self.timeouts = 0
+        self.restarts = 0
+
+    def warm(self, file_path):
+        """Starts (or reuses) a worker that has imported file_path."""
+        file_path = os.path.abspath(file_path)
+        if self.worker is not None and self.worker.file_path == file_path:
+            return self.worker
+        self.close()
+        if file_path in self.hung_imports:
+            raise ExecutionTimeout(os.path.basename(file_path), self.timeout)
+        worker = WarmWorker(file_path, self.memory_limit_mb)
+        if not worker.wait_ready(self.timeout + WORKER_GRACE_SECONDS):
+            # Importing the module itself hung; every call gets a timeout.
+            worker.kill()
+            self.hung_imports.add(file_path)
+            self.timeouts += 1
+            raise ExecutionTimeout(os.path.basename(file_path), self.timeout)
+        self.module_cache.record_import(worker.import_seconds)
+        self.worker = worker
+        self.calls_on_worker = 0
+        return worker
+
+    def call_batch(self, file_path, func_code, func_name, arg_vectors, trace=False):
+        """Runs func_name once per argument vector in a single forked child.
+
+        Returns one outcome tuple per vector: (OUTCOME_OK, value),
+        (OUTCOME_ERROR, exc_type_name, message), (OUTCOME_TIMEOUT,) or
+        (OUTCOME_CRASHED, detail). With trace, each entry is instead
+        (outcome, arcs), see call_traced.
+        """
+        no_result = ((OUTCOME_TIMEOUT,), []) if trace else (OUTCOME_TIMEOUT,)
+        try:
+            worker = self.warm(file_path)
+        except ExecutionTimeout:
+            return [no_result] * len(arg_vectors)
+        if self.calls_on_worker:
+            self.module_cache.record_hit()
+        self.calls_on_worker += 1
+
+        request = (func_code, func_name, [list(args) for args in arg_vectors], self.timeout, self.memory_limit_mb, trace)
+        outcomes = worker.call(request, self.timeout * len(arg_vectors) + WORKER_GRACE_SECONDS)
+        if outcomes is None:
+            worker.kill()
+            self.worker = None
+            self.restarts += 1
+            outcomes = [no_result] * len(arg_vectors)
+        self.timeouts += sum(1 for outcome in outcomes if (outcome[0] if trace else outcome)[0] == OUTCOME_TIMEOUT)
+        return outcomes
+
+    def call(self, file_path, func_code, func_name, args):
+        return raise_for_outcome(func_name, self.timeout, self.call_batch(file_path, func_code, func_name, [args])[0])
+
+    def close(self):
+        if self.worker is not None:
+            try:
+                self.worker.conn.send(None)
+            except OSError:
+                pass
+            self.worker.kill()
+            self.worker = None
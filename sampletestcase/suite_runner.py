@@ -0,0 +1,356 @@
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+import importlib.util
+
+import coverage
+
+from sampletestcase.monitor_coverage import (
+    MonitorCollector,
+    load_results,
+    monitoring_available,
+    save_results,
+    summarize_branches,
+    write_coverage_data,
+)
+from sampletestcase.parallel import resolve_jobs
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "coverage" traces with coverage.py; "monitor" uses the sys.monitoring collector (Python 3.12+)
+COVERAGE_ENGINES = ("coverage", "monitor")
+# Merged sys.monitoring results, kept next to the coverage.py data file
+MONITOR_RESULTS_SUFFIX = "-monitor.json"
+
+
+def discover_test_modules(test_dirs):
+    modules = []
+    for test_dir in test_dirs:
+        modules.extend(sorted(glob.glob(os.path.join(test_dir, "test_*.py"))))
+    return modules
+
+
+def split_into_shards(test_modules, shard_count):
+    """Balances modules across shards by file size, largest first."""
+    shards = [[] for _ in range(max(1, min(shard_count, len(test_modules))))]
+    loads = [0] * len(shards)
+    for module in sorted(test_modules, key=lambda path: (-os.path.getsize(path), path)):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(module)
+        loads[lightest] += os.path.getsize(module)
+    return [sorted(shard) for shard in shards if shard]
+
+
+class _CollectingResult(unittest.TextTestResult):
+    """TextTestResult that also records one structured entry per test."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = []
+        self._started = {}
+
+    def startTest(self, test):
+        self._started[test.id()] = time.perf_counter()
+        super().startTest(test)
+
+    def _record(self, test, status, message=None):
+        started = self._started.pop(test.id(), None)
+        self.records.append({
+            "id": test.id(),
+            "status": status,
+            "message": message,
+            "seconds": round(time.perf_counter() - started, 4) if started else None,
+        })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "passed")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "failed", str(err[1])[:500])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "error", f"{err[0].__name__}: {err[1]}"[:500])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skipped", reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, "passed")
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, "failed", "unexpected success")
+
+
+def _load_test_module(path):
+    """Imports a generated test module by path under a name that cannot collide."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name in sys.modules:
+        name = f"{os.path.basename(os.path.dirname(path))}.{name}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def resolve_engine(engine, source_dirs):
+    """engine, or COVERAGE_ENGINE, falling back to coverage.py where sys.monitoring cannot be used."""
+    engine = engine or os.getenv("COVERAGE_ENGINE", "coverage")
+    if engine not in COVERAGE_ENGINES:
+        raise ValueError(f"Unknown coverage engine {engine!r}; expected one of {', '.join(COVERAGE_ENGINES)}")
+    if engine == "monitor" and not monitoring_available():
+        print(f"sys.monitoring needs Python 3.12+ (this is {sys.version.split()[0]}); measuring with coverage.py")
+        return "coverage"
+    if engine == "monitor" and not source_dirs:
+        # The collector only instruments code under explicit source folders
+        return "coverage"
+    return engine
+
+
+def run_shard(test_modules, data_file, source_dirs, result_file, engine="coverage"):
+    """Worker side: runs some test modules under parallel-mode coverage or the sys.monitoring collector."""
+    if engine == "monitor":
+        collector = MonitorCollector(source_dirs)
+        collector.start()
+    else:
+        cov = coverage.Coverage(data_file=data_file, data_suffix=True, source=source_dirs or None)
+        cov.start()
+    suite = unittest.TestSuite()
+    records = []
+    for path in test_modules:
+        try:
+            suite.addTests(unittest.TestLoader().loadTestsFromModule(_load_test_module(path)))
+        except Exception as e:
+            records.append({"id": path, "status": "error", "message": f"{e.__class__.__name__}: {e}"[:500], "seconds": None})
+    runner = unittest.TextTestRunner(resultclass=_CollectingResult, verbosity=1)
+    result = runner.run(suite)
+    if engine == "monitor":
+        collector.stop()
+        collector.save(data_file)
+    else:
+        cov.stop()
+        cov.save()
+    with open(result_file, "w") as f:
+        json.dump(records + result.records, f)
+
+
+def run_generated_tests(test_dirs, coverage_file_path, source_dirs=None, jobs=1, test_modules=None, engine=None):
+    """Runs generated test modules in parallel subprocesses and merges their coverage.
+
+    Modules are split into at most `jobs` shards (0 means one per CPU). Each shard runs in its own
+    interpreter with coverage in parallel mode, restricted to source_dirs so
+    the generator and unittest themselves are not traced. The parent then
+    combines the shard data files into coverage_file_path.
+
+    With engine "monitor" (or COVERAGE_ENGINE=monitor) on Python 3.12+, shards
+    measure lines and branches with sys.monitoring instead. Their results are
+    merged into coverage_file_path + MONITOR_RESULTS_SUFFIX and exported as
+    coverage.py line data to coverage_file_path, so reports work either way.
+
+    test_modules, when given, replaces discovery with an explicit list.
+    Returns a dict with per-test outcomes, totals and coverage percentages.
+    """
+    started = time.perf_counter()
+    if test_modules is None:
+        test_modules = discover_test_modules(test_dirs)
+    test_modules = [path for path in test_modules if os.path.exists(path)]
+    shards = split_into_shards(test_modules, resolve_jobs(jobs))
+    work_dir = tempfile.mkdtemp(prefix="intellico-cov-")
+    source_dirs = [os.path.abspath(path) for path in (source_dirs or [])]
+    engine = resolve_engine(engine, source_dirs)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_DIR, env.get("PYTHONPATH")]))
+
+    try:
+        processes = []
+        for index, shard in enumerate(shards):
+            result_file = os.path.join(work_dir, f"results-{index}.json")
+            data_file = os.path.join(work_dir, f"monitor-{index}.json" if engine == "monitor" else ".coverage")
+            command = [
+                sys.executable, "-m", "sampletestcase.suite_runner",
+                "--data-file", data_file,
+                "--result-file", result_file,
+                "--engine", engine,
+            ]
+            for source_dir in source_dirs:
+                command += ["--source", source_dir]
+            processes.append((subprocess.Popen(command + shard, env=env, stdin=subprocess.DEVNULL), result_file, shard))
+
+        tests = []
+        for process, result_file, shard in processes:
+            returncode = process.wait()
+            try:
+                with open(result_file) as f:
+                    tests.extend(json.load(f))
+            except (OSError, ValueError):
+                tests.extend(
+                    {"id": path, "status": "error", "message": f"shard exited with {returncode}", "seconds": None}
+                    for path in shard
+                )
+
+        if engine == "monitor":
+            measured = load_results(glob.glob(os.path.join(work_dir, "monitor-*.json")))
+            save_results(measured, coverage_file_path + MONITOR_RESULTS_SUFFIX)
+            write_coverage_data(measured, coverage_file_path)
+            cov = coverage.Coverage(data_file=coverage_file_path)
+            cov.load()
+            coverage_summary = summarize_coverage(cov)
+            coverage_summary["branches"] = summarize_branches(measured)
+        else:
+            cov = coverage.Coverage(data_file=coverage_file_path)
+            data_files = glob.glob(os.path.join(work_dir, ".coverage.*"))
+            if data_files:
+                cov.combine(data_paths=data_files, keep=False)
+            cov.save()
+            coverage_summary = summarize_coverage(cov)
+        coverage_summary["engine"] = engine
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    counts = {status: 0 for status in ("passed", "failed", "error", "skipped")}
+    for test in tests:
+        counts[test["status"]] = counts.get(test["status"], 0) + 1
+    return {
+        "tests": tests,
+        "tests_run": len(tests),
+        "counts": counts,
+        "shards": len(shards),
+        "coverage": coverage_summary,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def merge_coverage_data(sources, coverage_file_path):
+    """Combines coverage data files written elsewhere, e.g. by shards on other machines.
+
+    sources are (data_file, map_path) pairs; map_path rewrites each measured
+    path to where that source file lives here. sys.monitoring results kept
+    next to a data file are merged too, for branch coverage. Returns a
+    coverage summary shaped like run_generated_tests'.
+    """
+    merged = coverage.CoverageData(basename=coverage_file_path)
+    merged.erase()
+    measured = {}
+    for data_file, map_path in sources:
+        monitor_file = data_file + MONITOR_RESULTS_SUFFIX
+        if os.path.exists(monitor_file):
+            for path, results in load_results([monitor_file]).items():
+                target = measured.setdefault(map_path(path), {"lines": set(), "branches": set()})
+                target["lines"].update(results["lines"])
+                target["branches"].update(results["branches"])
+        if not os.path.exists(data_file):
+            continue
+        data = coverage.CoverageData(basename=data_file)
+        data.read()
+        if data.has_arcs():
+            merged.add_arcs({map_path(path): data.arcs(path) for path in data.measured_files()})
+        else:
+            merged.add_lines({map_path(path): data.lines(path) for path in data.measured_files()})
+    merged.write()
+
+    cov = coverage.Coverage(data_file=coverage_file_path)
+    cov.load()
+    coverage_summary = summarize_coverage(cov)
+    coverage_summary["engine"] = "monitor" if measured else "coverage"
+    if measured:
+        save_results(measured, coverage_file_path + MONITOR_RESULTS_SUFFIX)
+        coverage_summary["branches"] = summarize_branches(measured)
+    return coverage_summary
+
+
+def update_coverage_data(coverage_file_path, partial_file_path, replaced_paths=()):
+    """Folds the coverage of a partial run into coverage_file_path.
+
+    Files the partial run executed, and replaced_paths (e.g. regenerated or
+    deleted sources), lose their earlier data first; every other file keeps
+    it, so coverage_file_path still describes the whole tree. Returns a
+    coverage summary shaped like run_generated_tests'.
+    """
+    partial = coverage.CoverageData(basename=partial_file_path)
+    partial.read()
+    # Source files the partial run never imported are recorded with no lines
+    executed = {path for path in partial.measured_files() if partial.lines(path)}
+    replaced = executed | {os.path.abspath(path) for path in replaced_paths}
+    previous = coverage.CoverageData(basename=coverage_file_path)
+    if os.path.exists(coverage_file_path):
+        previous.read()
+    kept = {}
+    # Line and arc data cannot share a file; a switch of mode starts over
+    if not previous.measured_files() or previous.has_arcs() == partial.has_arcs():
+        for path in previous.measured_files():
+            if path not in replaced:
+                kept[path] = previous.arcs(path) if previous.has_arcs() else previous.lines(path)
+
+    merged = coverage.CoverageData(basename=coverage_file_path)
+    merged.erase()
+    for data in (kept, {path: partial.arcs(path) if partial.has_arcs() else partial.lines(path)
+                        for path in partial.measured_files() if path in replaced or path not in kept}):
+        if not data:
+            continue
+        if partial.has_arcs():
+            merged.add_arcs(data)
+        else:
+            merged.add_lines(data)
+    merged.write()
+
+    measured = {}
+    partial_monitor_file = partial_file_path + MONITOR_RESULTS_SUFFIX
+    if os.path.exists(partial_monitor_file):
+        monitor_file = coverage_file_path + MONITOR_RESULTS_SUFFIX
+        if os.path.exists(monitor_file):
+            measured = {
+                path: results for path, results in load_results([monitor_file]).items() if path not in replaced
+            }
+        measured.update(load_results([partial_monitor_file]))
+        save_results(measured, monitor_file)
+
+    cov = coverage.Coverage(data_file=coverage_file_path)
+    cov.load()
+    coverage_summary = summarize_coverage(cov)
+    coverage_summary["engine"] = "monitor" if measured else "coverage"
+    if measured:
+        coverage_summary["branches"] = summarize_branches(measured)
+    return coverage_summary
+
+
+def summarize_coverage(cov):
+    files = {}
+    total_statements = total_missing = 0
+    for path in sorted(cov.get_data().measured_files()):
+        try:
+            _, statements, _, missing, _ = cov.analysis2(path)
+        except (coverage.exceptions.NoSource, coverage.exceptions.NotPython):
+            # Deleted, or being edited and not parseable right now
+            continue
+        total_statements += len(statements)
+        total_missing += len(missing)
+        files[path] = round(100.0 * (len(statements) - len(missing)) / len(statements), 2) if statements else 100.0
+    percent = 100.0 * (total_statements - total_missing) / total_statements if total_statements else 100.0
+    if files:
+        cov.report(ignore_errors=True)
+    return {"percent": round(percent, 2), "files": files}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run one shard of generated tests")
+    parser.add_argument("--data-file", required=True)
+    parser.add_argument("--result-file", required=True)
+    parser.add_argument("--source", action="append", default=[])
+    parser.add_argument("--engine", choices=COVERAGE_ENGINES, default="coverage")
+    parser.add_argument("modules", nargs="*")
+    args = parser.parse_args()
+    run_shard(args.modules, args.data_file, args.source, args.result_file, args.engine)
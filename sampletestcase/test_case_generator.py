@@ -1,72 +1,631 @@
 import ast
-import unittest
-import coverage
 import os
 import glob
 import sys
-import random
-import importlib.util
-import networkx as nx
+import time
+import hashlib
+from collections import Counter
 from dotenv import load_dotenv
 load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_identifier import metrics
+from language_identifier.events import emit, replay
+from sampletestcase.cfg import build_cfg
+from sampletestcase.execution_cache import (
+    CACHE_FILE_NAME,
+    DEFAULT_MAX_MB,
+    ExecutionCache,
+    ModuleGlobals,
+    execution_key,
+)
+from sampletestcase.import_graph import ImportIndex
+from sampletestcase.input_search import search_inputs
+from sampletestcase.inputs import (
+    candidate_argument_vectors,
+    conforming_vector,
+    literal_source,
+    literal_values,
+    matches_annotations,
+    seeded_rng,
+)
+from sampletestcase.manifest import GenerationManifest, file_sha256
+from sampletestcase.module_cache import ModuleCache, module_import_path
+from sampletestcase.pipeline import IncrementalTestWriter, iter_parsed_files
+from sampletestcase.parallel import generate_sources_in_parallel, resolve_jobs
+from sampletestcase.suite_runner import run_generated_tests
+from sampletestcase.sandbox import (
+    OUTCOME_CRASHED,
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    OUTCOME_TIMEOUT,
+    ExecutionSandbox,
+    call_outcome,
+    call_traced,
+    fork_available,
+    raise_for_outcome,
+    result_type_name,
+)
+
+# Bump whenever the emitted test format changes so incremental runs regenerate.
+GENERATOR_VERSION = "6"
+
+# Body of a generated test class when the module has nothing to test
+PLACEHOLDER_TEST = "    def test_placeholder(self):\n        pass\n"
+
+# Constructor argument vectors tried per class before its instance tests are skipped
+CONSTRUCTOR_ATTEMPTS = 4
+
+# Calls the module's own function during input search, so its lines are
+# traced where they live in the module file
+SEARCH_DRIVER_NAME = "_intellico_call_function"
+SEARCH_DRIVER_TEMPLATE = """
+def {driver}(*args):
+    return {func_name}(*args)
+"""
+
+# Runs in the target module's globals with (kind, attribute, args). One batch
+# shares a single instance, the same way the generated tests share the one
+# built in setUpClass.
+CLASS_DRIVER_NAME = "_intellico_call_member"
+CLASS_DRIVER_TEMPLATE = """
+def {driver}(kind, attribute, args, _state={{}}):
+    if kind == "init":
+        _state["instance"] = {class_name}(*args)
+        return None
+    if kind == "static":
+        return getattr({class_name}, attribute)(*args)
+    if kind == "property":
+        return getattr(_state["instance"], attribute)
+    return getattr(_state["instance"], attribute)(*args)
+"""
+
+
+def decorator_names(func_node):
+    names = []
+    for decorator in func_node.decorator_list:
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+        if isinstance(decorator, ast.Name):
+            names.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute):
+            names.append(decorator.attr)
+    return names
+
+
+def member_kind(func_node):
+    """How a test calls a method: "method", "classmethod", "staticmethod" or "property".
+
+    None for members that get no test: dunders, abstract methods, and
+    property setters and deleters.
+    """
+    decorators = decorator_names(func_node)
+    if func_node.name.startswith("__") or "abstractmethod" in decorators:
+        return None
+    if "setter" in decorators or "deleter" in decorators:
+        return None
+    if "property" in decorators or "cached_property" in decorators:
+        return "property"
+    for kind in ("classmethod", "staticmethod"):
+        if kind in decorators:
+            return kind
+    return "method"
+
+
+def unique_name(name, used):
+    """name, or name_2, name_3, ... if it is already in used; records the result."""
+    candidate = name
+    suffix = 2
+    while candidate in used:
+        candidate = f"{name}_{suffix}"
+        suffix += 1
+    used.add(candidate)
+    return candidate
  
+def generated_test_dir(output_folder, folder_path):
+    """Where the tests generated for the Python files of folder_path go."""
+    return os.path.join(output_folder, f"test_{os.path.basename(folder_path)}")
+
+
+def generated_test_path(test_dir, file_name):
+    return os.path.join(test_dir, f"test_{os.path.basename(file_name)}")
+
+
+class GenerationOptions:
+    """How a generator executes target functions, searches their inputs and caches the outcomes.
+
+    Parallel workers build their own generator from the same options, so
+    every value must pickle.
+    """
+
+    def __init__(self, sandbox=True, exec_timeout=5.0, exec_memory_mb=512, inputs_per_function=1,
+                 search_budget=0.0, coverage_target=1.0, exec_cache=True, exec_cache_mb=DEFAULT_MAX_MB):
+        # Run target code in forked, time-limited workers where the platform allows it
+        self.sandbox = sandbox
+        self.exec_timeout = exec_timeout
+        self.exec_memory_mb = exec_memory_mb
+        # Above 1, each function gets one table-driven test over several inputs
+        self.inputs_per_function = max(1, int(inputs_per_function))
+        # Seconds of coverage-guided input search per function; 0 keeps the fixed heuristics
+        self.search_budget = max(0.0, float(search_budget or 0.0))
+        self.coverage_target = coverage_target
+        self.exec_cache = exec_cache
+        self.exec_cache_mb = exec_cache_mb
+
+
 class TestCaseGenerator:
-    def __init__(self, folder_path, output_folder):
+    def __init__(self, folder_path, output_folder, options=None, incremental=False, jobs=1,
+                 module_cache=None, ast_cache=None, coverage_engine=None):
         self.folder_path = folder_path
-        self.test_cases = []
-        self.test_dir = os.path.join(output_folder, f"test_{os.path.basename(self.folder_path)}")
+        self.options = options if options is not None else GenerationOptions()
+        # None defers to COVERAGE_ENGINE; see suite_runner.resolve_engine
+        self.coverage_engine = coverage_engine
+        self.incremental = incremental
+        self.jobs = resolve_jobs(jobs)
+        self.stats = Counter()
+        # One {"file", "function", "lineno", "complexity", "nodes", "edges"} record per function
+        self.function_metrics = []
+        # Long-running callers (watch mode) share bounded caches across generators
+        self.module_cache = module_cache if module_cache is not None else ModuleCache()
+        self.ast_cache = ast_cache
+        # Import closures of this tree, shared by the manifest and the execution cache keys
+        self.import_index = ImportIndex(self.parse_file)
+        self.sandbox = (
+            ExecutionSandbox(self.module_cache, self.options.exec_timeout, self.options.exec_memory_mb)
+            if self.options.sandbox and fork_available() else None
+        )
+        self.test_dir = generated_test_dir(output_folder, self.folder_path)
+        # Outcomes of earlier runs, shared by every folder and worker writing to output_folder
+        self.exec_cache = (
+            ExecutionCache(os.path.join(output_folder, CACHE_FILE_NAME), self.options.exec_cache_mb)
+            if self.options.exec_cache else None
+        )
+        # (file, ModuleGlobals) of the file being generated
+        self.module_globals = (None, None)
  
         if not os.path.exists(self.test_dir):
             os.makedirs(self.test_dir)
  
-    def generate_tests_for_directory(self):
-        python_files = glob.glob(os.path.join(self.folder_path, "*.py"))
+    def generate_tests_for_directory(self, only_files=None):
+        """Generates tests for the folder, or only for only_files (absolute paths) when given."""
+        python_files = [
+            file for file in sorted(glob.glob(os.path.join(self.folder_path, "*.py")))
+            if not os.path.basename(file).startswith("__init__")  # Skip __init__.py files
+        ]
+        selected = set(only_files) if only_files is not None else None
+        # Files may have changed since the previous run of a long-lived generator
+        self.import_index.refresh()
+        manifest = (
+            GenerationManifest(self.test_dir, self.manifest_version(), self.folder_path)
+            if self.incremental else None
+        )
+        source_hashes = {}
+        dependency_hashes = {}
+        pending_files = []
         for file in python_files:
-            if os.path.basename(file).startswith("__init__"):
-                continue  # Skip __init__.py files
+            if selected is not None and os.path.abspath(file) not in selected:
+                continue
+            if manifest is not None:
+                source_hashes[file] = file_sha256(file)
+                # A change in an imported project module changes what this file's tests observe
+                dependency_hashes[file] = self.import_index.dependencies_hash(file)
+                if manifest.is_fresh(file, source_hashes[file], dependency_hashes[file]):
+                    self.stats["manifest_hits"] += 1
+                    continue
+                self.stats["manifest_misses"] += 1
+            pending_files.append(file)
+
+        started = time.perf_counter()
+        stats_before = self.stats.copy()
+        imports_before = (self.module_cache.imports, self.module_cache.import_seconds)
+        written = 0
+
+        def on_written(file, test_file, size):
+            # Called from the writer thread as each test module lands on disk
+            nonlocal written
+            written += 1
+            self.stats["files_generated"] += 1
+            self.stats["test_bytes_written"] += size
+            if manifest is not None:
+                manifest.record(file, source_hashes[file], test_file, dependency_hashes[file])
+            elapsed = time.perf_counter() - started
+            emit(
+                "file_generated",
+                file=file,
+                test_file=test_file,
+                index=written,
+                total=len(pending_files),
+                functions_executed=self.stats["functions_executed"],
+                elapsed=round(elapsed, 3),
+                eta=round(elapsed / written * (len(pending_files) - written), 3),
+            )
+
+        writer = IncrementalTestWriter(on_written).start()
+        try:
+            self.stream_tests(pending_files, writer)
+        finally:
+            try:
+                writer.close()
+            finally:
+                if self.sandbox is not None:
+                    self.sandbox.close()
+                if self.exec_cache is not None:
+                    self.exec_cache.close()
+        if manifest is not None:
+            self.stats["manifest_invalidated"] += manifest.invalidate_missing(python_files)
+            manifest.save()
+        self.record_metrics(self.stats - stats_before, imports_before, time.perf_counter() - started)
+        self.report_summary()
+
+    def manifest_version(self):
+        """GENERATOR_VERSION plus every option that changes the emitted tests."""
+        version = GENERATOR_VERSION
+        if self.options.inputs_per_function > 1:
+            version += f"-inputs{self.options.inputs_per_function}"
+        if self.options.search_budget:
+            version += f"-search{self.options.search_budget:g}-{self.options.coverage_target:g}"
+        return version
+
+    def record_metrics(self, stats, imports_before, seconds):
+        """Publishes this run's counters; works the same whether workers were used or not."""
+        metrics.observe("python_generate", seconds)
+        metrics.incr("python_files_generated", stats["files_generated"])
+        metrics.incr("functions_executed", stats["functions_executed"])
+        metrics.incr("inputs_executed", stats["inputs_executed"])
+        metrics.incr("search_executions", stats["search_executions"])
+        metrics.incr("exec_cache_hits", stats["exec_cache_hits"])
+        metrics.incr("exec_cache_misses", stats["exec_cache_misses"])
+        metrics.incr("execution_failures", stats["exec_failures"])
+        metrics.incr("execution_timeouts", stats["exec_timeouts"])
+        metrics.incr("test_bytes_written", stats["test_bytes_written"])
+        metrics.incr("module_imports", self.module_cache.imports - imports_before[0])
+        metrics.observe("module_import", self.module_cache.import_seconds - imports_before[1])
+
+    def stream_tests(self, file_paths, writer):
+        """Feeds generated tests for file_paths to writer as they are produced.
+
+        Sequentially, files are parsed ahead in a thread, functions are run one
+        at a time and each test fragment goes straight to the writer, so no
+        whole test module is ever held in memory. With workers, each worker
+        renders one module at a time and the writer stores it.
+        """
+        if self.jobs > 1 and len(file_paths) > 1:
+            for file, test_source in self.generate_test_sources(file_paths):
+                writer.write_file(file, self.test_file_path(file), test_source)
+            return
+
+        for file, tree in iter_parsed_files(file_paths, self.parse_file):
             print(f"Generating tests for {file}")
-            self.tree = self.parse_file(file)
-            self.generate_tests_for_file(file)
-            self.write_tests_to_file(file)
+            writer.begin(file, self.test_file_path(file), self.render_test_header(file), self.render_placeholder(file))
+            for fragment in self.iter_test_fragments(file, tree):
+                writer.add(fragment)
+            writer.end()
+            del tree
+
+    def generate_test_sources(self, file_paths):
+        """Yields (file, test source) pairs in file order, using worker processes when jobs > 1."""
+        if self.jobs <= 1 or len(file_paths) <= 1:
+            for file in file_paths:
+                yield file, self.generate_test_source(file)
+            return
+
+        print(f"Generating tests for {len(file_paths)} files with {self.jobs} workers")
+        results = generate_sources_in_parallel(
+            self.folder_path, os.path.dirname(self.test_dir), file_paths, self.jobs, self.options,
+        )
+        for file, test_source, report in results:
+            imports, hits, import_seconds = report["cache"]
+            self.module_cache.imports += imports
+            self.module_cache.hits += hits
+            self.module_cache.import_seconds += import_seconds
+            self.stats.update(report["stats"])
+            self.function_metrics.extend(report["function_metrics"])
+            replay(report["events"])
+            yield file, test_source
+
+    def generate_test_source(self, file):
+        """Parses one source file and returns the text of its generated test module."""
+        print(f"Generating tests for {file}")
+        return self.render_test_module(file, self.iter_test_fragments(file, self.parse_file(file)))
+
+    def report_summary(self):
+        print(
+            f"Module imports for {self.folder_path}: "
+            f"{self.module_cache.imports} imported, "
+            f"{self.module_cache.hits} reused, "
+            f"~{self.module_cache.seconds_saved():.3f}s saved"
+        )
+        if self.exec_cache is not None:
+            print(
+                f"Execution cache for {self.folder_path}: "
+                f"{self.stats['exec_cache_hits']} hit, "
+                f"{self.stats['exec_cache_misses']} missed"
+            )
+        if self.stats["exec_timeouts"]:
+            print(f"Execution timeouts for {self.folder_path}: {self.stats['exec_timeouts']}")
+        if self.incremental:
+            print(
+                f"Incremental run for {self.folder_path}: "
+                f"{self.stats['manifest_hits']} hit, "
+                f"{self.stats['manifest_misses']} missed, "
+                f"{self.stats['manifest_invalidated']} invalidated"
+            )
  
     def parse_file(self, file_path):
+        if self.ast_cache is not None:
+            return self.ast_cache.parse(file_path)
         with open(file_path, 'r') as file:
             source = file.read()
         return ast.parse(source)
  
-    def generate_tests_for_file(self, file_name):
-        self.current_file_path = file_name  # Set the current file path
+    def iter_test_fragments(self, file_name, tree):
+        """Runs the functions and methods of the parsed file and yields its test classes piecewise.
+
+        Module-level functions share one test class. Each public class gets its
+        own, whose tests share one instance built in setUpClass.
+        """
         base_name = os.path.splitext(os.path.basename(file_name))[0]
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.FunctionDef):
-                self.generate_test_for_function(node, base_name)
-                self.analyze_function_complexity(node)
- 
-    def generate_test_for_function(self, func_node, base_name):
-        test_name = f'test_{func_node.name}'
-        arguments = self.get_function_arguments(func_node)
-        args_values = self.generate_default_values_for_args(arguments)
- 
-        # Handle the function with try-except for error handling
-        try:
-            # Execute the function to get the expected value
-            expected_value = self.execute_function(func_node, args_values)
- 
-            test_case = f"""
+        # Only execution_scope reads these, and only with the execution cache on
+        self.module_globals = (file_name, self.build_module_globals(file_name, tree) if self.exec_cache else None)
+        class_names = set()
+        functions = [node for node in tree.body if isinstance(node, ast.FunctionDef)]
+        if functions:
+            yield f"\nclass {unique_name(f'Test{base_name.capitalize()}', class_names)}(unittest.TestCase):\n"
+            test_names = set()
+            for node in functions:
+                yield self.generate_test_for_function(
+                    node, base_name, file_name, unique_name(f"test_{node.name}", test_names)
+                )
+                self.analyze_function_complexity(node, file_name)
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+                yield from self.iter_class_test_fragments(node, base_name, file_name, class_names)
+
+    def iter_class_test_fragments(self, class_node, base_name, file_path, class_names):
+        """Yields one test class for class_node: its setUpClass, then one test per member.
+
+        The instance and every member call run in a single sandbox batch, in
+        the order unittest runs the tests (by name), so expected values see
+        the same shared instance state the tests will.
+        """
+        members = []
+        test_names = set()
+        for node in class_node.body:
+            if isinstance(node, ast.FunctionDef) and member_kind(node) is not None:
+                members.append((unique_name(f"test_{node.name}", test_names), member_kind(node), node))
+        if not members:
+            return
+        members.sort(key=lambda member: member[0])
+
+        started = time.perf_counter()
+        driver = CLASS_DRIVER_TEMPLATE.format(driver=CLASS_DRIVER_NAME, class_name=class_node.name)
+        scope = self.execution_scope(class_node, file_path)
+        needs_instance = any(kind in ("method", "property") for _, kind, _ in members)
+        constructor = self.find_constructor_arguments(class_node, driver, file_path, scope) if needs_instance else None
+
+        calls = [("init", "", literal_values(constructor))] if constructor is not None else []
+        member_vectors = []
+        for _, kind, node in members:
+            if kind in ("method", "property") and constructor is None:
+                member_vectors.append(None)
+                continue
+            rng = self.function_rng(file_path, f"{class_node.name}.{node.name}")
+            vectors = self.member_argument_vectors(node, kind, rng)
+            member_vectors.append(vectors)
+            call_kind = "static" if kind in ("classmethod", "staticmethod") else kind
+            calls.extend((call_kind, node.name, literal_values(vector)) for vector in vectors)
+        # Members share one instance, so the batch is cached as a whole
+        outcomes = self.execute_code_batch(
+            driver, CLASS_DRIVER_NAME, calls, file_path, scope=scope, sequential=True
+        ) if calls else []
+        if constructor is not None:
+            outcomes = outcomes[1:]
+        seconds = round((time.perf_counter() - started) / len(members), 4)
+
+        yield self.render_class_test_header(
+            unique_name(f"Test{class_node.name}Methods", class_names), class_node.name, base_name, constructor
+        )
+        for (test_name, kind, node), vectors in zip(members, member_vectors):
+            qualname = f"{class_node.name}.{node.name}"
+            if vectors is None:
+                outcome = "skipped"
+                test_case = f"""
+    @unittest.skip({f"{class_node.name} could not be constructed during generation"!r})
     def {test_name}(self):
-        # Test for {func_node.name} in {base_name}
-        result = {func_node.name}({', '.join(args_values)})  # Replace with actual arguments
-        self.assertEqual(result, {expected_value})  # Replace with actual expected value
+        # Test for {qualname} in {base_name}
+        pass
 """
-        except Exception as e:
-            test_case = f"""
+            else:
+                member_outcomes, outcomes = outcomes[:len(vectors)], outcomes[len(vectors):]
+                if kind == "property":
+                    call = lambda args, name=node.name: f"self.instance.{name}"
+                elif kind == "method":
+                    call = lambda args, name=node.name: f"self.instance.{name}({args})"
+                else:
+                    call = lambda args, name=qualname: f"{name}({args})"
+                test_case, outcome = self.render_outcome_test(
+                    test_name, qualname, base_name, call, vectors, member_outcomes
+                )
+                self.stats["inputs_executed"] += len(vectors)
+            self.stats["functions_executed"] += 1
+            emit(
+                "function_executed",
+                file=file_path,
+                function=qualname,
+                lineno=node.lineno,
+                outcome=outcome,
+                inputs=len(vectors or []),
+                seconds=seconds,
+            )
+            yield test_case
+            self.analyze_function_complexity(node, file_path, qualname)
+
+    def find_constructor_arguments(self, class_node, driver, file_path, scope=None):
+        """An argument vector (as source literals) that constructs the class, or None.
+
+        Vectors whose values match the __init__ annotations win over ones that
+        merely do not raise, e.g. 0 over "default_value" for an int parameter.
+        """
+        init = next(
+            (node for node in class_node.body if isinstance(node, ast.FunctionDef) and node.name == "__init__"),
+            None,
+        )
+        if init is None:
+            vectors = [[]]
+        else:
+            rng = self.function_rng(file_path, f"{class_node.name}.__init__")
+            first = self.generate_default_values_for_args(self.get_function_arguments(init)[1:], rng)
+            first = conforming_vector(init, first, bound=True)
+            count = max(CONSTRUCTOR_ATTEMPTS, self.options.inputs_per_function)
+            vectors = candidate_argument_vectors(init, first, count, rng, bound=True)
+        calls = [("init", "", literal_values(vector)) for vector in vectors]
+        outcomes = self.execute_code_batch(driver, CLASS_DRIVER_NAME, calls, file_path, scope=scope)
+        constructed = [vector for vector, outcome in zip(vectors, outcomes) if outcome[0] == OUTCOME_OK]
+        if init is not None:
+            for vector in constructed:
+                if matches_annotations(init, vector, bound=True):
+                    return vector
+        return constructed[0] if constructed else None
+
+    def member_argument_vectors(self, func_node, kind, rng):
+        """Argument vectors (as source literals) to call one class member with."""
+        if kind == "property":
+            return [[]]
+        arguments = self.get_function_arguments(func_node)
+        bound = kind != "staticmethod"
+        first = self.generate_default_values_for_args(arguments[1:] if bound else arguments, rng)
+        if self.options.inputs_per_function == 1:
+            return [first]
+        return candidate_argument_vectors(func_node, first, self.options.inputs_per_function, rng, bound=bound)
+
+    def generate_test_for_function(self, func_node, base_name, file_path, test_name=None):
+        test_name = test_name or f'test_{func_node.name}'
+        arguments = self.get_function_arguments(func_node)
+        rng = self.function_rng(file_path, func_node.name)
+        args_values = self.generate_default_values_for_args(arguments, rng)
+        if self.options.search_budget:
+            return self.generate_searched_test_for_function(
+                func_node, base_name, test_name, args_values, file_path, rng
+            )
+
+        # Several vectors run in one sandbox call and become a subTest table
+        started = time.perf_counter()
+        if self.options.inputs_per_function > 1:
+            vectors = candidate_argument_vectors(func_node, args_values, self.options.inputs_per_function, rng)
+        else:
+            vectors = [args_values]
+        outcomes = self.execute_function_batch(func_node, [literal_values(vector) for vector in vectors], file_path)
+        return self.emit_function_test(
+            func_node, base_name, test_name, file_path, vectors, outcomes, time.perf_counter() - started
+        )
+
+    def generate_searched_test_for_function(self, func_node, base_name, test_name, args_values, file_path, rng):
+        """Searches inputs guided by the function's line and branch coverage and emits the minimized set."""
+        driver = SEARCH_DRIVER_TEMPLATE.format(driver=SEARCH_DRIVER_NAME, func_name=func_node.name)
+        scope = self.execution_scope(func_node, file_path)
+
+        def run_batch(vectors):
+            arg_vectors = [literal_values(vector) for vector in vectors]
+            return self.execute_code_batch(driver, SEARCH_DRIVER_NAME, arg_vectors, file_path, trace=True, scope=scope)
+
+        result = search_inputs(
+            func_node, args_values, run_batch, rng, self.options.search_budget, self.options.coverage_target
+        )
+        self.stats["search_executions"] += result.executions
+        return self.emit_function_test(
+            func_node, base_name, test_name, file_path,
+            [vector for vector, _ in result.inputs], [outcome for _, outcome in result.inputs], result.seconds,
+            searched=result.executions, line_coverage=round(result.line_coverage(), 3),
+        )
+
+    def emit_function_test(self, func_node, base_name, test_name, file_path, vectors, outcomes, seconds, **details):
+        """Renders the test of a module-level function from its outcomes and reports the function as executed."""
+        self.stats["functions_executed"] += 1
+        self.stats["inputs_executed"] += len(vectors)
+        test_case, outcome = self.render_outcome_test(
+            test_name, func_node.name, base_name, lambda args: f"{func_node.name}({args})", vectors, outcomes
+        )
+        emit(
+            "function_executed",
+            file=file_path,
+            function=func_node.name,
+            lineno=func_node.lineno,
+            outcome=outcome,
+            inputs=len(vectors),
+            seconds=round(seconds, 4),
+            **details,
+        )
+        return test_case
+
+    def render_outcome_test(self, test_name, label, base_name, call, vectors, outcomes):
+        """Renders a test that asserts recorded outcomes, as a subTest table when there are several.
+
+        call(args) returns the call expression for an argument list source.
+        Returns (test source, outcome name for the function_executed event).
+        """
+        cases = []
+        for vector, outcome in zip(vectors, outcomes):
+            args_source = f"({', '.join(vector)}{',' if len(vector) == 1 else ''})"
+            if outcome[0] == OUTCOME_OK:
+                expected = literal_source(outcome[1])
+                if expected is not None:
+                    cases.append((vector, args_source, "equals", expected))
+                else:
+                    cases.append((vector, args_source, "type", repr(result_type_name(outcome[1]))))
+            elif outcome[0] == OUTCOME_ERROR:
+                self.stats["exec_failures"] += 1
+                cases.append((vector, args_source, "raises", repr(outcome[1])))
+            else:
+                # Timed out or crashed: no stable expectation to assert
+                self.stats["exec_timeouts"] += 1
+        dropped = len(vectors) - len(cases)
+
+        if not cases:
+            return f"""
+    @unittest.skip({f"{label} produced no result for any of {len(vectors)} inputs"!r})
     def {test_name}(self):
-        # Test for {func_node.name} in {base_name}
-        with self.assertRaises({e.__class__.__name__}):
-            {func_node.name}({', '.join(args_values)})
-"""
-        self.test_cases.append(test_case)
- 
+        # Test for {label} in {base_name} (aborted during generation)
+        {call(', '.join(vectors[0]))}
+""", "aborted"
+
+        if len(vectors) == 1:
+            vector, _, kind, expected = cases[0]
+            expression = call(", ".join(vector))
+            if kind == "raises":
+                check = f"""with self.assertRaises(Exception) as raised:
+            {expression}
+        self.assertEqual(type(raised.exception).__name__, {expected})"""
+            elif kind == "type":
+                check = f"self.assertEqual(type({expression}).__name__, {expected})"
+            else:
+                check = f"self.assertEqual({expression}, {expected})"
+            return f"""
+    def {test_name}(self):
+        # Test for {label} in {base_name}
+        {check}
+""", "raised" if kind == "raises" else "returned"
+
+        note = f"  # {dropped} input(s) dropped without a result" if dropped else ""
+        rows = "".join(f"            ({args_source}, {kind!r}, {expected}),\n" for _, args_source, kind, expected in cases)
+        expression = call("*args")
+        return f"""
+    def {test_name}(self):
+        # Table-driven test for {label} in {base_name}{note}
+        cases = [
+{rows}        ]
+        for args, kind, expected in cases:
+            with self.subTest(args=args):
+                if kind == 'raises':
+                    with self.assertRaises(Exception) as raised:
+                        {expression}
+                    self.assertEqual(type(raised.exception).__name__, expected)
+                elif kind == 'type':
+                    self.assertEqual(type({expression}).__name__, expected)
+                else:
+                    self.assertEqual({expression}, expected)
+""", "table"
+
     def get_function_arguments(self, func_node):
         """Extracts arguments from function node."""
         arguments = []
@@ -74,12 +633,12 @@ class TestCaseGenerator:
             arguments.append(arg.arg)
         return arguments
  
-    def generate_default_values_for_args(self, arguments):
-        """Generates default values for function arguments."""
+    def generate_default_values_for_args(self, arguments, rng):
+        """Generates default values for function arguments, drawing numbers from rng."""
         default_values = []
         for arg in arguments:
             if arg in ('a', 'b'):  # Arithmetic function arguments
-                default_values.append(str(random.randint(1, 10)))  # Integers
+                default_values.append(str(rng.randint(1, 10)))  # Integers
             elif arg.lower() in ('name', 'title', 'key'):  # String-based arguments
                 default_values.append(f'"{arg}_example"')
             elif arg.lower() in ('file_path', 'file'):  # File-related arguments
@@ -90,39 +649,105 @@ class TestCaseGenerator:
                 default_values.append('"default_value"')  # Default string value
         return default_values
  
-    def execute_function(self, func_node, args_values):
+    def execute_function(self, func_node, args_values, file_path):
         """Executes the function with default arguments and returns the result."""
-        func_code = ast.unparse(func_node)
-        exec_globals = {}
-        exec_locals = {}
- 
-        # Dynamically load the module
-        file_path = self.current_file_path
-        module_name = os.path.splitext(os.path.basename(file_path))[0]
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
- 
-        # Add the parent directory of the file to sys.path for relative imports
-        parent_dir = os.path.abspath(os.path.dirname(file_path))
-        if parent_dir not in sys.path:
-            sys.path.append(parent_dir)
- 
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
- 
-        # Add the module's globals to exec_globals
-        exec_globals.update(module.__dict__)
- 
-        # Execute the function code in the context
-        exec(func_code, exec_globals, exec_locals)
- 
-        # Get the function from the context
-        func = exec_locals[func_node.name]
- 
         # Convert argument values from string to actual values
         args = self.convert_args_to_correct_types(func_node, args_values)
+
+        # Goes through the batch path so single calls are cached too
+        outcome = self.execute_function_batch(func_node, [args], file_path)[0]
+        return raise_for_outcome(func_node.name, self.options.exec_timeout, outcome)
  
-        # Execute the function with arguments and return the result
-        return func(*args)
+    def execute_function_batch(self, func_node, arg_vectors, file_path):
+        """Calls the function once per argument vector; returns sandbox-style outcome tuples."""
+        return self.execute_code_batch(
+            ast.unparse(func_node), func_node.name, arg_vectors, file_path,
+            scope=self.execution_scope(func_node, file_path),
+        )
+
+    def function_rng(self, file_path, qualname):
+        """The seeded random source for one function's inputs."""
+        return seeded_rng(module_import_path(file_path)[1], qualname)
+
+    def build_module_globals(self, file_path, tree):
+        """ModuleGlobals of a parsed file, aware of the contents of the project modules it imports."""
+        return ModuleGlobals(tree, self.import_index.dependencies_hash(file_path))
+
+    def execution_scope(self, node, file_path):
+        """(source hash, globals fingerprint, line number) of a function or class, for execution_key."""
+        globals_file, module_globals = self.module_globals
+        if globals_file != file_path or module_globals is None:
+            module_globals = self.build_module_globals(file_path, self.parse_file(file_path))
+            self.module_globals = (file_path, module_globals)
+        source_hash = hashlib.sha256(ast.unparse(node).encode()).hexdigest()
+        return source_hash, module_globals.fingerprint(node), node.lineno
+
+    def execute_code_batch(self, func_code, func_name, arg_vectors, file_path, trace=False, scope=None,
+                           sequential=False):
+        """Runs func_code's func_name once per argument vector, reusing cached outcomes when scope is given.
+
+        Calls are cached one by one, or as a single entry with sequential,
+        for batches whose calls depend on each other. Timeouts and crashes
+        are never cached.
+        """
+        if self.exec_cache is None or scope is None or not arg_vectors:
+            return self.run_code_batch(func_code, func_name, arg_vectors, file_path, trace)
+
+        if sequential:
+            key = execution_key(func_code, scope, arg_vectors, trace)
+            cached = self.exec_cache.get_many([key])
+            if key in cached:
+                self.stats["exec_cache_hits"] += len(arg_vectors)
+                return cached[key]
+            self.stats["exec_cache_misses"] += len(arg_vectors)
+            outcomes = self.run_code_batch(func_code, func_name, arg_vectors, file_path, trace)
+            if all(self.cacheable(outcome, trace) for outcome in outcomes):
+                self.exec_cache.put_many([(key, outcomes)])
+            return outcomes
+
+        keys = [execution_key(func_code, scope, args, trace) for args in arg_vectors]
+        cached = self.exec_cache.get_many(keys)
+        missing = [index for index, key in enumerate(keys) if key not in cached]
+        self.stats["exec_cache_hits"] += len(keys) - len(missing)
+        self.stats["exec_cache_misses"] += len(missing)
+        if missing:
+            outcomes = self.run_code_batch(func_code, func_name, [arg_vectors[index] for index in missing], file_path, trace)
+            fresh = dict(zip((keys[index] for index in missing), outcomes))
+            self.exec_cache.put_many(
+                (key, outcome) for key, outcome in fresh.items() if self.cacheable(outcome, trace)
+            )
+            cached.update(fresh)
+        return [cached[key] for key in keys]
+
+    def cacheable(self, outcome, trace):
+        if trace:
+            outcome = outcome[0]
+        return outcome[0] not in (OUTCOME_TIMEOUT, OUTCOME_CRASHED)
+
+    def run_code_batch(self, func_code, func_name, arg_vectors, file_path, trace=False):
+        """Defines func_code in the module's globals and calls func_name once per argument vector.
+
+        With trace, each outcome comes paired with the arcs it executed in the module file.
+        """
+        if self.sandbox is not None:
+            return self.sandbox.call_batch(file_path, func_code, func_name, arg_vectors, trace)
+
+        try:
+            module = self.module_cache.load(file_path)
+            exec_globals = dict(module.__dict__)
+            exec_locals = {}
+            exec(func_code, exec_globals, exec_locals)
+            func = exec_locals[func_name]
+        except Exception as e:
+            setup_error = (OUTCOME_ERROR, e.__class__.__name__, str(e)[:200])
+            return [(setup_error, []) if trace else setup_error] * len(arg_vectors)
+        outcomes = []
+        for args in arg_vectors:
+            if trace:
+                outcomes.append(call_traced(func, args, module.__file__))
+            else:
+                outcomes.append(call_outcome(func, args))
+        return outcomes
  
     def convert_args_to_correct_types(self, func_node, args_values):
         """Convert arguments to correct types based on the function signature."""
@@ -141,63 +766,153 @@ class TestCaseGenerator:
         return converted_args
  
     def construct_cfg(self, func_node):
-        cfg = nx.DiGraph()
-        last_node = None
-        for stmt in func_node.body:
-            node_id = id(stmt)
-            cfg.add_node(node_id, label=ast.dump(stmt))
-            if last_node:
-                cfg.add_edge(last_node, node_id)
-            last_node = node_id
-        return cfg
- 
-    def analyze_function_complexity(self, func_node):
+        return build_cfg(func_node)
+ 
+    def analyze_function_complexity(self, func_node, file_path=None, name=None):
         cfg = self.construct_cfg(func_node)
-        edges = cfg.number_of_edges()
-        nodes = cfg.number_of_nodes()
-        complexity = edges - nodes + 2
-        print(f"Cyclomatic complexity for function '{func_node.name}': {complexity}")
+        cfg_metrics = cfg.to_dict()
+        cfg_metrics["file"] = file_path
+        cfg_metrics["lineno"] = func_node.lineno
+        self.function_metrics.append(cfg_metrics)
+        emit(
+            "function_analyzed",
+            file=file_path,
+            function=name or func_node.name,
+            lineno=func_node.lineno,
+            complexity=cfg_metrics["complexity"],
+        )
+        print(f"Cyclomatic complexity for function '{name or func_node.name}': {cfg_metrics['complexity']}")
+        return cfg_metrics
  
-    def write_tests_to_file(self, file_name):
-        test_file_name = os.path.join(self.test_dir, f"test_{os.path.basename(file_name)}")
+    def render_test_header(self, file_name):
+        # Package members are imported by their dotted name so their relative imports work
+        search_root, module_name = module_import_path(file_name)
+        lines = [
+            "import unittest\n",
+            "import sys\n",
+            "import os\n",
+        ]
+        for path in dict.fromkeys([os.path.abspath(self.folder_path), search_root]):
+            lines.append(f"sys.path.append('{path}')\n")  # Add the folder path to sys.path
+        lines.append(f"\nfrom {module_name} import *\n")
+        return "".join(lines)
+
+    def render_class_test_header(self, test_class, class_name, base_name, constructor):
+        lines = [f"\nclass {test_class}(unittest.TestCase):\n"]
+        if constructor is None:
+            lines.append(f"    # Tests for {class_name} in {base_name}\n")
+        else:
+            lines.extend([
+                f"    # Tests for {class_name} in {base_name}, sharing one instance\n",
+                "    @classmethod\n",
+                "    def setUpClass(cls):\n",
+                f"        cls.instance = {class_name}({', '.join(constructor)})\n",
+            ])
+        return "".join(lines)
+
+    def render_placeholder(self, file_name):
+        """The test class written when a module has no functions or classes to test."""
+        module_name = os.path.splitext(os.path.basename(file_name))[0]
+        return f"\nclass Test{module_name.capitalize()}(unittest.TestCase):\n" + PLACEHOLDER_TEST
+
+    def render_test_module(self, file_name, fragments):
+        """Renders a whole test module; the streaming writer builds the same text piecewise."""
+        body = "".join(fragments)
+        return self.render_test_header(file_name) + (body or self.render_placeholder(file_name))
+
+    def test_file_path(self, file_name):
+        return generated_test_path(self.test_dir, file_name)
+
+    def write_tests_to_file(self, file_name, test_source):
+        test_file_name = self.test_file_path(file_name)
         with open(test_file_name, 'w') as file:
-            file.write("import unittest\n")
-            file.write("import sys\n")
-            file.write("import os\n")
-            file.write(f"sys.path.append('{os.path.abspath(self.folder_path)}')\n")  # Add the folder path to sys.path
-            file.write(f"\nfrom {os.path.splitext(os.path.basename(file_name))[0]} import *\n")
-            file.write(f"\nclass Test{os.path.splitext(os.path.basename(file_name))[0].capitalize()}(unittest.TestCase):\n")
-            if not self.test_cases:
-                file.write("    def test_placeholder(self):\n")
-                file.write("        pass\n")
-            for test_case in self.test_cases:
-                file.write(test_case)
-            self.test_cases.clear()
+            file.write(test_source)
+        self.stats["files_generated"] += 1
+        self.stats["test_bytes_written"] += len(test_source.encode())
+        return test_file_name
  
     def run_tests_and_generate_coverage(self):
-        coverage_file_path = os.path.join(self.test_dir, ".coverage")
-        cov = coverage.Coverage(data_file=coverage_file_path)
-        cov.start()
-        unittest.TextTestRunner().run(unittest.defaultTestLoader.discover(self.test_dir))
-        cov.stop()
-        cov.save()
-        cov.report()
+        return run_tests_and_generate_coverage(
+            [self.test_dir], os.path.join(self.test_dir, ".coverage"), [self.folder_path], self.jobs,
+            engine=self.coverage_engine,
+        )
  
     def run(self):
         self.generate_tests_for_directory()
         self.run_tests_and_generate_coverage()
  
  
+def run_tests_and_generate_coverage(test_dirs, coverage_file_path, source_dirs=None, jobs=1, test_modules=None,
+                                    engine=None):
+    """Runs the generated tests of several test directories and merges their coverage.
+
+    test_modules narrows the run to specific generated test files. Returns the
+    structured results of suite_runner.run_generated_tests.
+    """
+    with metrics.timer("coverage"):
+        results = run_generated_tests(test_dirs, coverage_file_path, source_dirs, jobs, test_modules, engine)
+    counts = results["counts"]
+    branches = results["coverage"].get("branches")
+    metrics.incr("generated_tests_run", results["tests_run"])
+    metrics.incr("generated_tests_failed", counts["failed"] + counts["error"])
+    print(
+        f"Ran {results['tests_run']} generated tests in {results['shards']} shard(s): "
+        f"{counts['passed']} passed, {counts['failed']} failed, "
+        f"{counts['error']} errors, {counts['skipped']} skipped; "
+        f"coverage {results['coverage']['percent']}%"
+        + (f", branches {branches['percent']}%" if branches else "")
+    )
+    emit(
+        "coverage_done",
+        test_dirs=list(test_dirs),
+        tests_run=results["tests_run"],
+        failures=counts["failed"] + counts["error"],
+        percent=results["coverage"]["percent"],
+        seconds=results["seconds"],
+    )
+    return results
+
+
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate unit tests for a Python folder")
+    parser.add_argument("--jobs", "-j", type=int, default=int(os.getenv("JOBS", "1")),
+                        help="Worker processes for generation (0 = one per CPU)")
+    parser.add_argument("--inputs", type=int, default=int(os.getenv("INPUTS_PER_FUNCTION", "1")),
+                        help="Argument vectors to try per function (above 1 emits table-driven tests)")
+    parser.add_argument("--step", choices=["all", "generate", "coverage"], default="all",
+                        help="Only generate tests, only run them with coverage, or both")
+    parser.add_argument("--search-budget", type=float, default=float(os.getenv("SEARCH_BUDGET", "0")),
+                        help="Seconds of coverage-guided input search per function (0 = off)")
+    parser.add_argument("--coverage-target", type=float, default=float(os.getenv("COVERAGE_TARGET", "1.0")),
+                        help="Fraction of a function's lines at which input search stops early")
+    parser.add_argument("--coverage-engine", choices=["coverage", "monitor"], default=os.getenv("COVERAGE_ENGINE"),
+                        help="coverage.py, or the sys.monitoring collector on Python 3.12+")
+    parser.add_argument("--no-exec-cache", action="store_true",
+                        help="Execute every function again instead of reusing outcomes cached by earlier runs")
+    parser.add_argument("--exec-cache-mb", type=float, default=float(os.getenv("EXEC_CACHE_MB", str(DEFAULT_MAX_MB))),
+                        help="Size limit of the on-disk execution cache before least recently used entries go")
+    cli_args = parser.parse_args()
+
     # path = input("Enter the path to the Python file or folder: ").strip()
     path = os.getenv("FOLDER_PATH")
+    incremental = os.getenv("INCREMENTAL", "").lower() in ("1", "true", "yes")
    
     if os.path.isdir(path):
-        generator = TestCaseGenerator(path, os.getenv("OUTPUT_FOLDER"))
-        generator.run()
+        options = GenerationOptions(inputs_per_function=cli_args.inputs, search_budget=cli_args.search_budget,
+                                    coverage_target=cli_args.coverage_target, exec_cache=not cli_args.no_exec_cache,
+                                    exec_cache_mb=cli_args.exec_cache_mb)
+        generator = TestCaseGenerator(path, os.getenv("OUTPUT_FOLDER"), options, incremental=incremental,
+                                      jobs=cli_args.jobs, coverage_engine=cli_args.coverage_engine)
+        if cli_args.step == "generate":
+            generator.generate_tests_for_directory()
+        elif cli_args.step == "coverage":
+            generator.run_tests_and_generate_coverage()
+        else:
+            generator.run()
     elif os.path.isfile(path) and path.endswith(".py"):
-        generator = TestCaseGenerator(os.path.dirname(path))
-        generator.generate_tests_for_file(path)
-        generator.write_tests_to_file(path)
+        generator = TestCaseGenerator(os.path.dirname(path), os.getenv("OUTPUT_FOLDER"))
+        generator.write_tests_to_file(path, generator.generate_test_source(path))
     else:
         print("Invalid path. Please provide a valid Python file or folder.")
\ No newline at end of file
@@ -0,0 +1,174 @@
+import os
+import time
+import threading
+
+from language_identifier import metrics
+from language_identifier.events import emit
+from language_identifier.scanner import DEFAULT_IGNORES, is_ignored, parse_ignore_lines
+from sampletestcase.import_graph import affected_files, build_import_graph
+from sampletestcase.module_cache import AstCache, ModuleCache
+from sampletestcase.suite_runner import update_coverage_data
+from sampletestcase.test_case_generator import GenerationOptions, TestCaseGenerator, run_tests_and_generate_coverage
+
+DEFAULT_INTERVAL = 0.5
+DEFAULT_MAX_CACHED_FILES = 512
+# A cycle only runs the affected tests; its data is folded into the tree's .coverage afterwards
+CYCLE_COVERAGE_FILE = ".coverage-cycle"
+
+
+def snapshot_python_files(root, excluded_dirs=()):
+    """Maps every non-ignored .py file under root to its (mtime_ns, size)."""
+    rules = parse_ignore_lines(DEFAULT_IGNORES)
+    excluded_dirs = {os.path.abspath(path) for path in excluded_dirs}
+    snapshot = {}
+    stack = [(os.path.abspath(root), "")]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            continue
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_ignored(rules, rel_path, is_dir):
+                continue
+            if is_dir:
+                if entry.path not in excluded_dirs:
+                    stack.append((entry.path, rel_path))
+            elif entry.name.endswith(".py") and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class TestWatcher:
+    """Regenerates and re-runs the tests of changed Python files under root.
+
+    Polls file stats every `interval` seconds. Parsed ASTs and imported
+    modules stay in bounded LRU caches between cycles, so a change only
+    re-parses the edited files and only the files that import them (via the
+    import graph) get new tests and a test run.
+    """
+
+    def __init__(self, root, output_folder, interval=DEFAULT_INTERVAL, jobs=1, inputs_per_function=1,
+                 max_cached_files=DEFAULT_MAX_CACHED_FILES, run_tests=True):
+        self.root = os.path.abspath(root)
+        self.output_folder = os.path.abspath(output_folder)
+        self.interval = interval
+        self.jobs = jobs
+        self.inputs_per_function = inputs_per_function
+        self.run_tests = run_tests
+        self.ast_cache = AstCache(max_cached_files)
+        self.module_cache = ModuleCache(max_modules=max_cached_files)
+        self.generators = {}
+        self.snapshot = {}
+        self.graph = None
+        self.cycles = 0
+
+    def generator_for(self, folder_path):
+        generator = self.generators.get(folder_path)
+        if generator is None:
+            generator = TestCaseGenerator(
+                folder_path, self.output_folder, GenerationOptions(inputs_per_function=self.inputs_per_function),
+                incremental=True, module_cache=self.module_cache, ast_cache=self.ast_cache,
+            )
+            self.generators[folder_path] = generator
+        return generator
+
+    def poll(self):
+        """Returns (changed, removed) files since the previous poll."""
+        current = snapshot_python_files(self.root, [self.output_folder])
+        changed = sorted(path for path, stat in current.items() if self.snapshot.get(path) != stat)
+        removed = sorted(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed, removed
+
+    def parse_or_report(self, path):
+        try:
+            return self.ast_cache.parse(path)
+        except (OSError, SyntaxError, UnicodeDecodeError) as e:
+            print(f"Not regenerating {path} until it parses: {e}")
+            emit("watch_error", file=path, error=f"{e.__class__.__name__}: {e}")
+            return None
+
+    def process(self, changed, removed):
+        """Regenerates tests for changed files and their importers, then runs just those tests."""
+        started = time.perf_counter()
+        # Importers of deleted files are only known from the previous graph
+        affected = affected_files(self.graph, removed) if self.graph is not None else set()
+        for path in removed:
+            self.ast_cache.discard(path)
+        self.graph = build_import_graph(sorted(self.snapshot), parse=self.ast_cache.parse)
+        affected = (affected | affected_files(self.graph, changed)) - set(removed)
+
+        by_folder = {}
+        for path in removed:
+            by_folder.setdefault(os.path.dirname(path), [])
+        for path in sorted(affected):
+            if self.parse_or_report(path) is not None:
+                by_folder.setdefault(os.path.dirname(path), []).append(path)
+
+        test_dirs = []
+        test_modules = []
+        for folder_path, files in sorted(by_folder.items()):
+            generator = self.generator_for(folder_path)
+            generator.generate_tests_for_directory(only_files=files)
+            test_dirs.append(generator.test_dir)
+            test_modules.extend(
+                generator.test_file_path(path) for path in files
+                if not os.path.basename(path).startswith("__init__")
+            )
+
+        results = None
+        tree_coverage = None
+        if self.run_tests and test_modules:
+            cycle_file = os.path.join(self.output_folder, CYCLE_COVERAGE_FILE)
+            results = run_tests_and_generate_coverage(
+                test_dirs, cycle_file, sorted(by_folder), self.jobs, test_modules,
+            )
+            tree_coverage = update_coverage_data(
+                os.path.join(self.output_folder, ".coverage"), cycle_file, sorted(affected | set(removed)),
+            )
+            print(f"Coverage of the watched tree: {tree_coverage['percent']}%")
+        seconds = time.perf_counter() - started
+        self.cycles += 1
+        metrics.observe("watch_cycle", seconds)
+        summary = {
+            "cycle": self.cycles,
+            "changed": changed,
+            "removed": removed,
+            "affected": sorted(affected),
+            "tests_run": results["tests_run"] if results else 0,
+            "counts": results["counts"] if results else {},
+            "coverage": tree_coverage["percent"] if tree_coverage else None,
+            "cycle_coverage": results["coverage"]["percent"] if results else None,
+            "seconds": round(seconds, 3),
+        }
+        emit("watch_cycle", **summary)
+        return summary
+
+    def watch(self, stop_event=None, on_cycle=None):
+        """Runs one full pass, then polls until stop_event is set (or forever)."""
+        stop_event = stop_event or threading.Event()
+        self.poll()
+        print(f"Watching {len(self.snapshot)} Python files under {self.root}")
+        changed, removed = sorted(self.snapshot), []
+        while True:
+            try:
+                summary = self.process(changed, removed)
+            except Exception as e:
+                # Keep watching: the next save usually fixes whatever broke
+                print(f"Watch cycle failed: {e.__class__.__name__}: {e}")
+                emit("watch_error", error=f"{e.__class__.__name__}: {e}")
+            else:
+                if on_cycle is not None:
+                    on_cycle(summary)
+            changed, removed = [], []
+            while not changed and not removed:
+                if stop_event.wait(self.interval):
+                    return
+                changed, removed = self.poll()
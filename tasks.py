@@ -2,6 +2,19 @@ import subprocess
 import yaml
 import sys
 import os
+import glob
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE_NAME = ".tasks_cache.json"
+
+
+class TaskError(Exception):
+    """A task is unknown or its dependencies form a cycle."""
+
 
 def load_tasks(file_path="tasks.yml"):
     """Load tasks from the YAML file."""
@@ -11,6 +24,113 @@ def load_tasks(file_path="tasks.yml"):
     with open(file_path, "r") as f:
         return yaml.safe_load(f)
 
+
+def dependencies(task):
+    depends_on = task.get("depends_on", [])
+    return [depends_on] if isinstance(depends_on, str) else list(depends_on)
+
+
+def resolve_order(task_names, tasks):
+    """Returns task_names and everything they depend on, dependencies first."""
+    order = []
+    state = {}
+
+    def visit(name, path):
+        if name not in tasks["tasks"]:
+            raise TaskError(f"Task '{name}' not found.")
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise TaskError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = "visiting"
+        for dependency in dependencies(tasks["tasks"][name]):
+            visit(dependency, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in task_names:
+        visit(name, [])
+    return order
+
+
+def expand_globs(patterns, root=ROOT_DIR):
+    """Sorted files matching patterns (recursive ** allowed), relative to root."""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    files = set()
+    for pattern in patterns or []:
+        for path in glob.glob(os.path.join(root, pattern), recursive=True):
+            if os.path.isfile(path):
+                files.add(os.path.relpath(path, root))
+    return sorted(files)
+
+
+class TaskCache:
+    """Fingerprints of the last successful run of each task, plus a file hash memo.
+
+    File hashes are memoized on (mtime, size) so unchanged inputs are not
+    re-read on every invocation.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fingerprints = {}
+        self.file_hashes = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                self.fingerprints = data.get("tasks", {})
+                self.file_hashes = data.get("files", {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable task cache {path}: {e}")
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"tasks": self.fingerprints, "files": self.file_hashes}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def file_hash(self, rel_path, root=ROOT_DIR):
+        path = os.path.join(root, rel_path)
+        stat = os.stat(path)
+        memo = self.file_hashes.get(rel_path)
+        if memo is not None and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+            return memo[2]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        self.file_hashes[rel_path] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+        return digest.hexdigest()
+
+
+def task_fingerprint(name, task, cache, dependency_fingerprints):
+    """Hash of the command, environment, input contents and dependency fingerprints.
+
+    Returns None for tasks without declared inputs, which always run.
+    """
+    if not task.get("inputs"):
+        return None
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {"command": task["command"], "env": task.get("env", {}), "depends_on": dependency_fingerprints},
+        sort_keys=True,
+    ).encode())
+    for rel_path in expand_globs(task["inputs"]):
+        digest.update(rel_path.encode())
+        digest.update(cache.file_hash(rel_path).encode())
+    return digest.hexdigest()
+
+
+def outputs_exist(task):
+    """True if every declared output pattern matches at least one file."""
+    patterns = task.get("outputs", [])
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return all(expand_globs(pattern) for pattern in patterns)
+
+
 def execute_task(task_name, tasks):
     """Execute the command associated with a task."""
     if task_name not in tasks["tasks"]:
@@ -19,15 +139,116 @@ def execute_task(task_name, tasks):
     task = tasks["tasks"][task_name]
     command = task["command"]
     print(f"Running task: {task_name} -> {command}")
-    subprocess.run(command, shell=True, check=True)
+    env = dict(os.environ)
+    env.update({key: str(value) for key, value in task.get("env", {}).items()})
+    subprocess.run(command, shell=True, check=True, cwd=ROOT_DIR, env=env, stdin=subprocess.DEVNULL)
+
+
+def run_tasks(task_names, tasks, jobs=1, force=False, cache_path=None):
+    """Runs task_names and their dependencies, up to `jobs` at a time.
+
+    A task with declared inputs is skipped when its fingerprint matches the
+    last successful run and its outputs still exist. A failure stops new
+    tasks from starting; tasks already running are allowed to finish.
+    Returns {task name: "ran" | "skipped" | "failed" | "not run"}.
+    """
+    order = resolve_order(task_names, tasks)
+    cache = TaskCache(cache_path or os.path.join(ROOT_DIR, CACHE_FILE_NAME))
+    fingerprints = {}
+    status = {name: "not run" for name in order}
+    pending = list(order)
+    running = {}
+    failed = False
+
+    def ready(name):
+        return all(status[dependency] in ("ran", "skipped") for dependency in dependencies(tasks["tasks"][name]))
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            # Start what is ready; skipping a task can make its dependents ready, so repeat
+            started_any = True
+            while started_any and not failed and len(running) < max(1, jobs):
+                started_any = False
+                for name in [name for name in pending if ready(name)]:
+                    if len(running) >= max(1, jobs):
+                        break
+                    pending.remove(name)
+                    started_any = True
+                    task = tasks["tasks"][name]
+                    try:
+                        fingerprint = task_fingerprint(
+                            name, task, cache, {dep: fingerprints.get(dep) for dep in dependencies(task)}
+                        )
+                    except Exception as e:
+                        print(f"Task {name} failed: cannot fingerprint its inputs ({e.__class__.__name__}: {e})")
+                        status[name] = "failed"
+                        failed = True
+                        break
+                    fingerprints[name] = fingerprint
+                    if (
+                        not force
+                        and fingerprint is not None
+                        and cache.fingerprints.get(name) == fingerprint
+                        and outputs_exist(task)
+                    ):
+                        print(f"Skipping task: {name} (inputs unchanged)")
+                        status[name] = "skipped"
+                        continue
+                    running[executor.submit(execute_task, name, tasks)] = (name, time.perf_counter())
+            if not running:
+                # Nothing is running and nothing could start: done, or blocked by a failure
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, started = running.pop(future)
+                try:
+                    future.result()
+                except subprocess.CalledProcessError as e:
+                    print(f"Task {name} failed with exit code {e.returncode}")
+                    status[name] = "failed"
+                    failed = True
+                    continue
+                except Exception as e:
+                    # E.g. a missing executable or a bad task definition; keep draining the rest
+                    print(f"Task {name} failed: {e.__class__.__name__}: {e}")
+                    status[name] = "failed"
+                    failed = True
+                    continue
+                status[name] = "ran"
+                print(f"Finished task: {name} in {time.perf_counter() - started:.2f}s")
+                if fingerprints[name] is not None:
+                    cache.fingerprints[name] = fingerprints[name]
+                else:
+                    cache.fingerprints.pop(name, None)
+                cache.save()
+    cache.save()
+    return status
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python tasks.py <task-name>")
-        sys.exit(1)
+    import argparse
 
-    task_name = sys.argv[1]
-    tasks = load_tasks()  # Ensure this loads the tasks.yml
-    execute_task(task_name, tasks)
+    parser = argparse.ArgumentParser(description="Run tasks from tasks.yml with their dependencies")
+    parser.add_argument("tasks", nargs="*", help="Tasks to run (their dependencies run first)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Independent tasks to run at once")
+    parser.add_argument("--force", action="store_true", help="Run tasks even if their inputs are unchanged")
+    parser.add_argument("--file", default=os.path.join(ROOT_DIR, "tasks.yml"), help="Task definitions")
+    parser.add_argument("--list", action="store_true", help="List the available tasks")
+    args = parser.parse_args()
 
+    tasks = load_tasks(args.file)  # Ensure this loads the tasks.yml
+    if args.list or not args.tasks:
+        if not args.list:
+            print("Usage: python tasks.py [-j N] [--force] <task-name> ...")
+        for name, task in tasks["tasks"].items():
+            depends_on = f" (after {', '.join(dependencies(task))})" if dependencies(task) else ""
+            print(f"  {name}: {task.get('description', '')}{depends_on}")
+        sys.exit(0 if args.list else 1)
 
+    try:
+        status = run_tasks(args.tasks, tasks, jobs=args.jobs, force=args.force)
+    except TaskError as e:
+        print(e)
+        sys.exit(1)
+    sys.exit(1 if "failed" in status.values() else 0)
@@ -0,0 +1,111 @@
+import os
+import ast
+import sys
+import textwrap
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from sampletestcase.cfg import build_cfg
+
+
+def complexity(source):
+    """Cyclomatic complexity of the first function in source."""
+    func_node = ast.parse(textwrap.dedent(source)).body[0]
+    return build_cfg(func_node).complexity()
+
+
+class CyclomaticComplexityTest(unittest.TestCase):
+    """McCabe complexity is one plus the number of decision points."""
+
+    def test_straight_line(self):
+        self.assertEqual(complexity("""
+            def f(a):
+                b = a + 1
+                return b
+        """), 1)
+
+    def test_if_elif_else(self):
+        self.assertEqual(complexity("""
+            def f(a):
+                if a > 0:
+                    return 1
+                elif a < 0:
+                    return -1
+                else:
+                    return 0
+        """), 3)
+
+    def test_loops_with_break_continue_and_else(self):
+        self.assertEqual(complexity("""
+            def f(items):
+                for item in items:
+                    if item is None:
+                        continue
+                    if item < 0:
+                        break
+                else:
+                    return True
+                while items:
+                    items.pop()
+                return False
+        """), 5)
+
+    def test_try_handlers_and_finally(self):
+        self.assertEqual(complexity("""
+            def f(a):
+                try:
+                    a = int(a)
+                except ValueError:
+                    a = 0
+                except TypeError:
+                    a = -1
+                else:
+                    a += 1
+                finally:
+                    print(a)
+                return a
+        """), 3)
+
+    def test_match_with_and_without_wildcard(self):
+        self.assertEqual(complexity("""
+            def f(a):
+                match a:
+                    case 1:
+                        return "one"
+                    case 2:
+                        return "two"
+        """), 3)
+        self.assertEqual(complexity("""
+            def f(a):
+                match a:
+                    case 1:
+                        return "one"
+                    case _:
+                        return "other"
+        """), 2)
+
+    def test_nested_definitions_and_unreachable_code_do_not_count(self):
+        self.assertEqual(complexity("""
+            def f(a):
+                def inner(b):
+                    if b:
+                        return 1
+                    return 2
+                with open(a) as handle:
+                    return handle.read()
+                if a:
+                    return None
+        """), 1)
+
+    def test_to_dict_reports_graph_size(self):
+        func_node = ast.parse("def f(a):\n    if a:\n        return 1\n    return 2\n").body[0]
+        metrics = build_cfg(func_node).to_dict()
+        self.assertEqual(metrics["function"], "f")
+        self.assertEqual(metrics["complexity"], 2)
+        self.assertEqual(metrics["complexity"], metrics["edges"] - metrics["nodes"] + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
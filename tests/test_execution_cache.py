@@ -0,0 +1,144 @@
+import os
+import ast
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from sampletestcase.execution_cache import EVICTION_TARGET, ExecutionCache, ModuleGlobals, execution_key
+
+MODULE = """
+import helpers
+
+RATE = 2
+UNUSED = 3
+REGISTRY = {}
+REGISTRY.update(a=1)
+
+
+def scaled(a):
+    return a * RATE
+
+
+def lookup(a):
+    return REGISTRY.get(a)
+
+
+def imported(a):
+    return helpers.double(a)
+"""
+
+
+def function_node(tree, name):
+    return next(node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == name)
+
+
+class ExecutionKeyTest(unittest.TestCase):
+    """execution_key covers the code, its scope and the arguments, and nothing else."""
+
+    scope = ("source", "globals", 10)
+
+    def test_same_call_same_key(self):
+        self.assertEqual(execution_key("code", self.scope, [1, "a"]), execution_key("code", self.scope, [1, "a"]))
+
+    def test_each_part_changes_the_key(self):
+        key = execution_key("code", self.scope, [1])
+        self.assertNotEqual(key, execution_key("other code", self.scope, [1]))
+        self.assertNotEqual(key, execution_key("code", ("other", "globals", 10), [1]))
+        self.assertNotEqual(key, execution_key("code", ("source", "other", 10), [1]))
+        self.assertNotEqual(key, execution_key("code", self.scope, [2]))
+        self.assertNotEqual(key, execution_key("code", self.scope, ["1"]))
+
+    def test_line_number_only_matters_when_traced(self):
+        moved = ("source", "globals", 20)
+        self.assertEqual(execution_key("code", self.scope, [1]), execution_key("code", moved, [1]))
+        self.assertNotEqual(execution_key("code", self.scope, [1], True), execution_key("code", moved, [1], True))
+        self.assertNotEqual(execution_key("code", self.scope, [1]), execution_key("code", self.scope, [1], True))
+
+
+class ModuleGlobalsTest(unittest.TestCase):
+    """A function's fingerprint follows the top-level statements it reaches by name."""
+
+    def fingerprint(self, source, name, imports_hash=""):
+        tree = ast.parse(source)
+        return ModuleGlobals(tree, imports_hash).fingerprint(function_node(tree, name))
+
+    def test_unrelated_globals_do_not_matter(self):
+        self.assertEqual(
+            self.fingerprint(MODULE, "scaled"), self.fingerprint(MODULE.replace("UNUSED = 3", "UNUSED = 4"), "scaled")
+        )
+
+    def test_reached_globals_and_their_effects_matter(self):
+        self.assertNotEqual(
+            self.fingerprint(MODULE, "scaled"), self.fingerprint(MODULE.replace("RATE = 2", "RATE = 5"), "scaled")
+        )
+        self.assertNotEqual(
+            self.fingerprint(MODULE, "lookup"),
+            self.fingerprint(MODULE.replace("REGISTRY.update(a=1)", "REGISTRY.update(a=2)"), "lookup"),
+        )
+
+    def test_imports_hash_only_matters_through_imports(self):
+        self.assertEqual(self.fingerprint(MODULE, "scaled", "one"), self.fingerprint(MODULE, "scaled", "two"))
+        self.assertNotEqual(self.fingerprint(MODULE, "imported", "one"), self.fingerprint(MODULE, "imported", "two"))
+
+
+class ExecutionCacheTest(unittest.TestCase):
+    """Round trips, persistence and least-recently-used eviction of the SQLite cache."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        self.path = os.path.join(self.work_dir, "cache", "exec.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_values_round_trip_and_persist(self):
+        cache = ExecutionCache(self.path)
+        cache.put_many([("a", ("ok", [1, 2])), ("b", ("error", "ValueError", "bad"))])
+        cache.close()
+        reopened = ExecutionCache(self.path)
+        self.assertEqual(reopened.get_many(["a", "b", "c"]), {"a": ("ok", [1, 2]), "b": ("error", "ValueError", "bad")})
+        self.assertEqual((reopened.hits, reopened.misses), (2, 1))
+        reopened.close()
+
+    def test_unpicklable_values_are_skipped(self):
+        cache = ExecutionCache(self.path)
+        cache.put_many([("a", ("ok", lambda: None)), ("b", ("ok", 1))])
+        self.assertEqual(cache.get_many(["a", "b"]), {"b": ("ok", 1)})
+        cache.close()
+
+    def test_least_recently_used_entries_are_evicted_first(self):
+        value = ("ok", "x" * 1000)
+        cache = ExecutionCache(self.path, max_mb=5000 / (1024 * 1024))
+        for key in ("first", "second", "third"):
+            cache.put_many([(key, value)])
+            # Distinct recency stamps, so eviction order does not depend on clock resolution
+            time.sleep(0.01)
+        cache.get_many(["first"])
+        time.sleep(0.01)
+        for key in ("fourth", "fifth"):
+            cache.put_many([(key, value)])
+            time.sleep(0.01)
+
+        self.assertGreater(cache.evictions, 0)
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+        remaining = cache.get_many(["first", "second", "third", "fourth", "fifth"])
+        self.assertIn("first", remaining)
+        self.assertIn("fifth", remaining)
+        self.assertNotIn("second", remaining)
+        cache.close()
+
+    def test_eviction_trims_below_the_limit(self):
+        value = ("ok", "x" * 1000)
+        cache = ExecutionCache(self.path, max_mb=10000 / (1024 * 1024))
+        cache.put_many((f"key{index}", value) for index in range(20))
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes * EVICTION_TARGET)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
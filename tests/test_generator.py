@@ -0,0 +1,84 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+# Imported as a module so test runners do not try to collect TestCaseGenerator
+from sampletestcase import test_case_generator
+
+POINT_MODULE = '''
+class Point:
+    def __init__(self, x):
+        self.x = x
+
+    def __repr__(self):
+        return f"Point({self.x})"
+
+
+def make_point(a):
+    return Point(a)
+
+
+class Segment:
+    pass
+
+
+def segments():
+    return [Segment(), Segment()]
+
+
+def segments_by_name():
+    return {"first": (Segment(),)}
+
+
+def countdown():
+    yield 1
+'''
+
+
+class ModuleDefinedResultTest(unittest.TestCase):
+    """Functions returning instances of classes from their own module, or containers of them."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        self.source_dir = os.path.join(self.work_dir, "points")
+        os.makedirs(self.source_dir)
+        with open(os.path.join(self.source_dir, "geometry.py"), "w") as f:
+            f.write(POINT_MODULE)
+        self.output_dir = os.path.join(self.work_dir, "out")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def generate(self, sandbox):
+        generator = test_case_generator.TestCaseGenerator(
+            self.source_dir, self.output_dir, test_case_generator.GenerationOptions(sandbox=sandbox, exec_cache=False)
+        )
+        generator.generate_tests_for_directory()
+        with open(generator.test_file_path(os.path.join(self.source_dir, "geometry.py"))) as f:
+            source = f.read()
+        compile(source, "test_geometry.py", "exec")
+        return generator, source
+
+    def test_generated_module_compiles_and_passes(self):
+        for sandbox in (True, False):
+            with self.subTest(sandbox=sandbox):
+                generator, source = self.generate(sandbox)
+                self.assertNotIn("object at 0x", source)
+                self.assertIn("self.assertEqual(type(segments()).__name__, 'list')", source)
+                self.assertIn("self.assertEqual(type(segments_by_name()).__name__, 'dict')", source)
+                self.assertIn("self.assertEqual(type(countdown()).__name__, 'generator')", source)
+                results = test_case_generator.run_tests_and_generate_coverage(
+                    [generator.test_dir], os.path.join(self.output_dir, ".coverage"), [self.source_dir]
+                )
+                self.assertEqual(results["counts"]["error"], 0)
+                self.assertEqual(results["counts"]["failed"], 0)
+                self.assertGreater(results["counts"]["passed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
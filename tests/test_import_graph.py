@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from sampletestcase.import_graph import affected_files, build_import_graph
+
+
+class AffectedFilesTest(unittest.TestCase):
+    """A change reaches the changed files and everything that imports them, transitively."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="intellico-test-")
+        self.write("app/models.py", "VALUE = 1\n")
+        self.write("app/service.py", "from models import VALUE\n")
+        self.write("app/views.py", "import service\n")
+        self.write("app/standalone.py", "import os\n")
+        self.write("pkg/__init__.py", "")
+        self.write("pkg/core.py", "X = 1\n")
+        self.write("pkg/api.py", "from .core import X\n")
+        self.write("pkg/sub/__init__.py", "")
+        self.write("pkg/sub/client.py", "from ..api import X\n")
+        # Same module name as app/models.py, in another folder
+        self.write("other/models.py", "VALUE = 2\n")
+        self.write("other/reader.py", "from models import VALUE\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def write(self, relative, text):
+        os.makedirs(os.path.dirname(self.path(relative)), exist_ok=True)
+        with open(self.path(relative), "w") as f:
+            f.write(text)
+
+    def graph(self):
+        paths = []
+        for directory, _, names in os.walk(self.root):
+            paths.extend(os.path.join(directory, name) for name in names if name.endswith(".py"))
+        return build_import_graph(paths)
+
+    def affected(self, *changed):
+        return {os.path.relpath(path, self.root) for path in affected_files(self.graph(), [self.path(p) for p in changed])}
+
+    def test_importers_are_followed_transitively(self):
+        self.assertEqual(self.affected("app/models.py"), {"app/models.py", "app/service.py", "app/views.py"})
+        self.assertEqual(self.affected("app/views.py"), {"app/views.py"})
+        self.assertEqual(self.affected("app/standalone.py"), {"app/standalone.py"})
+
+    def test_relative_imports_inside_packages(self):
+        self.assertEqual(self.affected("pkg/core.py"), {"pkg/core.py", "pkg/api.py", "pkg/sub/client.py"})
+
+    def test_same_named_modules_in_other_folders_stay_apart(self):
+        self.assertEqual(self.affected("other/models.py"), {"other/models.py", "other/reader.py"})
+
+    def test_deleted_file_affects_its_former_importers_only(self):
+        os.remove(self.path("app/models.py"))
+        self.assertEqual(self.affected("app/models.py"), {"app/service.py", "app/views.py"})
+
+    def test_several_changes_are_combined(self):
+        self.assertEqual(
+            self.affected("app/service.py", "pkg/api.py"),
+            {"app/service.py", "app/views.py", "pkg/api.py", "pkg/sub/client.py"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from TestCase.js_index import ComponentExports, parse_exports
+
+
+class ParseExportsTest(unittest.TestCase):
+    """Default and named ES module exports found by the lightweight scan."""
+
+    def test_default_function_and_class_declarations(self):
+        exports = parse_exports("export default function Button() { return null; }")
+        self.assertEqual((exports.has_default, exports.default_name), (True, "Button"))
+        exports = parse_exports("export default class Panel extends React.Component {}")
+        self.assertEqual((exports.has_default, exports.default_name), (True, "Panel"))
+        exports = parse_exports("export default async function () {}")
+        self.assertEqual((exports.has_default, exports.default_name), (True, None))
+
+    def test_default_expression(self):
+        exports = parse_exports("const Card = () => null;\nexport default Card;")
+        self.assertEqual((exports.has_default, exports.default_name), (True, "Card"))
+        exports = parse_exports("export default () => null;")
+        self.assertEqual((exports.has_default, exports.default_name), (True, None))
+
+    def test_named_declarations_and_lists(self):
+        exports = parse_exports(
+            "export const Header = () => null;\n"
+            "export function* ids() {}\n"
+            "export class Footer {}\n"
+            "const a = 1, b = 2;\n"
+            "export { a, b as Beta };\n"
+        )
+        self.assertFalse(exports.has_default)
+        self.assertEqual(exports.named, ["Beta", "Footer", "Header", "a", "ids"])
+        self.assertEqual(exports.components(), ["Beta", "Footer", "Header"])
+
+    def test_default_through_an_export_list(self):
+        exports = parse_exports("function Modal() {}\nexport { Modal as default, Modal };")
+        self.assertEqual((exports.has_default, exports.default_name), (True, "Modal"))
+        self.assertEqual(exports.named, ["Modal"])
+
+    def test_commented_out_exports_are_ignored(self):
+        exports = parse_exports(
+            "// export default function Old() {}\n"
+            "/* export const Gone = 1; */\n"
+            "const url = 'http://example.com/export default';\n"
+            "export const Kept = 1;\n"
+        )
+        self.assertFalse(exports.has_default)
+        self.assertEqual(exports.named, ["Kept"])
+
+    def test_no_exports(self):
+        exports = parse_exports("module.exports = function () {};")
+        self.assertFalse(exports.has_default)
+        self.assertEqual(exports.named, [])
+
+    def test_round_trip_through_dict(self):
+        exports = parse_exports("export default function App() {}\nexport const Nav = 1;")
+        restored = ComponentExports.from_dict(exports.to_dict())
+        self.assertEqual(restored.to_dict(), exports.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
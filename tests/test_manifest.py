@@ -0,0 +1,124 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from sampletestcase.manifest import GenerationManifest, file_sha256
+# Imported as a module so test runners do not try to collect TestCaseGenerator
+from sampletestcase import test_case_generator
+
+
+class GenerationManifestTest(unittest.TestCase):
+    """Freshness checks, persistence and invalidation of one folder's manifest."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        self.source_dir = os.path.join(self.work_dir, "src")
+        self.test_dir = os.path.join(self.work_dir, "tests")
+        os.makedirs(self.source_dir)
+        os.makedirs(self.test_dir)
+        self.source = self.write(os.path.join(self.source_dir, "shapes.py"), "def area(a, b):\n    return a * b\n")
+        self.test_file = self.write(os.path.join(self.test_dir, "test_shapes.py"), "")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_file_sha256_follows_content(self):
+        copy = self.write(os.path.join(self.work_dir, "copy.py"), "def area(a, b):\n    return a * b\n")
+        self.assertEqual(file_sha256(self.source), file_sha256(copy))
+        self.write(copy, "def area(a, b):\n    return b * a\n")
+        self.assertNotEqual(file_sha256(self.source), file_sha256(copy))
+
+    def test_fresh_only_while_everything_matches(self):
+        manifest = GenerationManifest(self.test_dir, "6", self.source_dir)
+        source_hash = file_sha256(self.source)
+        self.assertFalse(manifest.is_fresh(self.source, source_hash, "deps"))
+        manifest.record(self.source, source_hash, self.test_file, "deps")
+        self.assertTrue(manifest.is_fresh(self.source, source_hash, "deps"))
+        self.assertFalse(manifest.is_fresh(self.source, "other", "deps"))
+        self.assertFalse(manifest.is_fresh(self.source, source_hash, "other deps"))
+        self.assertFalse(GenerationManifest(self.test_dir, "7", self.source_dir).is_fresh(self.source, source_hash))
+        os.remove(self.test_file)
+        self.assertFalse(manifest.is_fresh(self.source, source_hash, "deps"))
+
+    def test_saved_entries_load_back_per_source_folder(self):
+        manifest = GenerationManifest(self.test_dir, "6", self.source_dir)
+        manifest.record(self.source, file_sha256(self.source), self.test_file, "deps")
+        manifest.save()
+        reloaded = GenerationManifest(self.test_dir, "6", self.source_dir)
+        self.assertTrue(reloaded.is_fresh(self.source, file_sha256(self.source), "deps"))
+        # Same basename, other folder: same test directory, separate manifest
+        other = GenerationManifest(self.test_dir, "6", os.path.join(self.work_dir, "vendor", "src"))
+        self.assertNotEqual(other.path, manifest.path)
+        self.assertEqual(other.entries, {})
+
+    def test_unreadable_manifest_starts_empty(self):
+        manifest = GenerationManifest(self.test_dir, "6", self.source_dir)
+        self.write(manifest.path, "{not json")
+        self.assertEqual(GenerationManifest(self.test_dir, "6", self.source_dir).entries, {})
+
+    def test_invalidate_missing_drops_only_this_folders_gone_sources(self):
+        manifest = GenerationManifest(self.test_dir, "6", self.source_dir)
+        manifest.record(self.source, file_sha256(self.source), self.test_file)
+        gone = os.path.join(self.source_dir, "gone.py")
+        gone_test = self.write(os.path.join(self.test_dir, "test_gone.py"), "")
+        manifest.record(gone, "hash", gone_test)
+        elsewhere = os.path.join(self.work_dir, "other", "module.py")
+        manifest.record(elsewhere, "hash", self.test_file)
+
+        self.assertEqual(manifest.invalidate_missing([self.source]), 1)
+        self.assertFalse(os.path.exists(gone_test))
+        self.assertTrue(os.path.exists(self.test_file))
+        self.assertEqual(set(manifest.entries), {os.path.abspath(self.source), os.path.abspath(elsewhere)})
+
+
+class IncrementalGenerationTest(unittest.TestCase):
+    """An incremental generator regenerates a file when it or a project module it imports changes."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        self.source_dir = os.path.join(self.work_dir, "app")
+        os.makedirs(self.source_dir)
+        self.write("helper.py", "def base():\n    return 1\n")
+        self.write("user.py", "from helper import base\n\n\ndef twice():\n    return base() * 2\n")
+        self.write("other.py", "def three():\n    return 3\n")
+        self.generator = test_case_generator.TestCaseGenerator(
+            self.source_dir, os.path.join(self.work_dir, "out"),
+            test_case_generator.GenerationOptions(exec_cache=False), incremental=True,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.source_dir, name), "w") as f:
+            f.write(text)
+
+    def generate(self):
+        """(manifest hits, manifest misses) of one run of the shared generator, as in watch mode."""
+        stats_before = self.generator.stats.copy()
+        self.generator.generate_tests_for_directory()
+        stats = self.generator.stats - stats_before
+        return stats["manifest_hits"], stats["manifest_misses"]
+
+    def test_dependency_change_regenerates_its_importers(self):
+        self.assertEqual(self.generate(), (0, 3))
+        self.assertEqual(self.generate(), (3, 0))
+        self.write("helper.py", "def base():\n    return 10\n")
+        # helper itself and user, which imports it; other is untouched
+        self.assertEqual(self.generate(), (1, 2))
+        with open(self.generator.test_file_path(os.path.join(self.source_dir, "user.py"))) as f:
+            self.assertIn("self.assertEqual(twice(), 20)", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
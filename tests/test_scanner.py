@@ -0,0 +1,97 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from language_identifier.scanner import is_ignored, parse_ignore_lines, scan_repository
+
+
+class IgnoreRulesTest(unittest.TestCase):
+    """.gitignore-style matching: anchoring, directory-only rules, negation and base directories."""
+
+    def test_unanchored_pattern_matches_the_name_at_any_depth(self):
+        rules = parse_ignore_lines(["*.log"])
+        self.assertTrue(is_ignored(rules, "debug.log", False))
+        self.assertTrue(is_ignored(rules, "deep/down/debug.log", False))
+        self.assertFalse(is_ignored(rules, "debug.log.txt", False))
+
+    def test_slash_anchors_the_pattern(self):
+        rules = parse_ignore_lines(["/build", "docs/*.md"])
+        self.assertTrue(is_ignored(rules, "build", True))
+        self.assertFalse(is_ignored(rules, "src/build", True))
+        self.assertTrue(is_ignored(rules, "docs/index.md", False))
+        self.assertFalse(is_ignored(rules, "src/docs/index.md", False))
+
+    def test_trailing_slash_only_matches_directories(self):
+        rules = parse_ignore_lines(["cache/"])
+        self.assertTrue(is_ignored(rules, "cache", True))
+        self.assertFalse(is_ignored(rules, "cache", False))
+
+    def test_last_matching_rule_wins(self):
+        rules = parse_ignore_lines(["*.py", "!keep.py"])
+        self.assertTrue(is_ignored(rules, "drop.py", False))
+        self.assertFalse(is_ignored(rules, "keep.py", False))
+        rules = parse_ignore_lines(["!keep.py", "*.py"])
+        self.assertTrue(is_ignored(rules, "keep.py", False))
+
+    def test_comments_and_blank_lines_are_skipped(self):
+        self.assertEqual(parse_ignore_lines(["# comment\n", "\n", "   \n"]), [])
+
+    def test_rules_from_a_nested_file_stay_below_it(self):
+        rules = parse_ignore_lines(["generated.py"], base_dir="pkg")
+        self.assertTrue(is_ignored(rules, "pkg/generated.py", False))
+        self.assertTrue(is_ignored(rules, "pkg/sub/generated.py", False))
+        self.assertFalse(is_ignored(rules, "generated.py", False))
+        self.assertFalse(is_ignored(rules, "pkg2/generated.py", False))
+
+
+class ScanRepositoryTest(unittest.TestCase):
+    """scan_repository applies the default, extra and discovered ignore rules while it walks."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="intellico-test-")
+        for path in [
+            "app/main.py",
+            "app/generated.py",
+            "app/vendored/lib.py",
+            "web/index.js",
+            "node_modules/react/index.js",
+            "env/lib/site.py",
+            "notes/todo.py",
+        ]:
+            self.write(path, "")
+        self.write("env/pyvenv.cfg", "")
+        self.write(".gitignore", "notes/\n")
+        self.write("app/.gitignore", "generated.py\nvendored/\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def write(self, relative, text):
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def scanned(self, result):
+        return [os.path.relpath(directory.path, self.root) for directory in result.directories]
+
+    def test_ignored_directories_are_not_descended_into(self):
+        result = scan_repository(self.root)
+        self.assertEqual(self.scanned(result), [".", "app", "web"])
+        self.assertEqual(result.batches()["Python"], [os.path.join(self.root, "app")])
+        self.assertEqual(result.batches()["JavaScript"], [os.path.join(self.root, "web")])
+        # app/.gitignore hides generated.py, so app holds a single Python file
+        self.assertEqual(result.directories[1].language_counts["Python"], 1)
+
+    def test_extra_ignores(self):
+        result = scan_repository(self.root, extra_ignores=["web/"])
+        self.assertEqual(self.scanned(result), [".", "app"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+import coverage
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from language_identifier.sharding import (
+    COVERAGE_FILE_NAME,
+    SUMMARY_FILE_NAME,
+    Shard,
+    merge_artifacts,
+    parse_shard,
+    write_artifact,
+)
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+class ShardSelectTest(unittest.TestCase):
+    """Every shard computes the same plan on its own, and the shards split the files between them."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        self.root = os.path.join(self.work_dir, "repo")
+        self.paths = [
+            write(os.path.join(self.root, f"module_{index}.py"), "def f(a):\n    return a\n" * (index + 1))
+            for index in range(9)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ("0/4", "5/4", "1/0", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_shards_partition_the_files(self):
+        selections = [Shard(index, 3, self.root).select(self.paths) for index in (1, 2, 3)]
+        selected = [path for selection in selections for path in selection]
+        self.assertEqual(sorted(selected), sorted(self.paths))
+        self.assertTrue(all(selections))
+        # Each selection keeps the given order
+        for selection in selections:
+            self.assertEqual(selection, [path for path in self.paths if path in selection])
+
+    def test_plan_ignores_scan_order_and_checkout_location(self):
+        shard = Shard(2, 3, self.root)
+        self.assertEqual(sorted(shard.select(self.paths)), sorted(shard.select(list(reversed(self.paths)))))
+        moved_root = os.path.join(self.work_dir, "elsewhere")
+        shutil.copytree(self.root, moved_root)
+        moved = Shard(2, 3, moved_root).select([os.path.join(moved_root, os.path.basename(p)) for p in self.paths])
+        self.assertEqual(sorted(map(os.path.basename, moved)), sorted(map(os.path.basename, shard.select(self.paths))))
+
+    def test_heavy_files_are_spread_out(self):
+        assignment = Shard(1, 2, self.root).assign(self.paths)
+        # The two heaviest files go to different shards
+        self.assertNotEqual(assignment[self.paths[-1]], assignment[self.paths[-2]])
+
+
+class MergeArtifactsTest(unittest.TestCase):
+    """Shard artifacts combine into one test tree, one coverage file and one summary."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        # Where the shards ran, and where the tree lives on the merging machine
+        self.shard_root = os.path.join(self.work_dir, "ci", "repo")
+        self.root = os.path.join(self.work_dir, "local", "repo")
+        for name in ("a.py", "b.py"):
+            write(os.path.join(self.root, "app", name), "def f():\n    return 1\n")
+        self.output = os.path.join(self.work_dir, "merged")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def artifact(self, index, count, module):
+        artifact_dir = os.path.join(self.work_dir, f"shard-{index}")
+        write(os.path.join(artifact_dir, "test_app", f"test_{module}.py"), f"# tests of {module}\n")
+        write(os.path.join(artifact_dir, "test_app", "shared.txt"), "same in every shard\n")
+        source = os.path.join(self.shard_root, "app", f"{module}.py")
+        data = coverage.CoverageData(basename=os.path.join(artifact_dir, COVERAGE_FILE_NAME))
+        data.add_lines({source: [1, 2]})
+        data.write()
+        summary = {
+            "directories_scanned": 2,
+            "files_scanned": 2,
+            "languages": {"Python": 1},
+            "results": {"Python": {
+                "tests": [{"id": f"test_{module}.Test.test_f", "status": "passed"}],
+                "tests_run": 1,
+                "counts": {"passed": 1},
+                "shards": 1,
+                "seconds": float(index),
+            }},
+        }
+        events = [
+            {"event": "file_generated", "file": source,
+             "test_file": os.path.join(artifact_dir, "test_app", f"test_{module}.py")},
+            {"event": "coverage_done"},
+        ]
+        write_artifact(artifact_dir, Shard(index, count, self.shard_root), summary, events, started_at=100.0 + index)
+        return artifact_dir
+
+    def test_merge_combines_tests_coverage_and_events(self):
+        artifacts = [self.artifact(1, 2, "a"), self.artifact(2, 2, "b")]
+        summary, events = merge_artifacts(artifacts, self.output, root=self.root)
+
+        for name in ("test_a.py", "test_b.py", "shared.txt"):
+            self.assertTrue(os.path.exists(os.path.join(self.output, "test_app", name)))
+        python = summary["results"]["Python"]
+        self.assertEqual(python["tests_run"], 2)
+        self.assertEqual(python["counts"], {"passed": 2})
+        self.assertEqual(python["seconds"], 2.0)
+        self.assertEqual(
+            sorted(python["coverage"]["files"]),
+            [os.path.join(self.root, "app", "a.py"), os.path.join(self.root, "app", "b.py")],
+        )
+        self.assertEqual(python["coverage"]["percent"], 100.0)
+        self.assertEqual(summary["shards"], {"count": 2, "merged": [1, 2], "missing": []})
+        self.assertEqual(summary["started_at"], 101.0)
+        # Only recorded events are kept, moved to the local tree and the merged output
+        self.assertEqual([record["event"] for record in events], ["file_generated", "file_generated"])
+        self.assertEqual(events[0]["file"], os.path.join(self.root, "app", "a.py"))
+        self.assertEqual(events[1]["test_file"], os.path.join(self.output, "test_app", "test_b.py"))
+        with open(os.path.join(self.output, SUMMARY_FILE_NAME)) as f:
+            self.assertEqual(json.load(f)["shards"]["merged"], [1, 2])
+
+    def test_missing_shards_need_partial(self):
+        artifacts = [self.artifact(1, 2, "a")]
+        with self.assertRaises(ValueError):
+            merge_artifacts(artifacts, self.output, root=self.root)
+        summary, _ = merge_artifacts(artifacts, self.output, root=self.root, partial=True)
+        self.assertEqual(summary["shards"]["missing"], [2])
+
+    def test_inconsistent_artifacts_are_refused(self):
+        first = self.artifact(1, 2, "a")
+        with self.assertRaises(ValueError):
+            merge_artifacts([first, first], self.output, root=self.root)
+        second = self.artifact(2, 2, "b")
+        write(os.path.join(second, "test_app", "shared.txt"), "different\n")
+        with self.assertRaises(ValueError):
+            merge_artifacts([first, second], self.output, root=self.root)
+        other_run = self.artifact(3, 3, "b")
+        with self.assertRaises(ValueError):
+            merge_artifacts([first, other_run], self.output, root=self.root, partial=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
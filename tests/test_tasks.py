@@ -0,0 +1,157 @@
+import os
+import sys
+import shlex
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from tasks import TaskCache, TaskError, resolve_order, run_tasks, task_fingerprint
+
+
+class ResolveOrderTest(unittest.TestCase):
+    """Tasks come after everything they depend on, each once."""
+
+    tasks = {"tasks": {
+        "lint": {"command": "true"},
+        "build": {"command": "true", "depends_on": "lint"},
+        "test": {"command": "true", "depends_on": ["build", "lint"]},
+        "docs": {"command": "true", "depends_on": ["build"]},
+    }}
+
+    def test_dependencies_first_and_once(self):
+        self.assertEqual(resolve_order(["test", "docs"], self.tasks), ["lint", "build", "test", "docs"])
+        self.assertEqual(resolve_order(["lint"], self.tasks), ["lint"])
+
+    def test_unknown_task(self):
+        with self.assertRaises(TaskError):
+            resolve_order(["deploy"], self.tasks)
+        with self.assertRaises(TaskError):
+            resolve_order(["x"], {"tasks": {"x": {"command": "true", "depends_on": "missing"}}})
+
+    def test_cycle_names_its_path(self):
+        tasks = {"tasks": {
+            "a": {"command": "true", "depends_on": "b"},
+            "b": {"command": "true", "depends_on": "c"},
+            "c": {"command": "true", "depends_on": "a"},
+        }}
+        with self.assertRaises(TaskError) as raised:
+            resolve_order(["a"], tasks)
+        self.assertIn("a -> b -> c -> a", str(raised.exception))
+
+
+class TaskRunTest(unittest.TestCase):
+    """Fingerprints of inputs decide which tasks run again."""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix="intellico-test-")
+        self.log = os.path.join(self.work_dir, "log")
+        self.cache_path = os.path.join(self.work_dir, "cache.json")
+        self.input_file = self.write("src/input.txt", "one")
+        # Absolute patterns: task paths are otherwise relative to the repository root
+        self.inputs = os.path.join(self.work_dir, "src", "*.txt")
+        self.output = os.path.join(self.work_dir, "out", "result.txt")
+        self.tasks = {"tasks": {
+            "build": {
+                "command": self.command("build") + f" && mkdir -p {shlex.quote(os.path.dirname(self.output))}"
+                           f" && echo built > {shlex.quote(self.output)}",
+                "inputs": [self.inputs],
+                "outputs": [self.output],
+            },
+            "test": {"command": self.command("test"), "depends_on": "build", "inputs": [self.inputs]},
+            "report": {"command": self.command("report"), "depends_on": "test"},
+        }}
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def write(self, relative, text):
+        path = os.path.join(self.work_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def command(self, name):
+        return f"echo {name} >> {shlex.quote(self.log)}"
+
+    def run_tasks(self, *names, **options):
+        """The status of each task, and which tasks actually ran their command."""
+        if os.path.exists(self.log):
+            os.remove(self.log)
+        status = run_tasks(list(names), self.tasks, cache_path=self.cache_path, **options)
+        if not os.path.exists(self.log):
+            return status, []
+        with open(self.log) as f:
+            return status, f.read().split()
+
+    def fingerprint(self, task, dependency_fingerprints=None):
+        return task_fingerprint("task", task, TaskCache(self.cache_path), dependency_fingerprints or {})
+
+    def test_fingerprint_follows_command_env_inputs_and_dependencies(self):
+        task = {"command": "make", "inputs": [self.inputs]}
+        fingerprint = self.fingerprint(task)
+        self.assertEqual(fingerprint, self.fingerprint(dict(task)))
+        self.assertIsNone(self.fingerprint({"command": "make"}))
+        self.assertNotEqual(fingerprint, self.fingerprint(dict(task, command="make all")))
+        self.assertNotEqual(fingerprint, self.fingerprint(dict(task, env={"MODE": "fast"})))
+        self.assertNotEqual(fingerprint, self.fingerprint(task, {"build": "abc"}))
+        self.write("src/input.txt", "changed")
+        changed = self.fingerprint(task)
+        self.assertNotEqual(changed, fingerprint)
+        self.write("src/extra.txt", "")
+        self.assertNotEqual(self.fingerprint(task), changed)
+
+    def test_file_hash_is_memoized_on_mtime_and_size(self):
+        cache = TaskCache(self.cache_path)
+        first = cache.file_hash(self.input_file)
+        stamp = cache.file_hashes[self.input_file][:2]
+        self.assertEqual(cache.file_hash(self.input_file), first)
+        self.write("src/input.txt", "three")
+        self.assertNotEqual(cache.file_hash(self.input_file), first)
+        self.assertNotEqual(cache.file_hashes[self.input_file][:2], stamp)
+
+    def test_unchanged_tasks_are_skipped(self):
+        status, ran = self.run_tasks("report")
+        self.assertEqual(status, {"build": "ran", "test": "ran", "report": "ran"})
+        self.assertEqual(ran, ["build", "test", "report"])
+
+        # report has no inputs, so it always runs
+        status, ran = self.run_tasks("report")
+        self.assertEqual(status, {"build": "skipped", "test": "skipped", "report": "ran"})
+        self.assertEqual(ran, ["report"])
+
+        self.write("src/input.txt", "changed")
+        status, ran = self.run_tasks("report")
+        self.assertEqual(ran, ["build", "test", "report"])
+
+        status, ran = self.run_tasks("report", force=True)
+        self.assertEqual(ran, ["build", "test", "report"])
+
+    def test_missing_outputs_run_the_task_again(self):
+        self.run_tasks("build")
+        os.remove(self.output)
+        status, ran = self.run_tasks("build")
+        self.assertEqual((status, ran), ({"build": "ran"}, ["build"]))
+
+    def test_failure_stops_dependents(self):
+        self.tasks["tasks"]["build"]["command"] = self.command("build") + " && exit 3"
+        status, ran = self.run_tasks("report")
+        self.assertEqual(status, {"build": "failed", "test": "not run", "report": "not run"})
+        self.assertEqual(ran, ["build"])
+        # A failed run is not recorded, so the next run tries again
+        status, ran = self.run_tasks("build")
+        self.assertEqual(ran, ["build"])
+
+    def test_independent_tasks_run_in_parallel_slots(self):
+        self.tasks["tasks"]["lint"] = {"command": self.command("lint")}
+        status, ran = self.run_tasks("report", "lint", jobs=2)
+        self.assertEqual(set(status.values()), {"ran"})
+        self.assertLess(ran.index("build"), ran.index("test"))
+        self.assertLess(ran.index("test"), ran.index("report"))
+
+
+if __name__ == "__main__":
+    unittest.main()